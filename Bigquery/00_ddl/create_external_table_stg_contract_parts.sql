@@ -0,0 +1,33 @@
+-- Variante de la table externe STG pour les fichiers découpés en shards
+-- (generate_contract_csv.py --workers N --parts, ou tools/csv_splitter.py split pour un fichier déposé)
+-- Chaque shard part-00000.csv contient son propre en-tête
+CREATE OR REPLACE EXTERNAL TABLE `01_STG.contract`
+(
+  contract_id INT64,
+  numero_contrat STRING,
+  nom_client STRING,
+  entreprise STRING,
+  email_contact STRING,
+  type_contrat STRING,
+  departement STRING,
+  montant_total FLOAT64,
+  devise STRING,
+  date_signature DATE,
+  date_debut DATE,
+  date_fin DATE,
+  duree_mois INT64,
+  statut STRING,
+  priorite STRING,
+  description STRING,
+  referent_interne STRING,
+  montant_mensuel FLOAT64,
+  pourcentage_completion FLOAT64,
+  timestamp TIMESTAMP,
+  employee_id INT64
+)
+OPTIONS (
+  format = 'CSV',
+  field_delimiter = ';',
+  uris = ['gs://lakehouse-bucket-20250903/contract/part-*.csv'], -- Wildcard sur les shards
+  skip_leading_rows = 1
+);
\ No newline at end of file
@@ -0,0 +1,33 @@
+-- Variante de la table externe STG pour les fichiers CSV compressés gzip
+-- (generate_employees_csv.py --format csv.gz)
+-- BigQuery ne lit pas le CSV compressé zstd : utiliser csv.gz ou parquet
+CREATE OR REPLACE EXTERNAL TABLE `01_STG.employees`
+(
+  id INT64,
+  nom STRING,
+  prenom STRING,
+  email STRING,
+  age INT64,
+  ville STRING,
+  code_postal STRING,
+  telephone STRING,
+  salaire FLOAT64,
+  departement STRING,
+  date_embauche DATE,
+  statut STRING,
+  score FLOAT64,
+  latitude FLOAT64,
+  longitude FLOAT64,
+  commentaire STRING,
+  reference STRING,
+  niveau STRING,
+  categorie STRING,
+  timestamp TIMESTAMP
+)
+OPTIONS (
+  format = 'CSV',
+  compression = 'GZIP',
+  field_delimiter = ';',
+  uris = ['gs://lakehouse-bucket-20250903/employees.csv.gz'], -- Bucket du projet LakeHouse
+  skip_leading_rows = 1
+);
\ No newline at end of file
@@ -0,0 +1,30 @@
+-- Table externe du lot delta courant (generate_entity.py employees delta), déposé sous employees_delta.csv
+CREATE OR REPLACE EXTERNAL TABLE `01_STG.employees_delta`
+(
+  id INT64,
+  nom STRING,
+  prenom STRING,
+  email STRING,
+  age INT64,
+  ville STRING,
+  code_postal STRING,
+  telephone STRING,
+  salaire FLOAT64,
+  departement STRING,
+  date_embauche DATE,
+  statut STRING,
+  score FLOAT64,
+  latitude FLOAT64,
+  longitude FLOAT64,
+  commentaire STRING,
+  reference STRING,
+  niveau STRING,
+  categorie STRING,
+  timestamp TIMESTAMP
+)
+OPTIONS (
+  format = 'CSV',
+  field_delimiter = ';',
+  uris = ['gs://lakehouse-bucket-20250903/employees_delta.csv'], -- Bucket du projet LakeHouse
+  skip_leading_rows = 1
+);
\ No newline at end of file
@@ -0,0 +1,35 @@
+-- Variante de la table externe STG pour les fichiers partitionnés Hive
+-- (generate_entity.py employees ... --partition-by date_embauche)
+-- Un dossier dt=YYYY-MM-DD par valeur de date_embauche, déposé sous gs://lakehouse-bucket-20250903/employees_date_embauche/
+-- Chaque fichier part-00000.csv contient son propre en-tête
+CREATE OR REPLACE EXTERNAL TABLE `01_STG.employees`
+(
+  id INT64,
+  nom STRING,
+  prenom STRING,
+  email STRING,
+  age INT64,
+  ville STRING,
+  code_postal STRING,
+  telephone STRING,
+  salaire FLOAT64,
+  departement STRING,
+  date_embauche DATE,
+  statut STRING,
+  score FLOAT64,
+  latitude FLOAT64,
+  longitude FLOAT64,
+  commentaire STRING,
+  reference STRING,
+  niveau STRING,
+  categorie STRING,
+  timestamp TIMESTAMP
+)
+WITH PARTITION COLUMNS (dt DATE)
+OPTIONS (
+  format = 'CSV',
+  field_delimiter = ';',
+  uris = ['gs://lakehouse-bucket-20250903/employees_date_embauche/*'],
+  hive_partition_uri_prefix = 'gs://lakehouse-bucket-20250903/employees_date_embauche',
+  skip_leading_rows = 1
+);
\ No newline at end of file
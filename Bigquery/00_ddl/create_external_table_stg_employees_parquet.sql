@@ -0,0 +1,30 @@
+-- Variante de la table externe STG pour les fichiers Parquet
+-- (generate_employees_csv.py --format parquet)
+-- Types portés par le fichier : DATE en date32, TIMESTAMP en timestamp UTC (us)
+CREATE OR REPLACE EXTERNAL TABLE `01_STG.employees`
+(
+  id INT64,
+  nom STRING,
+  prenom STRING,
+  email STRING,
+  age INT64,
+  ville STRING,
+  code_postal STRING,
+  telephone STRING,
+  salaire FLOAT64,
+  departement STRING,
+  date_embauche DATE,
+  statut STRING,
+  score FLOAT64,
+  latitude FLOAT64,
+  longitude FLOAT64,
+  commentaire STRING,
+  reference STRING,
+  niveau STRING,
+  categorie STRING,
+  timestamp TIMESTAMP
+)
+OPTIONS (
+  format = 'PARQUET',
+  uris = ['gs://lakehouse-bucket-20250903/employees.parquet'] -- Bucket du projet LakeHouse
+);
\ No newline at end of file
@@ -0,0 +1,32 @@
+-- Variante de la table externe STG pour les fichiers générés en shards
+-- (generate_employees_csv.py --workers N --parts, ou tools/csv_splitter.py split pour un fichier déposé)
+-- Chaque shard part-00000.csv contient son propre en-tête
+CREATE OR REPLACE EXTERNAL TABLE `01_STG.employees`
+(
+  id INT64,
+  nom STRING,
+  prenom STRING,
+  email STRING,
+  age INT64,
+  ville STRING,
+  code_postal STRING,
+  telephone STRING,
+  salaire FLOAT64,
+  departement STRING,
+  date_embauche DATE,
+  statut STRING,
+  score FLOAT64,
+  latitude FLOAT64,
+  longitude FLOAT64,
+  commentaire STRING,
+  reference STRING,
+  niveau STRING,
+  categorie STRING,
+  timestamp TIMESTAMP
+)
+OPTIONS (
+  format = 'CSV',
+  field_delimiter = ';',
+  uris = ['gs://lakehouse-bucket-20250903/employees/part-*.csv'], -- Wildcard sur les shards
+  skip_leading_rows = 1
+);
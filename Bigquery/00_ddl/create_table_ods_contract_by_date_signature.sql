@@ -0,0 +1,31 @@
+-- Création de la table contract avec schéma typé
+-- Partitionnée par date_signature (day) : les requêtes filtrées sur date_signature
+-- n'analysent que les partitions concernées
+-- Clusterisée par departement, statut : blocs élagués sur ces colonnes
+CREATE TABLE `lake-471013.02_ODS.contract` (
+  contract_id INT64 NOT NULL,
+  numero_contrat STRING,
+  nom_client STRING,
+  entreprise STRING,
+  email_contact STRING,
+  type_contrat STRING,
+  departement STRING,
+  montant_total FLOAT64,
+  devise STRING,
+  date_signature DATE,
+  date_debut DATE,
+  date_fin DATE,
+  duree_mois INT64,
+  statut STRING,
+  priorite STRING,
+  description STRING,
+  referent_interne STRING,
+  montant_mensuel FLOAT64,
+  pourcentage_completion FLOAT64,
+  timestamp TIMESTAMP,
+  employee_id INT64,
+  ingestion_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP(),
+  source_file STRING
+)
+PARTITION BY date_signature
+CLUSTER BY departement, statut;
\ No newline at end of file
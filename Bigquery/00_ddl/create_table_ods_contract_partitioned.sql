@@ -0,0 +1,32 @@
+-- Création de la table contract avec schéma typé, partitionnée par jour d'ingestion
+-- Variante pour les chargements incrémentaux (lots delta, MERGE sur contract_id) :
+-- chaque lot arrive dans la partition du jour, les lectures filtrées sur
+-- ingestion_date n'analysent que les partitions concernées
+CREATE TABLE `lake-471013.02_ODS.contract` (
+  contract_id INT64 NOT NULL,
+  numero_contrat STRING,
+  nom_client STRING,
+  entreprise STRING,
+  email_contact STRING,
+  type_contrat STRING,
+  departement STRING,
+  montant_total FLOAT64,
+  devise STRING,
+  date_signature DATE,
+  date_debut DATE,
+  date_fin DATE,
+  duree_mois INT64,
+  statut STRING,
+  priorite STRING,
+  description STRING,
+  referent_interne STRING,
+  montant_mensuel FLOAT64,
+  pourcentage_completion FLOAT64,
+  timestamp TIMESTAMP,
+  employee_id INT64,
+  -- Métadonnées d'ingestion
+  ingestion_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP(),
+  source_file STRING
+)
+PARTITION BY DATE(ingestion_date)
+CLUSTER BY contract_id;
\ No newline at end of file
@@ -0,0 +1,31 @@
+-- Création de la table employees avec schéma typé, partitionnée par jour d'ingestion
+-- Variante pour les chargements incrémentaux (lots delta, MERGE sur id) :
+-- chaque lot arrive dans la partition du jour, les lectures filtrées sur
+-- ingestion_date n'analysent que les partitions concernées
+CREATE TABLE `lake-471013.02_ODS.employees` (
+  id INT64 NOT NULL,
+  nom STRING,
+  prenom STRING,
+  email STRING,
+  age INT64,
+  ville STRING,
+  code_postal STRING,
+  telephone STRING,
+  salaire FLOAT64,
+  departement STRING,
+  date_embauche DATE,
+  statut STRING,
+  score FLOAT64,
+  latitude FLOAT64,
+  longitude FLOAT64,
+  commentaire STRING,
+  reference STRING,
+  niveau STRING,
+  categorie STRING,
+  timestamp TIMESTAMP,
+  -- Métadonnées d'ingestion
+  ingestion_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP(),
+  source_file STRING
+)
+PARTITION BY DATE(ingestion_date)
+CLUSTER BY id;
\ No newline at end of file
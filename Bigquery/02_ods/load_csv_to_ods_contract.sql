@@ -0,0 +1,20 @@
+-- Flux d'ingestion CSV vers BigQuery
+-- Fichier source : contract
+-- Table cible : contract.csv
+-- Truncate avant bulk
+
+TRUNCATE TABLE `lake-471013.02_ODS.contract`;
+
+LOAD DATA INTO `lake-471013.02_ODS.contract`
+(contract_id INT64, numero_contrat STRING, nom_client STRING, entreprise STRING, 
+ email_contact STRING, type_contrat STRING, departement STRING, montant_total FLOAT64, 
+ devise STRING, date_signature DATE, date_debut DATE, date_fin DATE, 
+ duree_mois INT64, statut STRING, priorite STRING, description STRING, 
+ referent_interne STRING, montant_mensuel FLOAT64, pourcentage_completion FLOAT64, 
+ timestamp TIMESTAMP, employee_id INT64)
+FROM FILES (
+  format = 'CSV',
+  field_delimiter = ';',
+  skip_leading_rows = 1,
+  uris = ['gs://lakehouse-bucket-20250903/contract.csv']
+);
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""
+Benchmark des distributions asymétriques (profils tools/entities/<entité>_skewed.yaml).
+
+Pour chaque entité et moteur, génère le même nombre de lignes avec le profil
+uniforme et le profil asymétrique (graine fixe) : débit (lignes/s) et coût
+relatif des distributions, puis mesure sur le fichier produit (DuckDB) la
+part de la valeur la plus fréquente des colonnes catégorielles, le taux de
+NULL et, pour les colonnes corrélées, la médiane par niveau.
+
+Usage:
+    python benchmarks/bench_distributions.py [--rows 200000] [--entities employees,contract]
+                                             [--engines row,columnar] [--output benchmarks/results]
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+from run_benchmarks import BENCH_DIR, BENCH_SEED, ENTITIES, git_revision
+
+from entity_generator import load_entity
+
+# Colonnes décrites dans le rapport : (catégorielles, corrélation (niveau, montant))
+PROFILE_COLUMNS = {
+    'employees': (['ville', 'departement', 'niveau', 'statut'], ('niveau', 'salaire')),
+    'contract': (['type_contrat', 'departement', 'devise', 'duree_mois'], ('type_contrat', 'montant_mensuel')),
+}
+
+
+def describe(path: str, entity: str, null_columns: list) -> dict:
+    """Part de la valeur la plus fréquente, taux de NULL et médianes par niveau d'un fichier"""
+    import duckdb
+    source = f"read_csv('{path}', delim=';', header=true, all_varchar=true)"
+    categories, (level, amount) = PROFILE_COLUMNS[entity]
+    top_share = {}
+    for column in categories:
+        value, share = duckdb.sql(f"SELECT {column}, count(*) / sum(count(*)) OVER () FROM {source} "
+                                  f"GROUP BY 1 ORDER BY 2 DESC LIMIT 1").fetchone()
+        top_share[column] = {'value': value, 'share': round(share, 4)}
+    null_rate = {column: round(duckdb.sql(f"SELECT avg(({column} IS NULL)::INT) FROM {source}").fetchone()[0], 4)
+                 for column in null_columns}
+    medians = dict(duckdb.sql(f"SELECT {level}, median({amount}::DOUBLE) FROM {source} GROUP BY 1 ORDER BY 1")
+                   .fetchall())
+    return {'top_share': top_share, 'null_rate': null_rate, f"median_{amount}_by_{level}": medians}
+
+
+def run_case(entity: str, engine: str, rows: int, workdir: str) -> dict:
+    results = {}
+    for profile in (entity, f"{entity}_skewed"):
+        generator = load_entity(profile)
+        path = os.path.join(workdir, f"{profile}_{engine}.csv")
+        started = time.perf_counter()
+        if not generator.generate_csv_file(path, 0, rows=rows, engine=engine, seed=BENCH_SEED):
+            raise RuntimeError(f"Échec de génération {profile} {engine}")
+        seconds = time.perf_counter() - started
+        results[profile] = {'seconds': round(seconds, 3), 'rows_per_s': round(rows / seconds),
+                            **describe(path, entity, sorted(generator.null_rates))}
+        os.remove(path)
+    uniform, skewed = results[entity], results[f"{entity}_skewed"]
+    return {'entity': entity, 'engine': engine, 'rows': rows, 'uniform': uniform, 'skewed': skewed,
+            'relative_cost': round(skewed['seconds'] / uniform['seconds'], 3)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Coût et forme des distributions asymétriques")
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--entities', default=','.join(ENTITIES))
+    parser.add_argument('--engines', default='row,columnar')
+    parser.add_argument('--output', default=os.path.join(BENCH_DIR, 'results'))
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    revision = git_revision()
+    report = {'revision': revision, 'date': datetime.now().isoformat(timespec='seconds'), 'cases': []}
+    workdir = tempfile.mkdtemp(prefix='lakehouse_distributions_')
+    try:
+        for entity in args.entities.split(','):
+            for engine in args.engines.split(','):
+                case = run_case(entity, engine, args.rows, workdir)
+                report['cases'].append(case)
+                shares = ', '.join(f"{column} {top['value']} {top['share']:.0%}"
+                                   for column, top in case['skewed']['top_share'].items())
+                print(f"{entity:<10} {engine:<8} uniforme {case['uniform']['rows_per_s']:>9,} lignes/s  "
+                      f"asymétrique {case['skewed']['rows_per_s']:>9,} lignes/s  x{case['relative_cost']:.2f}  "
+                      f"({shares})")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    os.makedirs(args.output, exist_ok=True)
+    result_path = os.path.join(args.output, f"{datetime.now():%Y%m%d_%H%M%S}_{revision}_distributions.json")
+    with open(result_path, 'w', encoding='utf-8') as result_file:
+        json.dump(report, result_file, indent=2, ensure_ascii=False, default=str)
+    print(f"Résultats enregistrés dans {result_path}")
+
+
+if __name__ == "__main__":
+    main()
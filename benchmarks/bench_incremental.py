@@ -0,0 +1,92 @@
+"""
+Benchmark chargement incrémental (MERGE d'un lot delta) contre rechargement complet.
+
+Pour chaque entité et taille, sur l'émulateur DuckDB (tools/local_loader.py) :
+1. génère un fichier complet (moteur colonnaire, graine fixe)
+2. rechargement complet : TRUNCATE + LOAD DATA du fichier (flux actuel)
+3. génère un lot delta de `--delta-pct` % des lignes (mises à jour,
+   insertions et suppressions logiques) à partir du high-water mark
+4. chargement incrémental : MERGE du lot par la définition Dataform
+   load_stg_to_ods_<entité>_incremental.sqlx
+
+Usage:
+    python benchmarks/bench_incremental.py [--sizes 20,100] [--entities employees,contract]
+                                           [--delta-pct 1] [--output benchmarks/results]
+    python benchmarks/bench_incremental.py --sizes 1024,5120   # 1GB et 5GB
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+from run_benchmarks import BENCH_DIR, BENCH_SEED, ENTITIES, git_revision, load_entity
+
+from local_loader import LocalLoader
+
+# Répartition d'un lot delta : mises à jour, insertions, suppressions logiques
+DELTA_SPLIT = (0.70, 0.25, 0.05)
+
+
+def run_case(entity: str, size_mb: float, delta_pct: float, workdir: str) -> dict:
+    """Rechargement complet puis MERGE d'un lot delta pour une entité et une taille"""
+    module = load_entity(entity)
+    base = os.path.join(workdir, f"{entity}_{size_mb}mb.csv")
+    module.generate_csv_file(base, size_mb, 'MB', engine='columnar', seed=BENCH_SEED)
+
+    loader = LocalLoader(os.path.join(workdir, 'bench.duckdb'), data_dir=workdir)
+    try:
+        full = loader.load_data(entity, [base])
+        # Écriture sur disque du chargement complet hors de la mesure du MERGE
+        loader.connection.execute('CHECKPOINT')
+        delta_rows = max(1, int(full['rows'] * delta_pct / 100))
+        updates, inserts, deletes = (int(delta_rows * share) for share in DELTA_SPLIT)
+        delta = module.ENTITY.generate_delta_file(workdir, inserts, updates, deletes, seed=BENCH_SEED, base=base)
+        incremental = loader.dataform(entity, [delta], incremental=True)
+    finally:
+        loader.close()
+
+    return {
+        'entity': entity,
+        'size_mb': size_mb,
+        'delta_pct': delta_pct,
+        'full_reload': full,
+        'incremental': incremental,
+        'speedup': round(full['seconds'] / incremental['seconds'], 2) if incremental['seconds'] else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark MERGE incrémental vs TRUNCATE + LOAD DATA")
+    parser.add_argument('--sizes', default='20,100', help="Tailles du fichier complet en MB (1024,5120 = 1GB,5GB)")
+    parser.add_argument('--entities', default=','.join(ENTITIES))
+    parser.add_argument('--delta-pct', type=float, default=1.0, help="Taille du lot delta en %% des lignes")
+    parser.add_argument('--output', default=os.path.join(BENCH_DIR, 'results'))
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    revision = git_revision()
+    report = {'revision': revision, 'date': datetime.now().isoformat(timespec='seconds'), 'cases': []}
+    for entity in args.entities.split(','):
+        for size_mb in (float(size) for size in args.sizes.split(',')):
+            workdir = tempfile.mkdtemp(prefix='lakehouse_incremental_')
+            try:
+                case = run_case(entity, size_mb, args.delta_pct, workdir)
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+            report['cases'].append(case)
+            full, incremental = case['full_reload'], case['incremental']
+            print(f"{entity:<10} {size_mb:>7.0f}MB  complet {full['rows']:>10,} lignes {full['seconds']:>8.2f}s  "
+                  f"MERGE {incremental['rows']:>8,} lignes {incremental['seconds']:>8.2f}s  x{case['speedup']}")
+
+    os.makedirs(args.output, exist_ok=True)
+    result_path = os.path.join(args.output, f"{datetime.now():%Y%m%d_%H%M%S}_{revision}_incremental.json")
+    with open(result_path, 'w', encoding='utf-8') as result_file:
+        json.dump(report, result_file, indent=2, ensure_ascii=False)
+    print(f"Résultats enregistrés dans {result_path}")
+
+
+if __name__ == "__main__":
+    main()
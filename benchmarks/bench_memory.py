@@ -0,0 +1,185 @@
+"""
+Benchmark mémoire du moteur ligne : lots de lignes conservées vs lignes sérialisées au fil de l'eau.
+
+Pour chaque entité, génère les mêmes lignes (graine fixe) par lots de
+--batch-rows lignes vers un flux qui n'en garde que l'empreinte :
+- batch : chemin précédent, reproduit ici comme référence (liste des lignes
+  du lot, puis csv.writer dans un io.StringIO vidé et réutilisé à chaque lot)
+- compact : write_row_batch (lignes sérialisées dès leur génération, encodées
+  en UTF-8 dans le tampon du lot)
+
+Mesure le pic et le reliquat de mémoire allouée (tracemalloc), le nombre de
+collectes du ramasse-miettes par génération et la durée (passe sans
+tracemalloc). Les deux modes doivent écrire des octets identiques, ce que le
+benchmark vérifie. Le pic RSS de generate_entity.py (moteur ligne, processus
+dédié) est également relevé pour chaque taille de --sizes : il doit rester
+constant quelle que soit la taille cible.
+
+Usage:
+    python benchmarks/bench_memory.py [--rows 20000] [--batch-rows 10000] [--sizes 10,40]
+                                      [--entities employees,contract] [--output benchmarks/results]
+"""
+import argparse
+import csv
+import gc
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from run_benchmarks import BENCH_DIR, BENCH_SEED, ENTITIES, TOOLS_DIR, git_revision, load_entity
+
+from output_sinks import BudgetedCsvWriter
+from parallel_generation import write_row_batch
+
+
+class DigestStream:
+    """Flux binaire qui ne conserve que l'empreinte et la taille des octets écrits"""
+
+    def __init__(self):
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self.digest.update(data)
+        self.size += len(data)
+        return len(data)
+
+
+def write_batches(entity, stream: DigestStream, rows: int, batch_rows: int) -> None:
+    """Chemin précédent : lignes du lot conservées, puis sérialisées dans un StringIO réutilisé"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=';', quoting=csv.QUOTE_MINIMAL)
+    for first_id in range(1, rows + 1, batch_rows):
+        rows_batch = [entity.generate_row(row_id) for row_id in range(first_id, min(first_id + batch_rows, rows + 1))]
+        buffer.seek(0)
+        buffer.truncate()
+        for row in rows_batch:
+            writer.writerow(row)
+        stream.write(buffer.getvalue().encode('utf-8'))
+
+
+def write_compact(entity, stream: DigestStream, rows: int, batch_rows: int) -> None:
+    """Chemin compact : write_row_batch sur un BudgetedCsvWriter"""
+    writer = BudgetedCsvWriter(stream, None, target_rows=rows)
+    for first_id in range(1, rows + 1, batch_rows):
+        write_row_batch(writer, entity.generate_row, first_id, min(batch_rows, rows + 1 - first_id),
+                        len(entity.headers))
+
+
+MODES = {'batch': write_batches, 'compact': write_compact}
+
+
+def measure(entity, mode: str, rows: int, batch_rows: int) -> dict:
+    """Pic tracemalloc, collectes du ramasse-miettes et durée d'un mode"""
+    write = MODES[mode]
+    gc.collect()
+    collections = [generation['collections'] for generation in gc.get_stats()]
+    tracemalloc.start()
+    stream = DigestStream()
+    write(entity, stream, rows, batch_rows)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    collections = [generation['collections'] - before for generation, before in zip(gc.get_stats(), collections)]
+
+    # Durée sans le surcoût de tracemalloc
+    started = time.perf_counter()
+    write(entity, DigestStream(), rows, batch_rows)
+    seconds = time.perf_counter() - started
+    return {
+        'peak_traced_mb': round(peak / (1024 * 1024), 2),
+        'retained_traced_mb': round(current / (1024 * 1024), 2),
+        'gc_collections': collections,
+        'seconds': round(seconds, 3),
+        'rows_per_second': round(rows / seconds, 1),
+        'bytes': stream.size,
+        'digest': stream.digest.hexdigest(),
+    }
+
+
+def run_case(entity_name: str, rows: int, batch_rows: int) -> dict:
+    entity = load_entity(entity_name).ENTITY
+    entity.configure_seed(BENCH_SEED)
+    # Faker et les caches des stratégies sont construits hors mesure
+    entity.generate_row(1)
+    modes = {mode: measure(entity, mode, rows, batch_rows) for mode in MODES}
+    if modes['batch']['digest'] != modes['compact']['digest']:
+        raise RuntimeError(f"Sortie différente entre les modes pour {entity_name}")
+    return {
+        'entity': entity_name,
+        'rows': rows,
+        'batch_rows': batch_rows,
+        'modes': modes,
+        'peak_reduction': round(1 - modes['compact']['peak_traced_mb'] / modes['batch']['peak_traced_mb'], 3),
+    }
+
+
+def peak_rss_by_size(entity_name: str, sizes: list, workdir: str) -> dict:
+    """Pic RSS (MB) de generate_entity.py (moteur ligne) pour chaque taille cible en MB"""
+    peaks = {}
+    for size in sizes:
+        metrics_path = os.path.join(workdir, f"{entity_name}_{size}.json")
+        subprocess.run([sys.executable, os.path.join(TOOLS_DIR, 'generate_entity.py'), entity_name,
+                        '--size', f"{size:g}MB", '--seed', str(BENCH_SEED), '--output',
+                        os.path.join(workdir, f"{entity_name}_{size}.csv"), '--metrics-json', metrics_path],
+                       cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        with open(metrics_path, encoding='utf-8') as metrics_file:
+            peaks[f"{size:g}MB"] = round(json.load(metrics_file)['peak_rss_bytes'] / (1024 * 1024), 1)
+    return peaks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mémoire du moteur ligne : lots conservés vs lignes sérialisées")
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--batch-rows', type=int, default=10000)
+    parser.add_argument('--sizes', default='10,40', help="tailles cibles (MB) du relevé de pic RSS")
+    parser.add_argument('--entities', default=','.join(ENTITIES))
+    parser.add_argument('--output', default=os.path.join(BENCH_DIR, 'results'))
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    revision = git_revision()
+    sizes = [float(size) for size in args.sizes.split(',') if size]
+    entities = args.entities.split(',')
+    # Relevés RSS d'abord : un processus lancé hérite du pic RSS de son parent,
+    # qui doit rester léger (ni Faker ni tracemalloc chargés)
+    workdir = tempfile.mkdtemp(prefix='lakehouse_memory_')
+    try:
+        peaks = {entity_name: peak_rss_by_size(entity_name, sizes, workdir) for entity_name in entities}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results = []
+    for entity_name in entities:
+        case = run_case(entity_name, args.rows, args.batch_rows)
+        case['peak_rss_mb_by_size'] = peaks[entity_name]
+        results.append(case)
+        batch, compact = case['modes']['batch'], case['modes']['compact']
+        print(f"{entity_name} ({args.rows:,} lignes, lots de {args.batch_rows:,}): pic tracemalloc "
+              f"{batch['peak_traced_mb']:.1f} MB -> {compact['peak_traced_mb']:.1f} MB "
+              f"(-{case['peak_reduction']:.0%}), reliquat {batch['retained_traced_mb']:.1f} -> "
+              f"{compact['retained_traced_mb']:.1f} MB, collectes gc {batch['gc_collections']} -> "
+              f"{compact['gc_collections']}, {batch['rows_per_second']:,.0f} -> "
+              f"{compact['rows_per_second']:,.0f} lignes/s")
+        print("  pic RSS par taille: " + ', '.join(f"{size} {mb:.1f} MB"
+                                                  for size, mb in case['peak_rss_mb_by_size'].items()))
+
+    os.makedirs(args.output, exist_ok=True)
+    report = {'revision': revision, 'date': datetime.now().isoformat(timespec='seconds'),
+              'python': sys.version.split()[0], 'results': results}
+    result_path = os.path.join(args.output, f"{datetime.now():%Y%m%d_%H%M%S}_{revision}_memory.json")
+    with open(result_path, 'w', encoding='utf-8') as result_file:
+        json.dump(report, result_file, indent=2, ensure_ascii=False)
+    print(f"Résultats enregistrés dans {result_path}")
+
+
+if __name__ == "__main__":
+    main()
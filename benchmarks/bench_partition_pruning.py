@@ -0,0 +1,173 @@
+"""
+Benchmark local de l'élagage (pruning) par partitionnement et clustering.
+
+Pour chaque entité, un fichier est généré (moteur colonnaire, graine fixe)
+puis réparti en arborescence Hive (tools/hive_layout.py). Pour des requêtes
+filtrées typiques, le benchmark compte les octets analysés :
+- table externe CSV : fichier unique vs partitions Hive dt= retenues
+  (un CSV est lu en entier : taille des fichiers)
+- table ODS : non partitionnée, partitionnée par la date métier, puis
+  partitionnée et clusterisée (departement, statut). Les octets suivent la
+  facturation BigQuery (8 octets par INT64 / FLOAT64 / DATE / TIMESTAMP,
+  2 + longueur UTF-8 par STRING) sur les seules colonnes référencées ; le
+  clustering est émulé par des blocs de `--block-rows` lignes triés sur les
+  colonnes de clustering et écartés d'après leurs min/max.
+
+Les données sont chargées avec l'émulateur DuckDB (tools/local_loader.py).
+
+Usage:
+    python benchmarks/bench_partition_pruning.py [--size-mb 50] [--entities employees,contract]
+                                                 [--granularity month] [--block-rows 1000]
+                                                 [--output benchmarks/results]
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+from run_benchmarks import BENCH_DIR, BENCH_SEED, ENTITIES, git_revision, load_entity
+
+from hive_layout import GRANULARITIES, partition_dir, split_csv_to_hive
+from local_loader import LocalLoader, table_ref
+
+# Colonnes de partitionnement et de clustering des variantes ODS (voir tools/ddl_variants.py)
+PARTITION_COLUMNS = {'employees': 'date_embauche', 'contract': 'date_signature'}
+CLUSTER_COLUMNS = ('departement', 'statut')
+
+# Requêtes filtrées typiques : (nom, intervalle de dates ou None, filtres de clustering, colonnes lues)
+QUERIES = {
+    'employees': [
+        ('embauches_juin_2023', ('2023-06-01', '2023-06-30'), {}, ['id', 'nom', 'salaire', 'date_embauche']),
+        ('masse_salariale_it_2022', ('2022-01-01', '2022-12-31'), {'departement': 'IT'},
+         ['departement', 'statut', 'salaire', 'date_embauche']),
+        ('it_actifs', None, {'departement': 'IT', 'statut': 'actif'}, ['id', 'salaire', 'departement', 'statut']),
+    ],
+    'contract': [
+        ('signatures_t1_2024', ('2024-01-01', '2024-03-31'), {}, ['contract_id', 'montant_total', 'date_signature']),
+        ('finance_actifs_2023', ('2023-01-01', '2023-12-31'), {'departement': 'Finance', 'statut': 'actif'},
+         ['contract_id', 'montant_total', 'departement', 'statut', 'date_signature']),
+        ('support_en_cours', None, {'departement': 'Support', 'statut': 'en_cours'},
+         ['contract_id', 'montant_mensuel', 'departement', 'statut']),
+    ],
+}
+
+# Taille facturée des types à largeur fixe (octets)
+FIXED_SIZES = {'INT64': 8, 'FLOAT64': 8, 'DATE': 8, 'TIMESTAMP': 8, 'BOOL': 1}
+
+
+def column_bytes(name: str, column_type: str) -> str:
+    """Expression SQL : octets facturés d'une valeur"""
+    if column_type == 'STRING':
+        return f"coalesce(2 + strlen(\"{name}\"), 0)"
+    return str(FIXED_SIZES[column_type])
+
+
+def date_filter(column: str, interval) -> str:
+    return f"\"{column}\" BETWEEN DATE '{interval[0]}' AND DATE '{interval[1]}'" if interval else 'true'
+
+
+def hive_bytes(hive_dir: str, counts: dict, interval, granularity: str) -> int:
+    """Octets des fichiers des partitions dt= qui recoupent l'intervalle"""
+    total = 0
+    for value in counts:
+        if interval:
+            length = GRANULARITIES[granularity]
+            if not interval[0][:length] <= value[:length] <= interval[1][:length]:
+                continue
+        total += os.path.getsize(os.path.join(partition_dir(hive_dir, value), 'part-00000.csv'))
+    return total
+
+
+def run_entity(entity: str, size_mb: float, granularity: str, block_rows: int, workdir: str) -> dict:
+    module = load_entity(entity)
+    source = os.path.join(workdir, f"{entity}.csv")
+    module.generate_csv_file(source, size_mb, 'MB', engine='columnar', seed=BENCH_SEED)
+    partition_column = PARTITION_COLUMNS[entity]
+    hive_dir = os.path.join(workdir, f"{entity}_{partition_column}")
+    counts = split_csv_to_hive(source, hive_dir, partition_column, granularity)
+
+    loader = LocalLoader(':memory:')
+    try:
+        loader.load_data(entity, [source])
+        schema = module.SCHEMA_ODS
+        table = table_ref(f"02_ODS.{entity}")
+        cluster = ', '.join(f'"{name}"' for name in CLUSTER_COLUMNS)
+        partition_key = f"date_trunc('{granularity}', \"{partition_column}\")"
+        # Partition (date tronquée) et bloc de clustering de chaque ligne
+        loader.connection.execute(
+            f"CREATE TABLE layout AS SELECT *, {partition_key} AS partition_key, "
+            f"(row_number() OVER (PARTITION BY {partition_key} ORDER BY {cluster}) - 1) // {block_rows} AS block "
+            f"FROM {table}")
+
+        queries = []
+        for name, interval, filters, columns in QUERIES[entity]:
+            row_bytes = ' + '.join(column_bytes(column, schema[column]['type']) for column in columns)
+            partitions = (f"partition_key IN (SELECT DISTINCT partition_key FROM layout "
+                          f"WHERE {date_filter(partition_column, interval)})")
+            blocks = ' AND '.join([partitions] + [f"min_{column} <= '{value}' AND max_{column} >= '{value}'"
+                                                  for column, value in filters.items()])
+            bounds = ', '.join(f"min(\"{column}\") AS min_{column}, max(\"{column}\") AS max_{column}"
+                               for column in CLUSTER_COLUMNS)
+            scanned = loader.connection.execute(f"""
+                SELECT
+                    (SELECT sum({row_bytes}) FROM layout),
+                    (SELECT sum({row_bytes}) FROM layout WHERE {partitions}),
+                    (SELECT sum(bytes) FROM (
+                        SELECT partition_key, sum({row_bytes}) AS bytes, {bounds}
+                        FROM layout GROUP BY partition_key, block) WHERE {blocks})
+            """).fetchone()
+            csv_full = os.path.getsize(source)
+            csv_hive = hive_bytes(hive_dir, counts, interval, granularity)
+            queries.append({
+                'query': name,
+                'csv_bytes': csv_full,
+                'csv_hive_bytes': csv_hive,
+                'ods_bytes': int(scanned[0] or 0),
+                'ods_partitioned_bytes': int(scanned[1] or 0),
+                'ods_partitioned_clustered_bytes': int(scanned[2] or 0),
+            })
+    finally:
+        loader.close()
+
+    return {'entity': entity, 'size_mb': size_mb, 'partition_column': partition_column,
+            'granularity': granularity, 'partitions': len(counts), 'block_rows': block_rows, 'queries': queries}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Octets analysés avec et sans élagage de partitions")
+    parser.add_argument('--size-mb', type=float, default=50)
+    parser.add_argument('--entities', default=','.join(ENTITIES))
+    parser.add_argument('--granularity', choices=list(GRANULARITIES), default='month')
+    parser.add_argument('--block-rows', type=int, default=1000, help="Lignes par bloc de clustering émulé")
+    parser.add_argument('--output', default=os.path.join(BENCH_DIR, 'results'))
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    revision = git_revision()
+    report = {'revision': revision, 'date': datetime.now().isoformat(timespec='seconds'), 'entities': []}
+    for entity in args.entities.split(','):
+        workdir = tempfile.mkdtemp(prefix='lakehouse_pruning_')
+        try:
+            result = run_entity(entity, args.size_mb, args.granularity, args.block_rows, workdir)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        report['entities'].append(result)
+        print(f"{entity}: {result['partitions']} partitions {result['partition_column']} ({args.granularity})")
+        print(f"  {'requête':<26} {'CSV':>9} {'CSV Hive':>9} {'ODS':>9} {'ODS part.':>10} {'part.+clust.':>12}")
+        for query in result['queries']:
+            mb = [query[key] / (1024 * 1024) for key in ('csv_bytes', 'csv_hive_bytes', 'ods_bytes',
+                                                          'ods_partitioned_bytes', 'ods_partitioned_clustered_bytes')]
+            print(f"  {query['query']:<26} {mb[0]:>8.2f}M {mb[1]:>8.2f}M {mb[2]:>8.2f}M {mb[3]:>9.2f}M {mb[4]:>11.2f}M")
+
+    os.makedirs(args.output, exist_ok=True)
+    result_path = os.path.join(args.output, f"{datetime.now():%Y%m%d_%H%M%S}_{revision}_pruning.json")
+    with open(result_path, 'w', encoding='utf-8') as result_file:
+        json.dump(report, result_file, indent=2, ensure_ascii=False)
+    print(f"Résultats enregistrés dans {result_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark de l'écriture en pipeline (generate_csv_file(pipeline=True)).
+
+Pour chaque entité, moteur et format, génère le même fichier (graine fixe)
+en écriture séquentielle et avec le thread d'écriture : durée totale, gain,
+temps de génération et d'écriture, efficacité du recouvrement et goulot (CPU
+ou E/S). Une génération réduite non mesurée prépare d'abord Faker et les pools
+du cas, puis les deux modes sont alternés --repeat fois (meilleur temps
+conservé) : aucun mode ne paie seul les coûts de démarrage. Le contenu doit être identique dans les deux modes, ce que le
+benchmark vérifie sur le CSV décompressé.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--size-mb 20] [--repeat 3] [--entities employees,contract]
+                                        [--engines row,columnar] [--formats csv,csv.gz,csv.zst]
+                                        [--output benchmarks/results]
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+from run_benchmarks import BENCH_DIR, BENCH_SEED, ENTITIES, git_revision, load_entity
+
+from output_sinks import format_filename
+
+
+def content_digest(path: str, output_format: str) -> str:
+    """Empreinte du CSV non compressé (l'en-tête gzip contient la date d'écriture)"""
+    if output_format == 'csv.gz':
+        stream = gzip.open(path, 'rb')
+    elif output_format == 'csv.zst':
+        import zstandard
+        stream = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    else:
+        stream = open(path, 'rb')
+    digest = hashlib.sha256()
+    with stream:
+        for chunk in iter(lambda: stream.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Taille (MB) de la génération non mesurée qui précède chaque cas
+WARM_UP_SIZE_MB = 1
+
+
+def generate(module, path: str, size_mb: float, engine: str, output_format: str, pipeline: bool) -> float:
+    """Génère un fichier (graine fixe) et retourne la durée en secondes"""
+    started = time.perf_counter()
+    if not module.generate_csv_file(path, size_mb, 'MB', engine=engine, output_format=output_format,
+                                    seed=BENCH_SEED, pipeline=pipeline):
+        raise RuntimeError(f"Échec de génération {module.ENTITY.name} {engine} {output_format}")
+    return time.perf_counter() - started
+
+
+def run_case(entity: str, engine: str, output_format: str, size_mb: float, workdir: str,
+             repeat: int = 3) -> dict:
+    module = load_entity(entity)
+    # Génération non mesurée : chargement de Faker / NumPy et construction des pools
+    warm_up_path = format_filename(os.path.join(workdir, f"{entity}_{engine}_warm_up"), output_format)
+    generate(module, warm_up_path, min(size_mb, WARM_UP_SIZE_MB), engine, output_format, pipeline=False)
+    os.remove(warm_up_path)
+
+    runs = {}
+    for _ in range(repeat):
+        for pipeline in (False, True):
+            path = format_filename(os.path.join(workdir, f"{entity}_{engine}_{pipeline}"), output_format)
+            seconds = generate(module, path, size_mb, engine, output_format, pipeline)
+            if pipeline not in runs or seconds < runs[pipeline]['seconds']:
+                runs[pipeline] = {'seconds': round(seconds, 3), 'digest': content_digest(path, output_format),
+                                  'stats': module.ENTITY.pipeline_stats}
+            os.remove(path)
+    if runs[False]['digest'] != runs[True]['digest']:
+        raise RuntimeError(f"Sortie différente en pipeline pour {entity} {engine} {output_format}")
+    stats = runs[True]['stats']
+    return {
+        'entity': entity,
+        'engine': engine,
+        'format': output_format,
+        'size_mb': size_mb,
+        'repeat': repeat,
+        'sequential_seconds': runs[False]['seconds'],
+        'pipeline_seconds': runs[True]['seconds'],
+        'speedup': round(runs[False]['seconds'] / runs[True]['seconds'], 3),
+        'pipeline': stats,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Écriture séquentielle vs pipeline (thread d'écriture)")
+    parser.add_argument('--size-mb', type=float, default=20)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--entities', default=','.join(ENTITIES))
+    parser.add_argument('--engines', default='row,columnar')
+    parser.add_argument('--formats', default='csv,csv.gz,csv.zst')
+    parser.add_argument('--output', default=os.path.join(BENCH_DIR, 'results'))
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    revision = git_revision()
+    report = {'revision': revision, 'date': datetime.now().isoformat(timespec='seconds'),
+              'cpu_count': os.cpu_count(), 'cases': []}
+    workdir = tempfile.mkdtemp(prefix='lakehouse_pipeline_')
+    try:
+        for entity in args.entities.split(','):
+            for engine in args.engines.split(','):
+                for output_format in args.formats.split(','):
+                    case = run_case(entity, engine, output_format, args.size_mb, workdir, args.repeat)
+                    report['cases'].append(case)
+                    stats = case['pipeline']
+                    print(f"{entity:<10} {engine:<8} {output_format:<8} séquentiel {case['sequential_seconds']:>7.2f}s  "
+                          f"pipeline {case['pipeline_seconds']:>7.2f}s  x{case['speedup']:.2f}  "
+                          f"génération {stats['generation_seconds']:.2f}s  écriture {stats['write_seconds']:.2f}s  "
+                          f"recouvrement {stats['overlap_efficiency']:.0%}  ({stats['bound']})")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    os.makedirs(args.output, exist_ok=True)
+    result_path = os.path.join(args.output, f"{datetime.now():%Y%m%d_%H%M%S}_{revision}_pipeline.json")
+    with open(result_path, 'w', encoding='utf-8') as result_file:
+        json.dump(report, result_file, indent=2, ensure_ascii=False)
+    print(f"Résultats enregistrés dans {result_path}")
+
+
+if __name__ == "__main__":
+    main()
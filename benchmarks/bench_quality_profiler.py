@@ -0,0 +1,82 @@
+"""
+Benchmark du contrôle qualité (tools/quality_profiler.py).
+
+Pour chaque entité et taille, génère un fichier (moteur colonnaire, graine
+fixe) puis le profile avec 1 processus et avec `--workers` processus :
+débit (MB/s, lignes/s) et extrapolation du temps de contrôle d'un fichier de
+5GB. Le profil doit être identique quel que soit le nombre de processus
+(lignes, erreurs), ce que le benchmark vérifie.
+
+Usage:
+    python benchmarks/bench_quality_profiler.py [--sizes 100,500] [--entities employees,contract]
+                                                [--workers 4] [--output benchmarks/results]
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+from run_benchmarks import BENCH_DIR, BENCH_SEED, ENTITIES, git_revision, load_entity
+
+from quality_profiler import profile_file
+
+GB5 = 5 * 1024 * 1024 * 1024
+
+
+def run_case(entity: str, size_mb: float, workers: int, workdir: str) -> dict:
+    module = load_entity(entity)
+    path = os.path.join(workdir, f"{entity}_{size_mb}mb.csv")
+    module.generate_csv_file(path, size_mb, 'MB', engine='columnar', seed=BENCH_SEED)
+    runs = {}
+    for count in sorted({1, workers}):
+        report = profile_file(path, module.SCHEMA_ODS, count)
+        runs[count] = {
+            'workers': count,
+            'rows': report['rows'],
+            'errors': report['errors'],
+            'seconds': report['seconds'],
+            'mb_per_s': round(report['bytes'] / (1024 * 1024) / report['seconds'], 2),
+            'rows_per_s': round(report['rows'] / report['seconds']),
+            'seconds_for_5gb': round(GB5 / report['bytes'] * report['seconds'], 1),
+        }
+    if len({(run['rows'], run['errors']) for run in runs.values()}) != 1:
+        raise RuntimeError(f"Profils différents selon le nombre de processus pour {entity}")
+    return {'entity': entity, 'size_mb': size_mb, 'runs': list(runs.values())}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Débit du contrôle qualité des fichiers")
+    parser.add_argument('--sizes', default='100,500', help="Tailles des fichiers en MB")
+    parser.add_argument('--entities', default=','.join(ENTITIES))
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--output', default=os.path.join(BENCH_DIR, 'results'))
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    revision = git_revision()
+    report = {'revision': revision, 'date': datetime.now().isoformat(timespec='seconds'), 'cases': []}
+    for entity in args.entities.split(','):
+        for size_mb in (float(size) for size in args.sizes.split(',')):
+            workdir = tempfile.mkdtemp(prefix='lakehouse_quality_')
+            try:
+                case = run_case(entity, size_mb, args.workers, workdir)
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+            report['cases'].append(case)
+            for run in case['runs']:
+                print(f"{entity:<10} {size_mb:>7.0f}MB  {run['workers']:>2} processus  {run['seconds']:>7.2f}s  "
+                      f"{run['mb_per_s']:>7.1f} MB/s  {run['rows_per_s']:>9,} lignes/s  "
+                      f"5GB ≈ {run['seconds_for_5gb']:.0f}s")
+
+    os.makedirs(args.output, exist_ok=True)
+    result_path = os.path.join(args.output, f"{datetime.now():%Y%m%d_%H%M%S}_{revision}_quality.json")
+    with open(result_path, 'w', encoding='utf-8') as result_file:
+        json.dump(report, result_file, indent=2, ensure_ascii=False)
+    print(f"Résultats enregistrés dans {result_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Benchmark du nettoyage des colonnes STRING : clean_field par cellule vs clean_column par colonne.
+
+Pour chaque entité, les valeurs brutes de --rows lignes (graine fixe) sont
+nettoyées colonne par colonne selon trois chemins :
+- cellule : clean_field(str(valeur), max_length) sur chaque valeur (chemin précédent)
+- colonne : clean_column (str.replace enchaînés sur la colonne jointe
+  lorsque peu de valeurs sont touchées, sinon valeur par valeur ; aucun
+  remplacement sans délimiteur ni fin de ligne, strip, troncature seulement
+  si nécessaire)
+- omise : colonnes dont la stratégie ne produit que des valeurs propres
+  (listes de référence, UUID), non revalidées par le moteur ligne
+
+Une variante « sale » de chaque colonne texte libre (délimiteurs, fins de
+ligne, espaces en bordure injectés) exerce le chemin de remplacement. Les
+chemins doivent produire des valeurs identiques, et le validateur de ligne du
+moteur (colonnes propres omises) des octets CSV identiques au validateur
+complet, ce que le benchmark vérifie.
+
+Usage:
+    python benchmarks/bench_sanitizer.py [--rows 20000] [--entities employees,contract]
+                                         [--output benchmarks/results]
+"""
+import argparse
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+from run_benchmarks import BENCH_DIR, BENCH_SEED, ENTITIES, git_revision, load_entity
+
+from schema_compiler import clean_column, clean_field
+
+# Nombre de répétitions (on retient la meilleure mesure de chaque chemin)
+REPEAT = 5
+
+# Une valeur sur DIRTY_EVERY reçoit des caractères à nettoyer dans la variante « sale »
+DIRTY_EVERY = 7
+
+
+def best_time(function, *args):
+    """Meilleur temps sur REPEAT passes, et résultat de la dernière passe"""
+    best = float('inf')
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def clean_cells(values, max_length):
+    return [clean_field(str(value), max_length) for value in values]
+
+
+def dirty(values):
+    """Variante de la colonne avec délimiteurs, fins de ligne et espaces en bordure injectés"""
+    return [f" {value};\r\n{value} " if index % DIRTY_EVERY == 0 else value
+            for index, value in enumerate(map(str, values))]
+
+
+def csv_digest(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, delimiter=';', quoting=csv.QUOTE_MINIMAL).writerows(rows)
+    return hashlib.sha256(buffer.getvalue().encode('utf-8')).hexdigest()
+
+
+def bench_column(values, max_length, skipped: bool) -> dict:
+    cell_seconds, cells = best_time(clean_cells, values, max_length)
+    column_seconds, column = best_time(clean_column, values, max_length)
+    if column != cells:
+        raise RuntimeError("clean_column diverge de clean_field")
+    result = {
+        'cell_seconds': round(cell_seconds, 5),
+        'column_seconds': round(column_seconds, 5),
+        'speedup': round(cell_seconds / column_seconds, 1),
+        'skipped_by_row_engine': skipped,
+    }
+    if skipped and cells != list(values):
+        raise RuntimeError("Colonne omise dont les valeurs ne sont pas propres")
+    return result
+
+
+def run_case(entity_name: str, rows: int) -> dict:
+    entity = load_entity(entity_name).ENTITY
+    entity.configure_seed(BENCH_SEED)
+    raw_rows = [entity.generate_raw_data(row_id) for row_id in range(1, rows + 1)]
+
+    columns = {}
+    for name, schema in entity.schema_ods.items():
+        if schema['type'] != 'STRING':
+            continue
+        values = [raw[name] for raw in raw_rows]
+        max_length = schema.get('max_length')
+        skipped = entity.strategies[name].clean_values
+        columns[name] = bench_column(values, max_length, skipped)
+        if not skipped:
+            columns[f"{name} (sale)"] = bench_column(dirty(values), max_length, False)
+
+    # Validateur complet vs validateur du moteur ligne (colonnes propres omises)
+    full_seconds, full_rows = best_time(lambda: [entity.validate_row(raw, row_id)
+                                                 for row_id, raw in enumerate(raw_rows, 1)])
+    drawn_seconds, drawn_rows = best_time(lambda: [entity._validate_drawn(raw, row_id)
+                                                   for row_id, raw in enumerate(raw_rows, 1)])
+    digest = csv_digest(full_rows)
+    if csv_digest(drawn_rows) != digest:
+        raise RuntimeError(f"Sortie différente entre les validateurs pour {entity_name}")
+    return {
+        'entity': entity_name,
+        'rows': rows,
+        'columns': columns,
+        'validate_row': {
+            'full_rows_per_second': round(rows / full_seconds, 1),
+            'skip_clean_rows_per_second': round(rows / drawn_seconds, 1),
+            'speedup': round(full_seconds / drawn_seconds, 2),
+            'digest': digest,
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Nettoyage des STRING : clean_field par cellule vs clean_column")
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--entities', default=','.join(ENTITIES))
+    parser.add_argument('--output', default=os.path.join(BENCH_DIR, 'results'))
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    revision = git_revision()
+    results = []
+    for entity_name in args.entities.split(','):
+        case = run_case(entity_name, args.rows)
+        results.append(case)
+        print(f"{entity_name} ({args.rows:,} lignes)")
+        for name, column in case['columns'].items():
+            skipped = ", omise par le moteur ligne" if column['skipped_by_row_engine'] else ""
+            print(f"  {name:<28} cellule {column['cell_seconds'] * 1000:7.2f} ms   colonne "
+                  f"{column['column_seconds'] * 1000:7.2f} ms   x{column['speedup']:.1f}{skipped}")
+        validation = case['validate_row']
+        print(f"  validate_row: {validation['full_rows_per_second']:,.0f} -> "
+              f"{validation['skip_clean_rows_per_second']:,.0f} lignes/s (x{validation['speedup']:.2f}), "
+              f"sortie identique")
+
+    os.makedirs(args.output, exist_ok=True)
+    report = {'revision': revision, 'date': datetime.now().isoformat(timespec='seconds'),
+              'python': sys.version.split()[0], 'results': results}
+    result_path = os.path.join(args.output, f"{datetime.now():%Y%m%d_%H%M%S}_{revision}_sanitizer.json")
+    with open(result_path, 'w', encoding='utf-8') as result_file:
+        json.dump(report, result_file, indent=2, ensure_ascii=False)
+    print(f"Résultats enregistrés dans {result_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Micro-benchmark : validate_field cellule par cellule vs validateur de ligne compilé.
+
+Mesure les lignes/s de la validation seule (valeurs brutes pré-générées) pour
+les deux générateurs, et vérifie que les deux chemins produisent des lignes
+strictement identiques, y compris sur des valeurs hors bornes ou invalides.
+
+Usage: python benchmarks/bench_schema_validator.py [nb_lignes]
+"""
+import logging
+import os
+import sys
+import time
+
+# Nombre de répétitions (on retient la meilleure mesure de chaque chemin)
+REPEAT = 5
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tools'))
+
+import generate_contract_csv  # noqa: E402
+import generate_employees_csv  # noqa: E402
+
+# Valeurs limites injectées pour vérifier l'équivalence sémantique
+EDGE_VALUES = [None, '', 'abc', 'x;y\nz\r', '  padded  ', -1e12, 1e12, 0, '12', 3.14159265358979, 'é' * 600]
+
+
+def validate_legacy(module, raw_data, row_id):
+    """Boucle de validation d'origine de generate_row (validate_field par cellule)"""
+    validated_row = []
+    for field_name in module.SCHEMA_ODS.keys():
+        validated_value = module.validate_field(field_name, raw_data[field_name])
+        if validated_value is None:
+            module.logger.error(f"Validation échouée pour {field_name} à la ligne {row_id}")
+            validated_value = ''
+        validated_row.append(validated_value)
+    return validated_row
+
+
+def best_time(validate, raw_rows):
+    """Meilleur temps sur REPEAT passes, et lignes validées de la dernière passe"""
+    best = float('inf')
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        rows = [validate(raw, row_id) for row_id, raw in enumerate(raw_rows, 1)]
+        best = min(best, time.perf_counter() - start)
+    return best, rows
+
+
+def bench(module, raw_rows):
+    """Retourne (lignes/s avant, lignes/s après)"""
+    legacy_time, legacy_rows = best_time(lambda raw, row_id: validate_legacy(module, raw, row_id), raw_rows)
+    compiled_time, compiled_rows = best_time(module.validate_row, raw_rows)
+
+    assert legacy_rows == compiled_rows, "Le validateur compilé diverge de validate_field"
+    return len(raw_rows) / legacy_time, len(raw_rows) / compiled_time
+
+
+def check_edge_values(module):
+    """Compare les deux chemins sur des valeurs limites pour chaque colonne"""
+    logging.disable(logging.CRITICAL)
+    try:
+        for field_name in module.SCHEMA_ODS:
+            for value in EDGE_VALUES:
+                raw = dict(module.generate_raw_data(1), **{field_name: value})
+                legacy = validate_legacy(module, raw, 1)
+                compiled = module.validate_row(raw, 1)
+                assert legacy == compiled and list(map(type, legacy)) == list(map(type, compiled)), \
+                    f"Divergence sur {field_name}={value!r}"
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+if __name__ == "__main__":
+    nb_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    for module in (generate_employees_csv, generate_contract_csv):
+        check_edge_values(module)
+        raw_rows = [module.generate_raw_data(row_id) for row_id in range(1, nb_rows + 1)]
+        before, after = bench(module, raw_rows)
+        print(f"{module.__name__:<24} validate_field: {before:>10,.0f} lignes/s   "
+              f"compilé: {after:>10,.0f} lignes/s   x{after / before:.1f}")
@@ -0,0 +1,143 @@
+"""
+Benchmark du démarrage des générateurs (imports, aide, fichier 5MB, workers).
+
+Mesure, chaque commande dans un processus neuf (meilleur temps sur --repeat) :
+- le temps d'import de entity_generator relevé par `python -X importtime`,
+  les modules les plus coûteux et la présence de NumPy / Faker, comparé au
+  budget IMPORT_BUDGET_MS (code de sortie 1 en cas de dépassement)
+- l'affichage de l'aide (generate_employees_csv.py sans argument)
+- la génération 5MB (moteur ligne puis colonnaire), cas des tests de fumée
+  lancés par les ordonnanceurs
+- le délai de démarrage de --workers workers jusqu'à leur première tâche,
+  à chaud (contexte worker_context, état préparé par warm_up) et à froid (spawn)
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 5] [--workers 2]
+                                       [--budget-ms 150] [--output benchmarks/results]
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
+
+from run_benchmarks import BENCH_DIR, BENCH_SEED, TOOLS_DIR, git_revision
+
+from entity_generator import load_entity
+from parallel_generation import worker_context
+from seeding import block_rng
+
+# Budget du temps d'import cumulé de entity_generator (python -X importtime)
+IMPORT_BUDGET_MS = 150
+
+# Modules lourds chargés seulement à leur premier usage
+LAZY_MODULES = ('numpy', 'faker')
+
+# Modules les plus coûteux conservés dans le rapport
+IMPORT_TOP = 10
+
+
+def best_of(repeat: int, command: list, cwd: str) -> float:
+    """Meilleur temps (secondes) d'une commande lancée dans un nouveau processus"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def import_profile(module: str) -> dict:
+    """Temps d'import cumulé (ms) de `module`, modules les plus coûteux et modules lourds chargés"""
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"], cwd=TOOLS_DIR,
+                            capture_output=True, text=True, check=True).stderr
+    # Lignes "import time: <self us> | <cumulé us> | <module indenté>"
+    cumulative = {}
+    for line in output.splitlines()[1:]:
+        _, cumulative_us, name = line.split('|')
+        cumulative[name.strip()] = int(cumulative_us)
+    top_level = {name: us for name, us in cumulative.items() if '.' not in name}
+    return {
+        'import_ms': round(cumulative[module] / 1000, 1),
+        'top_modules_ms': {name: round(us / 1000, 1) for name, us in
+                           sorted(top_level.items(), key=lambda item: -item[1])[1:IMPORT_TOP + 1]},
+        'lazy_modules_loaded': [name for name in LAZY_MODULES if name in cumulative],
+    }
+
+
+def worker_startup(workers: int, warm: bool) -> float:
+    """Délai (secondes) jusqu'à la première tâche exécutée par chacun des `workers` workers"""
+    entity = load_entity('employees')
+    entity.configure_seed(BENCH_SEED)
+    if warm:
+        entity.warm_up('columnar')
+        context = worker_context()
+    else:
+        context = multiprocessing.get_context('spawn')
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=partial(entity.configure_seed, pool_size=None),
+                             initargs=(BENCH_SEED,)) as pool:
+        # Une tâche colonnaire par worker : pools Faker prêts ou à construire
+        list(pool.map(entity.generate_block, [1] * workers, [1] * workers,
+                      [block_rng(BENCH_SEED, index) for index in range(workers)]))
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Temps de démarrage des générateurs")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--budget-ms', type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument('--output', default=os.path.join(BENCH_DIR, 'results'))
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    revision = git_revision()
+    imports = import_profile('entity_generator')
+    imports['budget_ms'] = args.budget_ms
+    imports['within_budget'] = imports['import_ms'] <= args.budget_ms
+
+    workdir = tempfile.mkdtemp(prefix='lakehouse_startup_')
+    script = os.path.join(TOOLS_DIR, 'generate_employees_csv.py')
+    smoke = [sys.executable, script, '5MB', '--seed', str(BENCH_SEED)]
+    commands = {
+        'interpreter': [sys.executable, '-c', 'pass'],
+        'usage': [sys.executable, script],
+        'smoke_row': smoke,
+        'smoke_columnar': smoke + ['--engine', 'columnar'],
+    }
+    try:
+        wall = {name: round(best_of(args.repeat, command, workdir), 3) for name, command in commands.items()}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    workers = {mode: round(worker_startup(args.workers, mode == 'warm'), 3) for mode in ('warm', 'cold')}
+
+    report = {'revision': revision, 'date': datetime.now().isoformat(timespec='seconds'),
+              'python': sys.version.split()[0], 'imports': imports, 'wall_seconds': wall,
+              'worker_startup_seconds': {'workers': args.workers, **workers}}
+    print(f"import entity_generator {imports['import_ms']:.1f} ms (budget {args.budget_ms:.0f} ms, "
+          f"{'OK' if imports['within_budget'] else 'DÉPASSÉ'}) ; chargés à l'import : "
+          f"{', '.join(imports['lazy_modules_loaded']) or 'ni NumPy ni Faker'}")
+    print('  ' + ', '.join(f"{name} {ms:.1f} ms" for name, ms in imports['top_modules_ms'].items()))
+    print('  '.join(f"{name} {seconds:.3f}s" for name, seconds in wall.items()))
+    print(f"{args.workers} workers prêts : à chaud {workers['warm']:.3f}s, à froid (spawn) {workers['cold']:.3f}s")
+
+    os.makedirs(args.output, exist_ok=True)
+    result_path = os.path.join(args.output, f"{datetime.now():%Y%m%d_%H%M%S}_{revision}_startup.json")
+    with open(result_path, 'w', encoding='utf-8') as result_file:
+        json.dump(report, result_file, indent=2, ensure_ascii=False)
+    print(f"Résultats enregistrés dans {result_path}")
+    sys.exit(0 if imports['within_budget'] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Compare deux fichiers de résultats de benchmarks/run_benchmarks.py.
+
+Affiche, pour chaque fonction et chaque cas (entité, moteur, taille), le débit
+avant/après et le ratio, et signale les régressions au-delà du seuil.
+
+Usage: python benchmarks/compare_results.py <avant.json> <après.json> [seuil_pct]
+"""
+import json
+import sys
+
+# Baisse de débit (en %) au-delà de laquelle un cas est signalé
+DEFAULT_THRESHOLD_PCT = 10.0
+
+
+def load(path: str) -> dict:
+    with open(path, 'r', encoding='utf-8') as result_file:
+        return json.load(result_file)
+
+
+def compare(label: str, before: float, after: float, threshold_pct: float) -> bool:
+    """Affiche une ligne de comparaison ; retourne True en cas de régression"""
+    ratio = after / before if before else float('inf')
+    regression = ratio < 1 - threshold_pct / 100
+    flag = '⚠️ régression' if regression else ''
+    print(f"{label:<44} {before:>12,.0f} -> {after:>12,.0f}  x{ratio:.2f} {flag}")
+    return regression
+
+
+def main() -> int:
+    if len(sys.argv) < 3:
+        print(__doc__)
+        return 2
+
+    before, after = load(sys.argv[1]), load(sys.argv[2])
+    threshold_pct = float(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_THRESHOLD_PCT
+    print(f"Comparaison {before['revision']} -> {after['revision']} (seuil {threshold_pct:.0f}%)")
+    regressions = 0
+
+    for entity, results in after['functions'].items():
+        previous = {result['function']: result for result in before['functions'].get(entity, [])}
+        for result in results:
+            if result['function'] in previous:
+                regressions += compare(f"{entity} {result['function']} (appels/s)",
+                                       previous[result['function']]['calls_per_second'],
+                                       result['calls_per_second'], threshold_pct)
+
+    previous_cases = {(case['entity'], case['engine'], case['size_mb'], case.get('pool_size')): case
+                      for case in before['cases']}
+    for case in after['cases']:
+        key = (case['entity'], case['engine'], case['size_mb'], case.get('pool_size'))
+        if key in previous_cases:
+            regressions += compare(f"{key[0]} {key[1]} {key[2]}MB (lignes/s)",
+                                   previous_cases[key]['rows_per_second'], case['rows_per_second'], threshold_pct)
+            print(f"{'':<44} RSS {previous_cases[key]['peak_rss_mb']:.1f}MB -> {case['peak_rss_mb']:.1f}MB")
+
+    print(f"{regressions} régression(s) détectée(s)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
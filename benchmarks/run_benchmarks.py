@@ -0,0 +1,253 @@
+"""
+Suite de benchmarks locale des générateurs CSV (employees, contract).
+
+Mesure, hors ligne et sans GCP :
+- les fonctions unitaires : generate_row, generate_raw_data, validate_field,
+  validate_row, clean_field, estimate_rows_needed (appels/s)
+- generate_csv_file pour chaque entité, moteur et taille : lignes/s, MB/s,
+  pic de mémoire (RSS) et répartition du temps par fonction (cProfile)
+
+Chaque génération tourne dans un processus dédié pour isoler le pic RSS. Les
+résultats sont enregistrés en JSON (un fichier par exécution, avec le commit
+git courant) et comparables avec benchmarks/compare_results.py.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--sizes 1,5,20] [--engines row,columnar]
+                                        [--entities employees,contract] [--pool-size N]
+                                        [--output benchmarks/results]
+"""
+import argparse
+import cProfile
+import importlib
+import json
+import logging
+import os
+import platform
+import pstats
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+TOOLS_DIR = os.path.join(BENCH_DIR, '..', 'tools')
+sys.path.insert(0, TOOLS_DIR)
+
+ENTITIES = {
+    'employees': 'generate_employees_csv',
+    'contract': 'generate_contract_csv',
+}
+
+# Graine fixe : les mêmes lignes sont générées d'une exécution à l'autre
+BENCH_SEED = 20250903
+
+# Nombre d'appels des benchmarks unitaires
+FUNCTION_ROWS = 2000
+
+# Nombre de lignes de la passe profilée (répartition du temps par fonction)
+PROFILE_ROWS = 5000
+
+# Nombre de fonctions conservées dans la répartition du temps
+PROFILE_TOP = 15
+
+
+def load_entity(entity: str):
+    """Importe le module générateur d'une entité"""
+    return importlib.import_module(ENTITIES[entity])
+
+
+def peak_rss_mb() -> float:
+    """Pic de mémoire résidente du processus courant, en MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en octets sous macOS, en KB sous Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def timed(label: str, calls: int, fn) -> dict:
+    """Exécute fn() et retourne le temps et le débit pour `calls` appels"""
+    start = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - start
+    return {'function': label, 'calls': calls, 'seconds': round(seconds, 6),
+            'calls_per_second': round(calls / seconds, 1)}
+
+
+def bench_functions(entity: str) -> list:
+    """Benchmarks unitaires des fonctions d'une entité"""
+    module = load_entity(entity)
+    module.configure_seed(BENCH_SEED)
+    row_ids = range(1, FUNCTION_ROWS + 1)
+    raw_rows = [module.generate_raw_data(row_id) for row_id in row_ids]
+    cells = [(name, raw[name]) for raw in raw_rows for name in module.SCHEMA_ODS]
+    strings = [value for _, value in cells if isinstance(value, str)]
+
+    results = [
+        timed('generate_row', FUNCTION_ROWS, lambda: [module.generate_row(row_id) for row_id in row_ids]),
+        timed('generate_raw_data', FUNCTION_ROWS, lambda: [module.generate_raw_data(row_id) for row_id in row_ids]),
+        timed('validate_field', len(cells), lambda: [module.validate_field(name, value) for name, value in cells]),
+        timed('validate_row', FUNCTION_ROWS, lambda: [module.validate_row(raw, 1) for raw in raw_rows]),
+        timed('clean_field', len(strings), lambda: [module.clean_field(value, 100) for value in strings]),
+    ]
+    with open(os.devnull, 'w') as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            results.append(timed('estimate_rows_needed', 1, lambda: module.estimate_rows_needed(5)))
+        finally:
+            sys.stdout = stdout
+    return results
+
+
+def profile_split(profiler: cProfile.Profile) -> dict:
+    """
+    Répartition du temps d'une passe profilée, en part du total :
+    - 'self' : temps propre (tottime) des fonctions les plus coûteuses, toutes confondues
+    - 'tools' : temps cumulé (cumtime) des fonctions du dépôt (tools/)
+    """
+    stats = pstats.Stats(profiler)
+    total = stats.total_tt or 1.0
+    tools_dir = os.path.realpath(TOOLS_DIR)
+    own, tools = [], []
+    for (filename, _, name), (_, _, tottime, cumtime, _) in stats.stats.items():
+        location = os.path.basename(filename) if filename != '~' else 'builtins'
+        label = f"{location}:{name}"
+        own.append({'function': label, 'seconds': round(tottime, 6), 'share': round(tottime / total, 4)})
+        if os.path.dirname(os.path.realpath(filename)) == tools_dir:
+            tools.append({'function': label, 'seconds': round(cumtime, 6), 'share': round(cumtime / total, 4)})
+    own.sort(key=lambda entry: entry['seconds'], reverse=True)
+    tools.sort(key=lambda entry: entry['seconds'], reverse=True)
+    return {'self': own[:PROFILE_TOP], 'tools': tools[:PROFILE_TOP]}
+
+
+def run_case(entity: str, engine: str, size_mb: float, workdir: str, pool_size: Optional[int] = None) -> dict:
+    """
+    Génère un fichier (mesure) puis un échantillon profilé ; exécuté dans un processus dédié.
+    `pool_size` active les pools Faker en cache disque (chargés ou construits avant la mesure).
+    """
+    logging.disable(logging.CRITICAL)
+    module = load_entity(entity)
+    path = os.path.join(workdir, f"{entity}_{engine}_{size_mb}mb.csv")
+
+    with open(os.devnull, 'w') as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            if pool_size:
+                module.configure_seed(BENCH_SEED, pool_size)
+                module.ENTITY.prepare_value_pools()
+            start = time.perf_counter()
+            success = module.generate_csv_file(path, size_mb, 'MB', engine=engine, seed=BENCH_SEED,
+                                               pool_size=pool_size)
+            seconds = time.perf_counter() - start
+            peak_rss = peak_rss_mb()
+
+            profiler = cProfile.Profile()
+            profiler.enable()
+            module.generate_csv_file(path + '.profile', size_mb, 'MB', engine=engine, seed=BENCH_SEED,
+                                     rows=PROFILE_ROWS, pool_size=pool_size)
+            profiler.disable()
+        finally:
+            sys.stdout = stdout
+
+    size_bytes = os.path.getsize(path)
+    with open(path, 'rb') as csvfile:
+        rows = sum(chunk.count(b'\n') for chunk in iter(lambda: csvfile.read(1 << 20), b'')) - 1
+
+    return {
+        'entity': entity,
+        'engine': engine,
+        'size_mb': size_mb,
+        'pool_size': pool_size,
+        'success': success,
+        'rows': rows,
+        'bytes': size_bytes,
+        'seconds': round(seconds, 4),
+        'rows_per_second': round(rows / seconds, 1),
+        'mb_per_second': round(size_bytes / (1024 * 1024) / seconds, 3),
+        'peak_rss_mb': round(peak_rss, 1),
+        'profile_rows': PROFILE_ROWS,
+        'time_split': profile_split(profiler),
+    }
+
+
+def run_case_subprocess(entity: str, engine: str, size_mb: float, workdir: str,
+                        pool_size: Optional[int] = None) -> dict:
+    """Lance run_case dans un nouvel interpréteur et relit son résultat JSON"""
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--case', entity, engine, str(size_mb), workdir,
+         str(pool_size or 0)],
+        capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def git_revision() -> str:
+    """Commit git courant (ou 'unknown' hors dépôt)"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks des générateurs CSV")
+    parser.add_argument('--sizes', default='1,5,20', help="Tailles en MB, séparées par des virgules")
+    parser.add_argument('--engines', default='row,columnar')
+    parser.add_argument('--entities', default=','.join(ENTITIES))
+    parser.add_argument('--pool-size', type=int, help="Pools Faker distincts en cache disque (--pool-size)")
+    parser.add_argument('--output', default=os.path.join(BENCH_DIR, 'results'))
+    parser.add_argument('--case', nargs=5, metavar=('ENTITY', 'ENGINE', 'SIZE_MB', 'WORKDIR', 'POOL_SIZE'),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        entity, engine, size_mb, workdir, pool_size = args.case
+        print(json.dumps(run_case(entity, engine, float(size_mb), workdir, int(pool_size) or None)))
+        return
+
+    entities = args.entities.split(',')
+    engines = args.engines.split(',')
+    sizes = [float(size) for size in args.sizes.split(',')]
+    revision = git_revision()
+    report = {
+        'revision': revision,
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'pool_size': args.pool_size,
+        'functions': {},
+        'cases': [],
+    }
+
+    for entity in entities:
+        report['functions'][entity] = bench_functions(entity)
+        for result in report['functions'][entity]:
+            print(f"{entity:<10} {result['function']:<22} {result['calls_per_second']:>12,.0f} appels/s")
+
+    workdir = tempfile.mkdtemp(prefix='lakehouse_bench_')
+    try:
+        for entity in entities:
+            for engine in engines:
+                for size_mb in sizes:
+                    case = run_case_subprocess(entity, engine, size_mb, workdir, args.pool_size)
+                    report['cases'].append(case)
+                    print(f"{entity:<10} {engine:<9} {size_mb:>6.1f}MB  {case['rows_per_second']:>10,.0f} lignes/s  "
+                          f"{case['mb_per_second']:>7.2f} MB/s  RSS {case['peak_rss_mb']:>7.1f}MB  "
+                          f"top: {case['time_split']['self'][0]['function']}")
+                    for name in os.listdir(workdir):
+                        os.remove(os.path.join(workdir, name))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    os.makedirs(args.output, exist_ok=True)
+    result_path = os.path.join(args.output, f"{datetime.now():%Y%m%d_%H%M%S}_{revision}.json")
+    with open(result_path, 'w', encoding='utf-8') as result_file:
+        json.dump(report, result_file, indent=2, ensure_ascii=False)
+    print(f"Résultats enregistrés dans {result_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+"""Les modules de tools/ s'importent à plat (comme depuis benchmarks/)"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tools'))
@@ -0,0 +1,33 @@
+import csv
+import re
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from columnar_engine import to_strings
+from entity_generator import load_entity
+
+ISO_TIMESTAMP = re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d{6})?$')
+
+
+def test_to_strings_formats_timestamps_like_isoformat():
+    values = [datetime(2025, 1, 1, 9, 54, 26, 156266), datetime(2025, 1, 1, 12, 0, 0), datetime(2025, 1, 1, 0, 0, 0, 5)]
+    column = np.array(values, dtype='datetime64[us]')
+    assert to_strings(column) == [value.isoformat() for value in values]
+
+
+def timestamp_values(path, entity):
+    columns = [name for name, schema in entity.schema_ods.items() if schema['type'] == 'TIMESTAMP']
+    with open(path, newline='', encoding='utf-8') as csvfile:
+        return [row[name] for row in csv.DictReader(csvfile, delimiter=';') for name in columns]
+
+
+@pytest.mark.parametrize('seed', [None, 1])
+def test_row_and_columnar_timestamps_share_format(tmp_path, seed):
+    entity = load_entity('employees')
+    for engine in ('row', 'columnar'):
+        path = str(tmp_path / f"{engine}.csv")
+        assert entity.generate_csv_file(path, 5, 'MB', rows=2000, engine=engine, seed=seed)
+        values = timestamp_values(path, entity)
+        assert values and all(ISO_TIMESTAMP.match(value) for value in values)
@@ -0,0 +1,19 @@
+import asyncio
+import os
+
+from entity_generator import load_entity
+from object_store import LocalBackend
+from object_uploader import generate_and_upload
+
+
+def test_generate_into_fifo_with_checkpoint_interval_zero(tmp_path):
+    """Un tube nommé n'accepte pas fsync : aucun point de reprise ne doit y être écrit"""
+    backend = LocalBackend(str(tmp_path / 'store'))
+    stats = asyncio.run(generate_and_upload(load_entity('employees'), 5, 'MB', 'gs://bucket/employees.csv', backend,
+                                            rows=30000, seed=1, checkpoint_interval=0.0))
+
+    published = tmp_path / 'store' / 'bucket' / 'employees.csv'
+    assert published.exists()
+    assert os.path.getsize(published) == stats['bytes']
+    with open(published, 'rb') as csvfile:
+        assert sum(1 for _ in csvfile) == 30001
@@ -0,0 +1,15 @@
+import os
+import subprocess
+import sys
+
+TOOLS_DIR = os.path.join(os.path.dirname(__file__), '..', 'tools')
+
+
+def test_skewed_specs_load_without_numpy():
+    """Poids cumulés et log-normales se préparent sans charger NumPy (moteur ligne)"""
+    script = ("import sys, entity_generator\n"
+              "for name in ('employees_skewed', 'contract_skewed'):\n"
+              "    entity_generator.load_entity(name)\n"
+              "print(type(sys.modules['numpy']).__name__)")
+    result = subprocess.run([sys.executable, '-c', script], cwd=TOOLS_DIR, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == '_LazyModule'
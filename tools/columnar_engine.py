@@ -0,0 +1,235 @@
+"""
+Moteur de génération colonnaire vectorisé (NumPy).
+
+Au lieu d'appeler Faker, `random` et `validate_field` cellule par cellule, un
+bloc complet de lignes est produit colonne par colonne :
+- colonnes catégorielles : tableaux d'indices dans les listes de référence
+- colonnes numériques : tirages uniformes vectorisés bornés au schéma ODS
+- colonnes texte Faker : échantillonnage dans des pools pré-générés et
+  pré-nettoyés (clean_field + échappement CSV appliqués une seule fois)
+
+Chaque bloc est sérialisé puis écrit en un seul appel.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import logging
+import time
+from datetime import date, datetime
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Sequence, Tuple
+
+from lazy_imports import lazy_import
+from output_sinks import LINE_TERMINATOR, BudgetedCsvWriter
+from run_metrics import RunMetrics
+from run_progress import ProgressReporter
+from seeding import SEED_REFERENCE_DATETIME, block_rng
+
+np = lazy_import('numpy')
+
+logger = logging.getLogger(__name__)
+
+# Nombre de lignes produites par bloc vectorisé
+BLOCK_SIZE = 65536
+
+# Nombre de valeurs distinctes pré-générées par fournisseur Faker
+POOL_SIZE = 10000
+
+def csv_escape(value: str) -> str:
+    """Échappe une valeur comme csv.writer (QUOTE_MINIMAL, délimiteur ';')"""
+    buffer = io.StringIO()
+    csv.writer(buffer, delimiter=';', quoting=csv.QUOTE_MINIMAL, lineterminator='').writerow([value])
+    return buffer.getvalue()
+
+
+def build_pool(factory: Callable[[], Any], clean: Callable[[str], str], size: int = POOL_SIZE) -> np.ndarray:
+    """
+    Pré-génère un pool de valeurs Faker nettoyées et prêtes à écrire en CSV.
+
+    Args:
+        factory: Fournisseur Faker appelé `size` fois (ex: fake.last_name)
+        clean: Nettoyage appliqué à chaque valeur (clean_field avec max_length)
+        size: Nombre de valeurs du pool
+    """
+    return np.array([csv_escape(clean(str(factory()))) for _ in range(size)], dtype=object)
+
+
+def pool_column(pool: np.ndarray, n: int, rng: np.random.Generator) -> np.ndarray:
+    """Échantillonne n valeurs dans un pool pré-généré"""
+    return pool[rng.integers(0, len(pool), n)]
+
+
+def choice_column(values: Sequence[str], n: int, rng: np.random.Generator) -> np.ndarray:
+    """Équivalent vectorisé de random.choice sur une liste de référence"""
+    return np.asarray(values, dtype=object)[rng.integers(0, len(values), n)]
+
+
+def weighted_choice_column(values: np.ndarray, cum_weights: np.ndarray, n: int,
+                           rng: np.random.Generator) -> np.ndarray:
+    """Équivalent vectorisé de random.choices(values, cum_weights) (poids cumulés normalisés à 1)"""
+    return values[np.searchsorted(cum_weights, rng.random(n), side='right')]
+
+
+def integer_column(low: int, high: int, n: int, rng: np.random.Generator,
+                   min_val: Optional[int] = None, max_val: Optional[int] = None) -> np.ndarray:
+    """Équivalent vectorisé de random.randint(low, high) borné au schéma ODS"""
+    values = rng.integers(low, high + 1, n)
+    if min_val is not None or max_val is not None:
+        values = np.clip(values, min_val, max_val)
+    return values
+
+
+def uniform_column(low: float, high: float, n: int, rng: np.random.Generator, decimals: int,
+                   min_val: Optional[float] = None, max_val: Optional[float] = None) -> np.ndarray:
+    """Équivalent vectorisé de round(random.uniform(low, high), decimals) borné au schéma ODS"""
+    values = np.round(rng.uniform(low, high, n), decimals)
+    if min_val is not None or max_val is not None:
+        values = np.clip(values, min_val, max_val)
+    return values
+
+
+def date_column(start: date, n_days: int, n: int, rng: np.random.Generator) -> np.ndarray:
+    """Dates uniformes dans [start, start + n_days] (bornes incluses) en datetime64[D]"""
+    return np.datetime64(start, 'D') + rng.integers(0, n_days + 1, n)
+
+
+def uuid_column(n: int, rng: np.random.Generator) -> List[str]:
+    """UUID version 4 générés à partir de 16 octets aléatoires par ligne"""
+    raw = np.frombuffer(rng.bytes(16 * n), dtype=np.uint8).reshape(n, 16).copy()
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+    hexa = raw.tobytes().hex()
+    return [f"{hexa[i:i + 8]}-{hexa[i + 8:i + 12]}-{hexa[i + 12:i + 16]}-{hexa[i + 16:i + 20]}-{hexa[i + 20:i + 32]}"
+            for i in range(0, 32 * n, 32)]
+
+
+def timestamp_column(n: int, rng: np.random.Generator, seeded: bool) -> Any:
+    """
+    Horodatage de génération : datetime.now() du bloc, ou tirage reproductible
+    dans la journée de référence lorsque la génération utilise une graine.
+    """
+    if not seeded:
+        return [datetime.now().isoformat()] * n
+    return np.datetime64(SEED_REFERENCE_DATETIME, 'us') + rng.integers(0, 86400 * 10 ** 6, n)
+
+
+def to_strings(column: Any) -> List[str]:
+    """
+    Convertit une colonne (tableau NumPy ou liste) en liste de chaînes CSV.
+    Les flottants et les horodatages sont formatés comme str(float) et
+    datetime.isoformat() pour rester identiques au moteur ligne.
+    """
+    if not isinstance(column, np.ndarray):
+        return column
+    if column.dtype == object:
+        return column.tolist()
+    if column.dtype.kind == 'f':
+        return list(map(repr, column.tolist()))
+    if column.dtype == np.dtype('datetime64[D]'):
+        # Dates : table de correspondance sur l'intervalle couvert par le bloc
+        days = column.astype('datetime64[D]').astype(np.int64)
+        first_day = int(days.min())
+        lookup = np.arange(first_day, int(days.max()) + 1).astype('datetime64[D]').astype(str).astype(object)
+        return lookup[days - first_day].tolist()
+    if column.dtype.kind == 'M':
+        # Horodatages au format datetime.isoformat() du moteur ligne ('T', sans fraction si secondes entières)
+        strings = np.datetime_as_string(column, unit='us').astype(object)
+        whole = column.astype('datetime64[us]').astype(np.int64) % 10 ** 6 == 0
+        if whole.any():
+            strings[whole] = np.datetime_as_string(column[whole], unit='s')
+        return strings.tolist()
+    return list(map(str, column.tolist()))
+
+
+def null_column(column: Any, mask: np.ndarray) -> np.ndarray:
+    """Colonne CSV (voir to_strings) dont les lignes de `mask` sont vides (NULL au chargement)"""
+    values = np.array(to_strings(column), dtype=object)
+    values[mask] = ''
+    return values
+
+
+def format_block(columns: Sequence[Any]) -> str:
+    """Sérialise un bloc colonnaire (colonnes dans l'ordre SCHEMA_ODS) en texte CSV"""
+    lines = map(';'.join, zip(*map(to_strings, columns)))
+    return LINE_TERMINATOR.join(lines) + LINE_TERMINATOR
+
+
+def seeded_block(block_fn: Callable[[int, int, np.random.Generator], Sequence[Any]], seed: int,
+                 row_id: int, count: int) -> Tuple[List[Any], int]:
+    """
+    Génère les lignes à partir de `row_id` dans le bloc aligné qui le contient.
+
+    Les blocs couvrent les ids [k * BLOCK_SIZE + 1, (k + 1) * BLOCK_SIZE] et sont
+    générés avec block_rng(seed, k) : le contenu d'un id ne dépend que de la graine,
+    quel que soit le découpage en shards ou le point de reprise.
+
+    Returns:
+        (colonnes des lignes demandées, nombre de lignes, borné à la fin du bloc)
+    """
+    block_index = (row_id - 1) // BLOCK_SIZE
+    block_first_id = block_index * BLOCK_SIZE + 1
+    offset = row_id - block_first_id
+    count = min(count, BLOCK_SIZE - offset)
+    columns = block_fn(block_first_id, BLOCK_SIZE, block_rng(seed, block_index))
+    if offset == 0 and count == BLOCK_SIZE:
+        return list(columns), count
+    return [column[offset:offset + count] for column in columns], count
+
+
+def write_columnar(output: BinaryIO, headers: Optional[List[str]],
+                   block_fn: Callable[[int, int, np.random.Generator], Sequence[Any]],
+                   first_id: int = 1, max_rows: Optional[int] = None,
+                   target_size_bytes: Optional[float] = None,
+                   progress: Optional[ProgressReporter] = None,
+                   seed: Optional[int] = None, writer: Optional[BudgetedCsvWriter] = None,
+                   metrics: Optional[RunMetrics] = None, rng: Optional[np.random.Generator] = None,
+                   on_block: Optional[Callable[[int], None]] = None) -> Tuple[int, int]:
+    """
+    Écrit un flux CSV (voir output_sinks.open_output) bloc par bloc avec le moteur colonnaire.
+
+    La génération s'arrête exactement à `max_rows` lignes si fourni, et/ou sur la
+    première ligne qui atteint `target_size_bytes`. Avec `seed`, les blocs sont
+    alignés et reproductibles (voir seeded_block). Un `writer` existant (reprise)
+    remplace `headers`, les budgets et `metrics` (temps par étape, voir run_metrics).
+    Sans graine, `rng` (état restauré à la reprise) tire les blocs ; `on_block(id
+    suivant)` est appelé après chaque bloc écrit (points de reprise).
+
+    Returns:
+        (nombre de lignes écrites, nombre d'octets écrits)
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    row_id = first_id
+
+    if writer is None:
+        writer = BudgetedCsvWriter(output, headers, target_size_bytes, max_rows, metrics=metrics)
+    metrics = writer.metrics
+    while not writer.done:
+        count = writer.remaining_rows(BLOCK_SIZE)
+        started = time.perf_counter()
+        if seed is None:
+            columns = block_fn(row_id, count, rng)
+        else:
+            columns, count = seeded_block(block_fn, seed, row_id, count)
+        generated = time.perf_counter()
+        block = format_block(columns)
+        if metrics is not None:
+            metrics.rows_generated += count
+            metrics.add('generate', generated - started)
+            metrics.add('serialize', time.perf_counter() - generated)
+        writer.write_block(block, count)
+        row_id += count
+        if progress is not None:
+            progress.update(writer.rows_written, writer.bytes_written)
+        if on_block is not None:
+            on_block(row_id)
+
+    return writer.rows_written, writer.bytes_written
+
+
+def get_pools(cache: Dict[str, np.ndarray], factories: Dict[str, Tuple[Callable[[], Any], Callable[[str], str]]]) -> Dict[str, np.ndarray]:
+    """Construit les pools manquants d'une entité (une seule fois par processus)"""
+    for name, (factory, clean) in factories.items():
+        if name not in cache:
+            cache[name] = build_pool(factory, clean)
+    return cache
@@ -0,0 +1,225 @@
+"""
+Découpage et regroupement des fichiers CSV déposés (limite framework.md :
+< 5GB par fichier).
+
+- split : un gros CSV `;` est découpé en shards `part-00000.csv` de taille
+  cible, chacun avec l'en-tête. Le fichier est projeté en mémoire (mmap) :
+  les bornes sont cherchées sur la fin de ligne suivant chaque décalage
+  cible, puis chaque plage d'octets est recopiée par un processus, par
+  tranches, sans charger le fichier.
+- merge : des petits fichiers de même en-tête sont regroupés dans l'ordre en
+  shards de taille cible (un seul en-tête par shard).
+
+Les shards `part-*` déjà présents dans le dossier de sortie sont supprimés
+avant l'écriture (le dossier ne doit pas contenir les fichiers sources).
+
+Les shards se chargent en parallèle via le wildcard `part-*.csv` de la table
+externe 01_STG (create_external_table_stg_<entité>_parts.sql). Les valeurs
+ne doivent pas contenir de fin de ligne (garanti par clean_field pour les
+fichiers générés).
+
+Usage:
+    python csv_splitter.py split <fichier.csv> <dossier> [--max-size-mb 1024 | --parts N] [--workers N]
+    python csv_splitter.py merge <fichier|dossier> ... <dossier> [--max-size-mb 1024] [--workers N]
+"""
+import argparse
+import logging
+import mmap
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from parallel_generation import COPY_BUFFER_SIZE, clear_parts, existing_parts, part_filename
+
+logger = logging.getLogger(__name__)
+
+# Taille maximale d'un fichier chargé (framework.md)
+MAX_FILE_SIZE = 5 * 1024 * 1024 * 1024
+
+DEFAULT_MAX_SIZE_MB = 1024
+
+
+def line_boundaries(view: mmap.mmap, start: int, end: int, count: int) -> List[int]:
+    """
+    Découpe [start, end) en au plus `count` plages de tailles voisines,
+    chaque borne placée juste après une fin de ligne.
+    """
+    bounds = [start]
+    for index in range(1, count):
+        newline = view.find(b'\n', start + (end - start) * index // count - 1, end)
+        bound = end if newline < 0 else newline + 1
+        if bound > bounds[-1] and bound < end:
+            bounds.append(bound)
+    bounds.append(end)
+    return bounds
+
+
+def _copy_range(task: Tuple[str, str, bytes, int, int]) -> Tuple[str, int]:
+    """Écrit un shard : en-tête puis plage d'octets de la source (exécuté dans un processus du pool)"""
+    source, path, header, start, end = task
+    with open(source, 'rb') as source_file, open(path, 'wb') as output:
+        output.write(header)
+        with mmap.mmap(source_file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            with memoryview(view) as data:
+                for position in range(start, end, COPY_BUFFER_SIZE):
+                    output.write(data[position:min(position + COPY_BUFFER_SIZE, end)])
+    return path, end - start + len(header)
+
+
+def split_csv(source: str, output_dir: str, max_size: int = DEFAULT_MAX_SIZE_MB * 1024 * 1024,
+              parts: Optional[int] = None, workers: int = 1) -> List[str]:
+    """
+    Découpe un CSV en shards `part-NNNNN.csv` d'au plus `max_size` octets
+    environ (une ligne de dépassement au plus), ou en `parts` shards.
+
+    Returns:
+        Chemins des shards dans l'ordre
+    """
+    if max_size > MAX_FILE_SIZE:
+        raise ValueError(f"Taille cible au-delà de la limite du framework ({MAX_FILE_SIZE // 1024 ** 3}GB)")
+    if source.endswith(('.gz', '.zst')):
+        raise ValueError("Découpage par plages d'octets impossible sur un fichier compressé")
+    with open(source, 'rb') as source_file, \
+            mmap.mmap(source_file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        header_end = view.find(b'\n') + 1
+        if header_end == 0:
+            raise ValueError(f"Fichier sans fin de ligne après l'en-tête: {source}")
+        header = view[:header_end]
+        size = len(view)
+        if parts is None:
+            parts = max(1, -(-(size - header_end) // max(1, max_size - header_end)))
+        bounds = line_boundaries(view, header_end, size, parts)
+
+    prepare_output_dir(output_dir, [source])
+    tasks = [(source, part_filename(output_dir, index), header, start, end)
+             for index, (start, end) in enumerate(zip(bounds, bounds[1:]))]
+    return _run(tasks, _copy_range, workers)
+
+
+def prepare_output_dir(output_dir: str, sources: List[str]) -> None:
+    """
+    Crée le dossier de sortie et supprime les shards `part-*` d'une exécution
+    précédente (sinon relus par le wildcard de la table externe). Refuse un
+    dossier dont les shards écrasés ou supprimés seraient des fichiers sources.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    replaced = {os.path.realpath(path) for path in existing_parts(output_dir)}
+    if replaced & {os.path.realpath(source) for source in sources}:
+        raise ValueError("Le dossier de sortie contient des fichiers sources : choisir un autre dossier")
+    clear_parts(output_dir)
+
+
+def _merge_group(task: Tuple[List[str], str, bytes]) -> Tuple[str, int]:
+    """Concatène un groupe de fichiers sous un seul en-tête (exécuté dans un processus du pool)"""
+    sources, path, header = task
+    written = 0
+    with open(path, 'wb') as output:
+        output.write(header)
+        written += len(header)
+        for source in sources:
+            with open(source, 'rb') as source_file:
+                if source_file.readline() != header:
+                    raise ValueError(f"En-tête différent dans {source}")
+                last = b'\n'
+                while True:
+                    chunk = source_file.read(COPY_BUFFER_SIZE)
+                    if not chunk:
+                        break
+                    output.write(chunk)
+                    written += len(chunk)
+                    last = chunk[-1:]
+                if last != b'\n':
+                    # Dernière ligne sans fin de ligne : terminée comme l'en-tête
+                    terminator = b'\r\n' if header.endswith(b'\r\n') else b'\n'
+                    output.write(terminator)
+                    written += len(terminator)
+    return path, written
+
+
+def collect_csv_files(paths: List[str]) -> List[str]:
+    """Fichiers .csv désignés, les dossiers étant parcourus (ordre alphabétique)"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith('.csv'))
+        else:
+            files.append(path)
+    return files
+
+
+def merge_csv(sources: List[str], output_dir: str, max_size: int = DEFAULT_MAX_SIZE_MB * 1024 * 1024,
+              workers: int = 1) -> List[str]:
+    """
+    Regroupe des fichiers de même en-tête, dans l'ordre, en shards d'au plus
+    `max_size` octets (un fichier plus gros que la cible forme un shard seul).
+
+    Returns:
+        Chemins des shards dans l'ordre
+    """
+    if max_size > MAX_FILE_SIZE:
+        raise ValueError(f"Taille cible au-delà de la limite du framework ({MAX_FILE_SIZE // 1024 ** 3}GB)")
+    if not sources:
+        raise ValueError("Aucun fichier à regrouper")
+    with open(sources[0], 'rb') as first:
+        header = first.readline()
+
+    groups: List[List[str]] = [[]]
+    group_size = len(header)
+    for source in sources:
+        data_size = os.path.getsize(source) - len(header)
+        if groups[-1] and group_size + data_size > max_size:
+            groups.append([])
+            group_size = len(header)
+        groups[-1].append(source)
+        group_size += data_size
+
+    prepare_output_dir(output_dir, sources)
+    tasks = [(group, part_filename(output_dir, index), header) for index, group in enumerate(groups)]
+    return _run(tasks, _merge_group, workers)
+
+
+def _run(tasks: list, function, workers: int) -> List[str]:
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            results = list(pool.map(function, tasks))
+    else:
+        results = [function(task) for task in tasks]
+    for path, size in results:
+        logger.info(f"🧩 {os.path.basename(path)}: {size / (1024 * 1024):.1f}MB")
+    return [path for path, _ in results]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Découpage / regroupement de fichiers CSV en shards part-*.csv")
+    parser.add_argument('command', choices=['split', 'merge'])
+    parser.add_argument('paths', nargs='+', help="split : <fichier> <dossier> ; merge : <fichiers|dossiers> <dossier>")
+    parser.add_argument('--max-size-mb', type=float, default=DEFAULT_MAX_SIZE_MB, help="Taille cible des shards")
+    parser.add_argument('--parts', type=int, help="split : nombre de shards (au lieu de --max-size-mb)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+    if len(args.paths) < 2:
+        parser.error("chemins attendus : source(s) puis dossier de sortie")
+    *sources, output_dir = args.paths
+    max_size = int(args.max_size_mb * 1024 * 1024)
+
+    started = time.perf_counter()
+    try:
+        if args.command == 'split':
+            if len(sources) != 1:
+                raise ValueError("split attend un seul fichier source")
+            shards = split_csv(sources[0], output_dir, max_size, args.parts, args.workers)
+        else:
+            shards = merge_csv(collect_csv_files(sources), output_dir, max_size, args.workers)
+    except (OSError, ValueError) as e:
+        logger.error(f"❌ {args.command} en échec: {e}")
+        return 1
+    logger.info(f"✅ {len(shards)} shard(s) écrits dans {output_dir} en {time.perf_counter() - started:.2f}s "
+                f"(wildcard part-*.csv de la table externe 01_STG)")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Lecture des DDL BigQuery (CREATE TABLE / CREATE EXTERNAL TABLE).
+
+Extrait la liste ordonnée des colonnes d'un fichier de `Bigquery/00_ddl/` au
+format du schéma ODS des générateurs : {nom: {'type': ..., 'required': ...}}.
+Les colonnes de métadonnées ajoutées au chargement (ingestion_date,
+source_file) ne font pas partie des fichiers générés et sont ignorées.
+"""
+import os
+import re
+from typing import Any, Dict, Iterable, List, Tuple
+
+REPO_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# DDL d'une entité, relatives à la racine du dépôt
+ODS_DDL = os.path.join('Bigquery', '00_ddl', 'create_table_ods_{entity}.sql')
+STG_DDL = os.path.join('Bigquery', '00_ddl', 'create_external_table_stg_{entity}.sql')
+
+# Colonnes renseignées par LOAD DATA / Dataform, absentes des fichiers sources
+INGESTION_COLUMNS = ('ingestion_date', 'source_file')
+
+# Alias BigQuery normalisés vers les types du schéma ODS
+TYPE_ALIASES = {
+    'INT': 'INT64',
+    'INTEGER': 'INT64',
+    'SMALLINT': 'INT64',
+    'BIGINT': 'INT64',
+    'TINYINT': 'INT64',
+    'BYTEINT': 'INT64',
+    'FLOAT': 'FLOAT64',
+    'BOOLEAN': 'BOOL',
+}
+
+_CREATE_TABLE = re.compile(
+    r"CREATE\s+(?:OR\s+REPLACE\s+)?(?:EXTERNAL\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?`?([\w.\-]+)`?\s*\(",
+    re.IGNORECASE)
+_COLUMN = re.compile(r"`?(\w+)`?\s+(\w+)\s*(?:\(\s*(\d+)[^)]*\))?(.*)", re.IGNORECASE | re.DOTALL)
+
+
+def _strip_comments(sql: str) -> str:
+    """Retire les commentaires `--` (hors chaînes) et `/* */`"""
+    sql = re.sub(r"/\*.*?\*/", ' ', sql, flags=re.DOTALL)
+    return re.sub(r"--[^\n]*|('(?:[^'\\]|\\.)*')", lambda match: match.group(1) or '', sql)
+
+
+def _split_top_level(body: str) -> List[str]:
+    """Découpe la liste des colonnes sur les virgules hors parenthèses et hors chaînes"""
+    parts, depth, quoted, current = [], 0, False, []
+    for char in body:
+        if char == "'":
+            quoted = not quoted
+        elif quoted:
+            pass
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        if char == ',' and depth == 0 and not quoted:
+            parts.append(''.join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append(''.join(current))
+    return [part.strip() for part in parts if part.strip()]
+
+
+def parse_ddl(sql: str, exclude: Iterable[str] = INGESTION_COLUMNS) -> Tuple[str, Dict[str, Dict[str, Any]]]:
+    """
+    Analyse une instruction CREATE [EXTERNAL] TABLE.
+
+    Les types paramétrés STRING(n) donnent `max_length`, NOT NULL donne
+    `required` et DEFAULT l'expression `default`.
+
+    Returns:
+        (nom de la table, colonnes dans l'ordre de la DDL)
+    """
+    sql = _strip_comments(sql)
+    match = _CREATE_TABLE.search(sql)
+    if match is None:
+        raise ValueError("Aucune instruction CREATE TABLE trouvée dans la DDL")
+
+    # Bloc des colonnes : jusqu'à la parenthèse fermante correspondante
+    depth, start = 1, match.end()
+    for position in range(start, len(sql)):
+        if sql[position] == '(':
+            depth += 1
+        elif sql[position] == ')':
+            depth -= 1
+            if depth == 0:
+                break
+    else:
+        raise ValueError(f"Liste de colonnes non terminée pour la table {match.group(1)}")
+
+    columns = {}
+    for definition in _split_top_level(sql[start:position]):
+        column = _COLUMN.match(definition)
+        if column is None:
+            raise ValueError(f"Définition de colonne non reconnue: {definition}")
+        name, column_type, length, rest = column.groups()
+        if name in exclude:
+            continue
+        column_type = TYPE_ALIASES.get(column_type.upper(), column_type.upper())
+        schema = {'type': column_type}
+        if re.search(r"\bNOT\s+NULL\b", rest, re.IGNORECASE):
+            schema['required'] = True
+        if length and column_type == 'STRING':
+            schema['max_length'] = int(length)
+        default = re.search(r"\bDEFAULT\s+(.+?)(?:\s+OPTIONS\s*\(.*)?$", rest.strip(), re.IGNORECASE | re.DOTALL)
+        if default:
+            schema['default'] = default.group(1).strip()
+        columns[name] = schema
+    return match.group(1), columns
+
+
+def parse_options(sql: str) -> Dict[str, Any]:
+    """
+    Options d'une table externe ou d'un LOAD DATA (`OPTIONS (...)` / `FROM FILES (...)`).
+
+    Les chaînes sont retournées sans quotes, les listes (uris) en liste Python
+    et les entiers en int.
+    """
+    sql = _strip_comments(sql)
+    match = re.search(r"(?:OPTIONS|FROM\s+FILES)\s*\(", sql, re.IGNORECASE)
+    if match is None:
+        return {}
+    depth, start = 1, match.end()
+    for position in range(start, len(sql)):
+        depth += {'(': 1, ')': -1}.get(sql[position], 0)
+        if depth == 0:
+            break
+    options = {}
+    for item in _split_top_level(sql[start:position]):
+        key, _, value = item.partition('=')
+        value = value.strip()
+        if value.startswith('['):
+            options[key.strip().lower()] = re.findall(r"'([^']*)'", value)
+        elif value.startswith("'"):
+            options[key.strip().lower()] = value.strip("'")
+        else:
+            options[key.strip().lower()] = int(value) if value.lstrip('-').isdigit() else value
+    return options
+
+
+def parse_ddl_file(path: str, exclude: Iterable[str] = INGESTION_COLUMNS) -> Tuple[str, Dict[str, Dict[str, Any]]]:
+    """Analyse un fichier DDL (voir parse_ddl)"""
+    with open(path, 'r', encoding='utf-8') as ddl_file:
+        return parse_ddl(ddl_file.read(), exclude)
@@ -0,0 +1,165 @@
+"""
+Variantes partitionnées et clusterisées des DDL d'une entité.
+
+À partir de la DDL ODS (`Bigquery/00_ddl/create_table_ods_<entité>.sql`),
+produit :
+- une table ODS `PARTITION BY` une colonne DATE / TIMESTAMP (ingestion_date
+  ou date métier : date_embauche, date_signature), au jour, au mois ou à
+  l'année, et `CLUSTER BY` jusqu'à 4 colonnes (ex: departement, statut)
+- une table externe 01_STG sur une arborescence Hive `dt=YYYY-MM-DD/`
+  (generate_entity.py ... --partition-by), avec la colonne de partition `dt`
+
+Usage: python ddl_variants.py <entité> [--partition-by colonne] [--granularity day|month|year]
+                              [--cluster-by col1,col2] [--hive] [--output fichier.sql|-]
+  ex:  python ddl_variants.py employees --partition-by date_embauche --cluster-by departement,statut
+"""
+import argparse
+import os
+import sys
+from typing import Any, Dict, List, Optional, Sequence
+
+from ddl_schema import ODS_DDL, REPO_DIR, STG_DDL, parse_ddl_file, parse_options
+from hive_layout import PARTITION_KEY
+
+# Limite BigQuery du nombre de colonnes de clustering
+MAX_CLUSTER_COLUMNS = 4
+
+# Types acceptés par CLUSTER BY (FLOAT64 exclu)
+CLUSTER_TYPES = ('INT64', 'STRING', 'DATE', 'TIMESTAMP', 'DATETIME', 'BOOL', 'NUMERIC')
+
+_DATE_TRUNC = {'DATE': 'DATE_TRUNC', 'TIMESTAMP': 'TIMESTAMP_TRUNC', 'DATETIME': 'DATETIME_TRUNC'}
+
+
+def partition_expression(column: str, column_type: str, granularity: str = 'day') -> str:
+    """Expression PARTITION BY d'une colonne DATE / TIMESTAMP / DATETIME"""
+    if column_type not in _DATE_TRUNC:
+        raise ValueError(f"Partitionnement impossible sur {column} ({column_type}) : DATE ou TIMESTAMP attendu")
+    if granularity == 'day':
+        return column if column_type == 'DATE' else f"DATE({column})"
+    return f"{_DATE_TRUNC[column_type]}({column}, {granularity.upper()})"
+
+
+def column_definitions(columns: Dict[str, Dict[str, Any]]) -> List[str]:
+    definitions = []
+    for name, column in columns.items():
+        definition = f"  {name} {column['type']}"
+        if column.get('max_length'):
+            definition += f"({column['max_length']})"
+        if column.get('required'):
+            definition += ' NOT NULL'
+        if column.get('default'):
+            definition += f" DEFAULT {column['default']}"
+        definitions.append(definition)
+    return definitions
+
+
+def check_cluster_columns(columns: Dict[str, Dict[str, Any]], cluster_by: Sequence[str]) -> None:
+    if len(cluster_by) > MAX_CLUSTER_COLUMNS:
+        raise ValueError(f"CLUSTER BY limité à {MAX_CLUSTER_COLUMNS} colonnes ({len(cluster_by)} demandées)")
+    for name in cluster_by:
+        if name not in columns:
+            raise ValueError(f"Colonne de clustering inconnue: {name}")
+        if columns[name]['type'] not in CLUSTER_TYPES:
+            raise ValueError(f"Clustering impossible sur {name} ({columns[name]['type']})")
+
+
+def render_table_ddl(table: str, columns: Dict[str, Dict[str, Any]], partition_by: Optional[str] = None,
+                     granularity: str = 'day', cluster_by: Sequence[str] = ()) -> str:
+    """CREATE TABLE partitionnée et/ou clusterisée"""
+    check_cluster_columns(columns, cluster_by)
+    lines = [f"-- Création de la table {table.split('.')[-1]} avec schéma typé"]
+    clauses = []
+    if partition_by:
+        if partition_by not in columns:
+            raise ValueError(f"Colonne de partition inconnue: {partition_by}")
+        expression = partition_expression(partition_by, columns[partition_by]['type'], granularity)
+        lines.append(f"-- Partitionnée par {partition_by} ({granularity}) : les requêtes filtrées sur {partition_by}")
+        lines.append("-- n'analysent que les partitions concernées")
+        clauses.append(f"PARTITION BY {expression}")
+    if cluster_by:
+        lines.append(f"-- Clusterisée par {', '.join(cluster_by)} : blocs élagués sur ces colonnes")
+        clauses.append(f"CLUSTER BY {', '.join(cluster_by)}")
+    lines.append(f"CREATE TABLE `{table}` (")
+    lines.append(',\n'.join(column_definitions(columns)))
+    lines.append(')')
+    return '\n'.join(lines + clauses) + ';'
+
+
+def render_hive_external_ddl(table: str, columns: Dict[str, Dict[str, Any]], uri: str,
+                             options: Dict[str, Any], partition_column: str) -> str:
+    """
+    CREATE EXTERNAL TABLE sur une arborescence Hive `<préfixe>/dt=YYYY-MM-DD/part-*.csv`,
+    le préfixe étant l'URI de la table STG suffixée de la colonne de partition
+    (gs://.../employees.csv -> gs://.../employees_date_embauche).
+    """
+    prefix = os.path.splitext(uri)[0] + f"_{partition_column}"
+    option_lines = [f"  format = '{options.get('format', 'CSV')}'"]
+    if 'field_delimiter' in options:
+        option_lines.append(f"  field_delimiter = '{options['field_delimiter']}'")
+    option_lines += [
+        f"  uris = ['{prefix}/*']",
+        f"  hive_partition_uri_prefix = '{prefix}'",
+    ]
+    if 'skip_leading_rows' in options:
+        option_lines.append(f"  skip_leading_rows = {options['skip_leading_rows']}")
+    return '\n'.join([
+        "-- Variante de la table externe STG pour les fichiers partitionnés Hive",
+        f"-- (generate_entity.py {table.split('.')[-1]} ... --partition-by {partition_column})",
+        f"-- Un dossier {PARTITION_KEY}=YYYY-MM-DD par valeur de {partition_column}, déposé sous {prefix}/",
+        "-- Chaque fichier part-00000.csv contient son propre en-tête",
+        f"CREATE OR REPLACE EXTERNAL TABLE `{table}`",
+        '(',
+        ',\n'.join(column_definitions(columns)),
+        ')',
+        f"WITH PARTITION COLUMNS ({PARTITION_KEY} DATE)",
+        'OPTIONS (',
+        ',\n'.join(option_lines),
+        ');',
+    ])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Variantes partitionnées / clusterisées des DDL d'une entité")
+    parser.add_argument('entity')
+    parser.add_argument('--partition-by', help="Colonne DATE / TIMESTAMP (ex: ingestion_date, date_embauche)")
+    parser.add_argument('--granularity', choices=['day', 'month', 'year'], default='day')
+    parser.add_argument('--cluster-by', default='', help="Colonnes séparées par des virgules (4 au plus)")
+    parser.add_argument('--hive', action='store_true',
+                        help="Table externe 01_STG sur l'arborescence Hive de --partition-by")
+    parser.add_argument('--output', help="Fichier de sortie ('-' : sortie standard, défaut: Bigquery/00_ddl/)")
+    args = parser.parse_args(argv)
+    cluster_by = [name for name in args.cluster_by.split(',') if name]
+
+    try:
+        if args.hive:
+            if not args.partition_by:
+                raise ValueError("--hive nécessite --partition-by")
+            stg_path = os.path.join(REPO_DIR, STG_DDL.format(entity=args.entity))
+            table, columns = parse_ddl_file(stg_path)
+            if args.partition_by not in columns:
+                raise ValueError(f"Colonne de partition absente des fichiers générés: {args.partition_by}")
+            with open(stg_path, 'r', encoding='utf-8') as ddl_file:
+                options = parse_options(ddl_file.read())
+            sql = render_hive_external_ddl(table, columns, options['uris'][0], options, args.partition_by)
+            default_output = STG_DDL.format(entity=f"{args.entity}_hive")
+        else:
+            table, columns = parse_ddl_file(os.path.join(REPO_DIR, ODS_DDL.format(entity=args.entity)), exclude=())
+            sql = render_table_ddl(table, columns, args.partition_by, args.granularity, cluster_by)
+            suffix = f"by_{args.partition_by}" if args.partition_by else 'clustered'
+            default_output = ODS_DDL.format(entity=f"{args.entity}_{suffix}")
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    if args.output == '-':
+        print(sql)
+        return 0
+    output = args.output or os.path.join(REPO_DIR, default_output)
+    with open(output, 'w', encoding='utf-8') as sql_file:
+        sql_file.write(sql)
+    print(f"✅ DDL écrite dans {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
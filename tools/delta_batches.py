@@ -0,0 +1,88 @@
+"""
+Lots delta (CDC) des générateurs : insertions, mises à jour et suppressions logiques.
+
+Un lot delta s'applique à une table ODS déjà chargée (MERGE sur la clé
+unique, voir Dataform/02_ods/load_stg_to_ods_<entité>_incremental.sqlx) :
+- insertions : nouveaux ids au-delà du high-water mark (plus grand id émis)
+- mises à jour : ids existants régénérés avec de nouvelles valeurs
+- suppressions logiques : ids existants dont la colonne `soft_delete` de la
+  spécification (statut) prend la valeur de suppression
+
+Le high-water mark et le numéro du dernier lot sont enregistrés dans un
+fichier d'état JSON à côté des fichiers générés ; il est initialisé depuis
+le fichier complet de départ (dernier id) ou explicitement.
+"""
+import json
+import os
+import random
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from seeding import derive_seed
+
+# Flux de dérivation des graines propres aux lots delta (voir seeding.STREAM_ROW / STREAM_POOL)
+STREAM_DELTA = 2
+
+# Taille de la fin de fichier relue pour trouver le dernier id
+LAST_ROW_READ_SIZE = 64 * 1024
+
+
+def state_path(data_dir: str, entity: str) -> str:
+    """Fichier d'état des lots delta d'une entité"""
+    return os.path.join(data_dir, f"{entity}_delta_state.json")
+
+
+def delta_filename(data_dir: str, entity: str, batch: int) -> str:
+    """Fichier CSV d'un lot delta (numéroté)"""
+    return os.path.join(data_dir, f"{entity}_delta_{batch:05d}.csv")
+
+
+def last_row_id(path: str) -> int:
+    """Id (première colonne) de la dernière ligne complète d'un fichier CSV généré, 0 si vide"""
+    with open(path, 'rb') as csvfile:
+        size = csvfile.seek(0, 2)
+        position = max(0, size - LAST_ROW_READ_SIZE)
+        csvfile.seek(position)
+        tail = csvfile.read()
+    lines = tail[:tail.rfind(b'\n')].split(b'\n')
+    if len(lines) < 2 and position == 0:
+        return 0
+    return int(lines[-1].split(b';', 1)[0].strip(b'"'))
+
+
+def load_state(path: str) -> Optional[Dict[str, Any]]:
+    """État des lots delta, ou None s'il n'existe pas encore"""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as state_file:
+        return json.load(state_file)
+
+
+def save_state(path: str, state: Dict[str, Any]) -> None:
+    """Enregistre l'état (écriture atomique : un lot interrompu ne fait pas avancer le high-water mark)"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as state_file:
+        json.dump({**state, 'updated_at': datetime.now().isoformat(timespec='seconds')}, state_file, indent=2)
+    os.replace(tmp_path, path)
+
+
+def batch_seed(seed: Optional[int], batch: int) -> Optional[int]:
+    """Graine de génération d'un lot : les lignes d'un id diffèrent d'un lot à l'autre"""
+    return None if seed is None else derive_seed(seed, batch, STREAM_DELTA)
+
+
+def plan_batch(high_water_mark: int, inserts: int, updates: int, deletes: int,
+               seed: Optional[int]) -> Tuple[List[int], List[int], List[int]]:
+    """
+    Ids d'un lot : (mises à jour, suppressions, insertions).
+
+    Les ids modifiés sont tirés sans remise parmi 1..high_water_mark et triés ;
+    les insertions suivent le high-water mark.
+    """
+    if updates + deletes > high_water_mark:
+        raise ValueError(f"{updates + deletes:,} ids à modifier pour seulement {high_water_mark:,} ids existants")
+    picked = random.Random(seed).sample(range(1, high_water_mark + 1), updates + deletes)
+    inserted = list(range(high_water_mark + 1, high_water_mark + inserts + 1))
+    return sorted(picked[:updates]), sorted(picked[updates:]), inserted
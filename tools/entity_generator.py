@@ -0,0 +1,943 @@
+"""
+Générateur CSV générique piloté par le schéma (Framework GCP Data Lakehouse).
+
+Une entité est décrite par une spécification YAML (`tools/entities/<entité>.yaml`)
+qui référence la DDL BigQuery de la table ODS, ou directement par un fichier
+DDL (`CREATE TABLE` / `CREATE EXTERNAL TABLE`) :
+- types, ordre des colonnes et NOT NULL sont lus dans la DDL
+- la spécification ajoute les bornes de validation (min_val, max_length...),
+  les stratégies de génération et les valeurs de repli
+- les colonnes sans stratégie reçoivent une stratégie déduite de leur type et
+  de leur nom (voir value_strategies.infer_strategy)
+
+Toutes les entités passent par le même pipeline : validateur compilé, moteurs
+ligne et colonnaire, génération parallèle, formats de sortie, graine et reprise.
+
+Démarrage rapide : NumPy et Faker ne sont chargés qu'à leur premier usage
+(l'aide ne charge ni l'un ni l'autre), Faker avec les seuls fournisseurs des
+colonnes de l'entité ; les workers héritent de l'état préparé par le parent
+(voir warm_up).
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import logging
+import os
+import random
+import re
+import shutil
+import stat
+import sys
+import time
+import zlib
+from datetime import datetime
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+
+from columnar_engine import csv_escape, get_pools, null_column, write_columnar
+from ddl_schema import parse_ddl_file
+from delta_batches import batch_seed, delta_filename, last_row_id, load_state, plan_batch, save_state, state_path
+from faker_pools import POOL_CACHE_DIR, build_distinct_pool, load_pool, pool_cache_path, save_pool
+from hive_layout import GRANULARITIES, split_csv_to_hive
+from lazy_imports import ensure_loaded, lazy_import
+from output_sinks import (OUTPUT_FORMATS, PIPELINE_BUFFER_SIZE, BudgetedCsvWriter, find_resume_point,
+                          format_filename, open_output, pipelined, strip_format_extension)
+from parallel_generation import finalize_shards, generate_shards, write_row_batch
+from run_checkpoint import CHECKPOINT_INTERVAL_SECONDS, RunCheckpoint
+from run_metrics import PROFILERS, RunMetrics, profiled
+from run_progress import ProgressReporter
+from schema_compiler import clean_column, compile_field, compile_row_validator, validate_field
+from schema_contract import preflight_contract
+from seeding import STREAM_POOL, derive_seed
+from value_strategies import (FakerStrategy, IdStrategy, build_strategy, faker_providers, generation_order,
+                              infer_strategy)
+
+np = lazy_import('numpy')
+
+logger = logging.getLogger(__name__)
+
+# Spécifications des entités livrées avec le framework
+ENTITIES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'entities')
+
+# Clés d'une colonne de la spécification reprises dans le schéma ODS (validation)
+SCHEMA_KEYS = ('type', 'required', 'min_val', 'max_val', 'max_length', 'min_date', 'max_date')
+# Clés de colonne hors schéma et hors paramètres de stratégie
+COLUMN_KEYS = ('fallback', 'null_rate')
+
+DEFAULT_LOCALE = 'fr_FR'
+DEFAULT_FLOAT_DECIMALS = 6
+
+# Taille cible en ligne de commande : nombre et unité (GB par défaut, ex: 1, 5MB, 250MB, 20GB, 1.5TB)
+SIZE_PATTERN = re.compile(r'^(\d+(?:\.\d+)?)(MB|GB|TB)?$', re.IGNORECASE)
+
+# Nombre de lignes échantillonnées pour estimer la taille moyenne d'une ligne
+ESTIMATE_SAMPLE_ROWS = 200
+
+# Générateurs déjà chargés dans le processus, par source (spécification ou DDL)
+_ENTITIES: Dict[str, 'EntityGenerator'] = {}
+
+
+class StrategyError(RuntimeError):
+    """Échec de la stratégie de génération d'une colonne (ligne remplacée par la ligne de repli)"""
+
+    def __init__(self, column: str, error: Exception):
+        super().__init__(f"{column}: {error}")
+        self.column = column
+
+
+def resolve_entity_source(source: str) -> str:
+    """Chemin de la spécification d'une entité : nom livré (employees), fichier .yaml/.yml ou DDL .sql"""
+    if os.path.splitext(source)[1].lower() in ('.yaml', '.yml', '.sql'):
+        return os.path.abspath(source)
+    path = os.path.join(ENTITIES_DIR, f"{source}.yaml")
+    if not os.path.exists(path):
+        available = sorted(os.path.splitext(name)[0] for name in os.listdir(ENTITIES_DIR))
+        raise ValueError(f"Entité inconnue: {source} (disponibles: {', '.join(available)})")
+    return path
+
+
+def load_spec(path: str) -> Dict[str, Any]:
+    """
+    Charge une spécification d'entité et la fusionne avec sa DDL.
+
+    Returns:
+        Spécification avec 'columns' dans l'ordre de la DDL, chaque colonne
+        portant son type BigQuery
+    """
+    if path.lower().endswith('.sql'):
+        table, ddl_columns = parse_ddl_file(path)
+        spec = {'entity': table.split('.')[-1], 'ddl': path, 'columns': {}}
+    else:
+        spec = _read_yaml_spec(path)
+        spec.setdefault('entity', os.path.splitext(os.path.basename(path))[0])
+        ddl_columns = None
+        if spec.get('ddl'):
+            _, ddl_columns = parse_ddl_file(spec['ddl'])
+
+    if ddl_columns is None:
+        missing = [name for name, column in spec['columns'].items() if not (column or {}).get('type')]
+        if missing:
+            raise ValueError(f"Type manquant (sans DDL) pour les colonnes: {', '.join(missing)}")
+        return spec
+
+    unknown = [name for name in spec['columns'] if name not in ddl_columns]
+    if unknown:
+        raise ValueError(f"Colonnes absentes de la DDL {os.path.basename(spec['ddl'])}: {', '.join(unknown)}")
+    columns = {}
+    for name, ddl_column in ddl_columns.items():
+        column = dict(spec['columns'].get(name) or {})
+        if column.get('type', ddl_column['type']) != ddl_column['type']:
+            raise ValueError(f"Type de {name} incohérent avec la DDL: {column['type']} != {ddl_column['type']}")
+        columns[name] = {**ddl_column, **column}
+    spec['columns'] = columns
+    return spec
+
+
+def _read_yaml_spec(path: str, extended_by: Tuple[str, ...] = ()) -> Dict[str, Any]:
+    """
+    Lit une spécification YAML (chemin de la DDL rendu absolu). Avec `extends`,
+    la spécification de base est chargée puis surchargée colonne par colonne :
+    une colonne qui change de stratégie n'hérite que de ses bornes, de son
+    repli et de son taux de NULL.
+    """
+    try:
+        import yaml
+    except ImportError:
+        raise RuntimeError("Les spécifications YAML nécessitent le paquet 'pyyaml' (pip install pyyaml)")
+    with open(path, 'r', encoding='utf-8') as spec_file:
+        spec = yaml.safe_load(spec_file) or {}
+    spec['columns'] = spec.get('columns') or {}
+    if spec.get('ddl'):
+        spec['ddl'] = os.path.normpath(os.path.join(os.path.dirname(path), spec['ddl']))
+    base_name = spec.pop('extends', None)
+    if base_name is None:
+        return spec
+
+    base_path = os.path.normpath(os.path.join(os.path.dirname(path), base_name))
+    if base_path in extended_by + (path,):
+        raise ValueError(f"Héritage circulaire de spécifications: {base_name}")
+    base = _read_yaml_spec(base_path, extended_by + (path,))
+    columns = {name: dict(column or {}) for name, column in base['columns'].items()}
+    for name, override in spec['columns'].items():
+        override = override or {}
+        column = columns.get(name, {})
+        if 'strategy' in override:
+            column = {key: value for key, value in column.items() if key in SCHEMA_KEYS + COLUMN_KEYS}
+        columns[name] = {**column, **override}
+    return {**base, **spec, 'columns': columns}
+
+
+def load_entity(source: str) -> 'EntityGenerator':
+    """Générateur d'une entité (mis en cache par processus)"""
+    path = resolve_entity_source(source)
+    if path not in _ENTITIES:
+        _ENTITIES[path] = EntityGenerator(path)
+    return _ENTITIES[path]
+
+
+class EntityGenerator:
+    """
+    Générateur d'une entité décrite par une spécification YAML ou une DDL.
+
+    Les méthodes publiques reprennent l'interface des scripts générateurs
+    (generate_row, generate_block, generate_csv_file...). L'objet se sérialise
+    par sa source : les workers le rechargent depuis leur cache de processus.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        spec = load_spec(source)
+        self.name = spec['entity']
+        self.ddl = spec.get('ddl')
+        self.float_decimals = spec.get('float_decimals', DEFAULT_FLOAT_DECIMALS)
+
+        self.schema_ods = {
+            name: {key: (str(column[key]) if key in ('min_date', 'max_date') else column[key])
+                   for key in SCHEMA_KEYS if key in column}
+            for name, column in spec['columns'].items()
+        }
+        self.headers = list(self.schema_ods.keys())
+        # Métriques du run en cours (réinitialisées à chaque génération), voir run_metrics
+        self.metrics = RunMetrics(self.name)
+        self.validate_row = compile_row_validator(self.schema_ods, self.float_decimals,
+                                                  on_failure=self._count_validation_failure)
+
+        self.strategies = {}
+        self.fallbacks = {}
+        # Taux de valeurs vides (NULL au chargement) par colonne, appliqués après validation
+        self.null_rates = {}
+        for position, (name, column) in enumerate(spec['columns'].items()):
+            strategy_spec = {key: value for key, value in column.items()
+                             if key not in SCHEMA_KEYS + COLUMN_KEYS}
+            if 'strategy' not in strategy_spec:
+                strategy_spec = infer_strategy(name, self.schema_ods[name], position)
+            clean = compile_field(name, self.schema_ods[name], self.float_decimals)
+            self.strategies[name] = build_strategy(name, self.schema_ods[name], clean, strategy_spec)
+            self.fallbacks[name] = column.get('fallback')
+            if column.get('null_rate'):
+                if not 0 < column['null_rate'] < 1 or self.schema_ods[name].get('required'):
+                    raise ValueError(f"null_rate de {name}: taux dans ]0, 1[ sur une colonne NULLABLE attendu")
+                self.null_rates[name] = float(column['null_rate'])
+        # Validateur des valeurs tirées par les stratégies : les colonnes aux valeurs
+        # déjà nettoyées (listes de référence, UUID) ne sont pas revalidées
+        self._validate_drawn = compile_row_validator(
+            self.schema_ods, self.float_decimals, on_failure=self._count_validation_failure,
+            clean_columns=[name for name, strategy in self.strategies.items() if strategy.clean_values])
+        self.order = generation_order(self.strategies, spec.get('draw_first', []))
+        self._null_positions = [(self.headers.index(name), rate) for name, rate in self.null_rates.items()]
+        # Suppression logique des lots delta : {'column': ..., 'value': ...}
+        self.soft_delete = spec.get('soft_delete')
+        if self.soft_delete and self.soft_delete.get('column') not in self.schema_ods:
+            raise ValueError(f"Colonne soft_delete inconnue: {self.soft_delete.get('column')}")
+
+        self.locale = spec.get('locale', DEFAULT_LOCALE)
+        # Instance Faker construite au premier usage (voir fake)
+        self._fake = None
+        # RNG partagé par les stratégies et Faker, réensemencé à chaque ligne avec une graine
+        self.rng = random.Random()
+        # Graine de génération du processus (None = non déterministe), voir configure_seed
+        self.seed = None
+        # Nombre de lignes des entités parentes des clés étrangères (génération liée), voir configure_seed
+        self.references = {}
+        # Temps du dernier pipeline génération / écriture (generate_csv_file(pipeline=True))
+        self.pipeline_stats = None
+        # Pools Faker du moteur colonnaire (construits au premier bloc de chaque processus)
+        self.pools = {}
+        # Mode pools distincts en cache disque (None = Faker à chaque valeur), voir configure_seed
+        self.pool_size = None
+        self.value_pools = {}
+        self._active_pools = {}
+
+    def __reduce__(self):
+        return load_entity, (self.source,)
+
+    @property
+    def fake(self):
+        """Instance Faker de la locale, construite au premier usage avec les seuls fournisseurs des colonnes"""
+        if self._fake is None:
+            from faker import Faker
+            self._fake = Faker(self.locale, providers=faker_providers(self.strategies.values()))
+            self._fake.random = self.rng
+        return self._fake
+
+    @property
+    def schema_source(self) -> str:
+        """Fichier de référence du schéma (DDL si disponible)"""
+        return os.path.basename(self.ddl or self.source)
+
+    def _count_validation_failure(self, column: str) -> None:
+        self.metrics.validation_failures[column] += 1
+
+    def take_metrics(self) -> RunMetrics:
+        """Retourne les métriques accumulées et repart de zéro (métriques d'un shard dans un worker)"""
+        metrics, self.metrics = self.metrics, RunMetrics(self.name)
+        return metrics
+
+    def validate_field(self, field_name: str, value: Any) -> Any:
+        """Valide un champ selon le schéma ODS (implémentation de référence, cellule par cellule)"""
+        return validate_field(self.schema_ods, field_name, value, self.float_decimals)
+
+    def configure_seed(self, seed: Optional[int], pool_size: Optional[int] = None,
+                       references: Optional[Dict[str, int]] = None) -> None:
+        """
+        Configure la graine de génération du processus courant (initializer des workers).
+
+        Avec une graine, generate_row(row_id) est une fonction pure de (seed, row_id) et
+        generate_block une fonction pure de (seed, bloc aligné). Sans graine, les RNG sont
+        réinitialisés depuis l'entropie système, y compris dans les workers forkés.
+        `pool_size` active l'échantillonnage dans des pools Faker distincts (voir value_pool).
+        `references` donne le nombre de lignes des entités parentes ({'employees': N}) :
+        les clés étrangères sont alors tirées dans [1, N] (voir ReferenceStrategy).
+        """
+        # Avec la même graine, les pools colonnaires déjà construits (par le parent
+        # avant le fork des workers, voir warm_up) sont identiques : ils sont conservés
+        if seed is None or seed != self.seed or pool_size != self.pool_size:
+            self.pools.clear()
+            self._active_pools.clear()
+        self.seed = seed
+        self.pool_size = pool_size
+        self.references = dict(references or {})
+        self.rng.seed(None if seed is None else derive_seed(seed, 0, STREAM_POOL))
+
+    def value_pool(self, strategy: FakerStrategy) -> List[str]:
+        """
+        Pool de `pool_size` valeurs distinctes et nettoyées d'une colonne Faker.
+
+        Rechargé depuis le cache disque s'il existe, sinon généré (avec une graine
+        dérivée de la colonne lorsque la génération est reproductible) puis enregistré.
+        L'état du RNG partagé est préservé : une ligne en cours n'est pas affectée.
+        """
+        pool = self._active_pools.get(strategy.name)
+        if pool is not None:
+            return pool
+
+        max_length = self.schema_ods[strategy.name].get('max_length')
+        path = pool_cache_path(self.locale, strategy.provider, strategy.args, max_length, self.pool_size, self.seed)
+        if path not in self.value_pools:
+            values = load_pool(path)
+            if values is None:
+                state = self.rng.getstate()
+                if self.seed is not None:
+                    self.rng.seed(derive_seed(self.seed, zlib.crc32(strategy.name.encode('utf-8')), STREAM_POOL))
+                values = build_distinct_pool(strategy.factory(self), strategy.clean, self.pool_size)
+                self.rng.setstate(state)
+                save_pool(path, values)
+                if len(values) < self.pool_size:
+                    logger.warning(f"⚠️ Pool {strategy.name}: {len(values):,} valeurs distinctes "
+                                   f"sur {self.pool_size:,} demandées (cardinalité de fake.{strategy.provider})")
+            self.value_pools[path] = values
+        self._active_pools[strategy.name] = self.value_pools[path]
+        return self.value_pools[path]
+
+    def prepare_value_pools(self) -> None:
+        """Charge ou génère les pools de toutes les colonnes Faker (avant le démarrage des workers)"""
+        for strategy in self.strategies.values():
+            if isinstance(strategy, FakerStrategy):
+                self.value_pool(strategy)
+
+    def generate_raw_data(self, row_id: int) -> Dict[str, Any]:
+        """
+        Génère les valeurs brutes (avant validation) d'une ligne du schéma ODS.
+        Les colonnes sont tirées dans l'ordre de génération puis rangées dans l'ordre du schéma.
+        """
+        values = self._draw_values(row_id)
+        return {name: values[name] for name in self.headers}
+
+    def _draw_values(self, row_id: int) -> Dict[str, Any]:
+        """Valeurs brutes d'une ligne dans l'ordre de génération (le validateur les range dans l'ordre du schéma)"""
+        if self.seed is not None:
+            self.rng.seed(derive_seed(self.seed, row_id))
+
+        values = {}
+        name = None
+        try:
+            for name in self.order:
+                values[name] = self.strategies[name].value(self, values, row_id)
+        except Exception as e:
+            raise StrategyError(name, e) from e
+        return values
+
+    def fallback_row(self, row_id: int) -> List[Any]:
+        """Ligne de repli avec valeurs par défaut (spécification `fallback`)"""
+        row = []
+        for name in self.headers:
+            fallback = self.fallbacks[name]
+            if isinstance(self.strategies[name], IdStrategy):
+                fallback = row_id
+            elif isinstance(fallback, str):
+                fallback = fallback.format(row_id=row_id)
+            elif fallback is None:
+                fallback = datetime.now().isoformat() if self.schema_ods[name]['type'] == 'TIMESTAMP' else ''
+            row.append(fallback)
+        return row
+
+    def generate_row(self, row_id: int) -> List[Any]:
+        """
+        Génère une ligne de données CSV conforme au schéma ODS.
+        Respecte exactement l'ordre des colonnes de la DDL.
+        """
+        metrics = self.metrics
+        metrics.rows_generated += 1
+        started = time.perf_counter()
+        try:
+            raw_data = self._draw_values(row_id)
+            generated = time.perf_counter()
+            row = self._validate_drawn(raw_data, row_id)
+            for index, rate in self._null_positions:
+                if self.rng.random() < rate:
+                    row[index] = ''
+        except Exception as e:
+            logger.error(f"Erreur lors de la génération de la ligne {row_id}: {e}")
+            metrics.fallback_rows += 1
+            if isinstance(e, StrategyError):
+                metrics.fallback_fields[e.column] += 1
+            return self.fallback_row(row_id)
+        metrics.add('generate', generated - started)
+        metrics.add('validate', time.perf_counter() - generated)
+        return row
+
+    def _rng_states(self, block_generator: Optional[np.random.Generator] = None) -> Dict[str, Any]:
+        """État des RNG (JSON) enregistré dans les points de reprise"""
+        version, internal, gauss = self.rng.getstate()
+        return {'row': [version, list(internal), gauss],
+                'block': block_generator.bit_generator.state if block_generator is not None else None}
+
+    def _restore_rng_states(self, states: Dict[str, Any],
+                            block_generator: Optional[np.random.Generator] = None) -> None:
+        version, internal, gauss = states['row']
+        self.rng.setstate((version, tuple(internal), gauss))
+        if block_generator is not None and states['block'] is not None:
+            block_generator.bit_generator.state = states['block']
+
+    def prepare_block_pools(self) -> None:
+        """Construit (une fois par processus et par graine) les pools Faker du moteur colonnaire"""
+        if self.pool_size:
+            for name, strategy in self.strategies.items():
+                if isinstance(strategy, FakerStrategy) and name not in self.pools:
+                    self.pools[name] = np.array([csv_escape(value) for value in self.value_pool(strategy)],
+                                                dtype=object)
+        else:
+            if self.seed is not None and not self.pools:
+                self.rng.seed(derive_seed(self.seed, 0, STREAM_POOL))
+            get_pools(self.pools, {
+                name: (strategy.factory(self), strategy.clean) for name, strategy in self.strategies.items()
+                if isinstance(strategy, FakerStrategy)
+            })
+
+    def warm_up(self, engine: str = 'row') -> None:
+        """
+        Prépare dans le parent l'état dont héritent les workers forkés : NumPy,
+        instance Faker et, avec une graine, pools du moteur colonnaire (identiques
+        dans chaque worker, construits une seule fois au lieu d'une fois par worker).
+        """
+        if any(strategy.faker_methods for strategy in self.strategies.values()):
+            _ = self.fake  # instance Faker construite au premier accès
+        if engine == 'columnar':
+            ensure_loaded(np)
+            if self.seed is not None or self.pool_size:
+                self.prepare_block_pools()
+
+    def generate_block(self, first_id: int, count: int, rng: np.random.Generator) -> List[Any]:
+        """
+        Génère un bloc de lignes colonne par colonne (moteur colonnaire vectorisé).
+        Même ordre de colonnes, mêmes distributions et mêmes bornes SCHEMA_ODS que generate_row.
+        """
+        self.prepare_block_pools()
+
+        columns = {}
+        for name in self.order:
+            strategy = self.strategies[name]
+            column = strategy.column(self, columns, first_id, count, rng)
+            schema = self.schema_ods[name]
+            if isinstance(column, np.ndarray) and column.dtype.kind in 'iuf' and \
+                    ('min_val' in schema or 'max_val' in schema):
+                column = np.clip(column, schema.get('min_val'), schema.get('max_val'))
+            elif not strategy.csv_ready:
+                if schema.get('type') == 'STRING':
+                    column = clean_column(column, schema.get('max_length'))
+                else:
+                    column = list(map(str, map(strategy.clean, column)))
+                column = [csv_escape(value) if '"' in value else value for value in column]
+            columns[name] = column
+        for name, rate in self.null_rates.items():
+            columns[name] = null_column(columns[name], rng.random(count) < rate)
+        return [columns[name] for name in self.headers]
+
+    def estimate_rows_needed(self, target_size_mb, sample_size: int = ESTIMATE_SAMPLE_ROWS):
+        """Estime le nombre de lignes nécessaires pour atteindre la taille cible"""
+        sample = io.BytesIO()
+        # L'échantillon n'entre pas dans les métriques du run
+        metrics = self.take_metrics()
+        try:
+            BudgetedCsvWriter(sample, None).write_rows(self.generate_row(row_id)
+                                                       for row_id in range(1, sample_size + 1))
+        finally:
+            self.metrics = metrics
+        avg_row_size = sample.tell() / sample_size
+        target_size_bytes = target_size_mb * 1024 * 1024
+        estimated_rows = int(target_size_bytes / avg_row_size)
+        logger.info(f"Taille moyenne d'une ligne: {avg_row_size:.0f} bytes")
+        logger.info(f"Nombre estimé de lignes nécessaires: {estimated_rows:,}")
+        return estimated_rows
+
+    def generate_csv_file(self, filename: str, target_size_mb: float, unit: str = 'MB',
+                          workers: int = 1, keep_parts: bool = False, engine: str = 'row',
+                          rows: Optional[int] = None, output_format: str = 'csv',
+                          seed: Optional[int] = None, resume: bool = False,
+                          pool_size: Optional[int] = None, pipeline: bool = False,
+                          references: Optional[Dict[str, int]] = None,
+                          checkpoint_interval: float = CHECKPOINT_INTERVAL_SECONDS) -> bool:
+        """
+        Génère un fichier CSV de la taille spécifiée.
+        La taille est comptée sur les octets encodés : le fichier s'arrête sur la
+        première ligne complète qui atteint la cible (ou exactement à `rows` lignes).
+        Conforme au framework GCP Data Lakehouse avec gestion d'erreurs robuste.
+
+        Args:
+            filename: Nom du fichier à générer
+            target_size_mb: Taille cible (en MB ou GB selon unit)
+            unit: 'MB' ou 'GB'
+            workers: Nombre de processus de génération (1 = mono-processus)
+            keep_parts: En mode multi-processus, conserve les shards part-00000.csv
+                dans un dossier portant le nom du fichier au lieu de les concaténer
+            engine: 'row' (ligne à ligne, Faker par cellule) ou 'columnar'
+                (blocs vectorisés NumPy avec pools Faker pré-générés)
+            rows: Nombre exact de lignes à générer (remplace la taille cible)
+            output_format: 'csv', 'csv.gz', 'csv.zst' ou 'parquet' ; la taille cible
+                porte sur le CSV non compressé équivalent
+            seed: Graine de génération ; la sortie est alors identique quel que soit
+                le nombre de workers et reproductible à l'octet près
+            resume: Reprend un fichier CSV interrompu (mono-processus) depuis son
+                point de reprise (voir run_checkpoint), à défaut après sa dernière
+                ligne complète ; le résultat est alors identique à une génération
+                sans interruption si la graine est fixée
+            pool_size: Échantillonne les colonnes Faker dans des pools de `pool_size`
+                valeurs distinctes mis en cache disque (cardinalité de la colonne)
+            pipeline: Écriture (et compression) dans un thread dédié pendant la
+                génération du lot suivant (mono-processus) ; sortie identique
+            references: Nombre de lignes des entités parentes des clés étrangères
+                ({'employees': N}, voir linked_generation)
+            checkpoint_interval: Intervalle (secondes) entre deux points de reprise
+                d'un fichier CSV mono-processus
+
+        Returns:
+            bool: True si succès, False sinon
+        """
+        self.metrics = RunMetrics(self.name)
+        labels = dict(file=filename, engine=engine, format=output_format, workers=workers, seed=seed)
+        try:
+            self.configure_seed(seed, pool_size, references)
+            if pool_size:
+                self.prepare_value_pools()
+                logger.info(f"🗃️ Pools Faker de {pool_size:,} valeurs distinctes (cache {POOL_CACHE_DIR})")
+            if resume and workers > 1:
+                raise ValueError("La reprise (--resume) n'est supportée qu'en mono-processus")
+            self.pipeline_stats = None
+            if pipeline and workers > 1:
+                logger.warning("⚠️ --pipeline ignoré en multi-processus (les shards sont écrits par les workers)")
+                pipeline = False
+
+            target = f"{rows:,} lignes" if rows is not None else f"{target_size_mb}{unit}"
+            logger.info(f"🚀 Génération de {filename} ({target}) - Framework GCP Data Lakehouse")
+
+            if rows is not None:
+                target_size_bytes = None
+                estimated_rows = rows
+            elif unit == 'GB':
+                target_size_bytes = target_size_mb * 1024 * 1024 * 1024
+                estimated_rows = self.estimate_rows_needed(target_size_mb * 1024)
+            else:
+                target_size_bytes = target_size_mb * 1024 * 1024
+                estimated_rows = self.estimate_rows_needed(target_size_mb)
+
+            # En-têtes conformes au schéma ODS (ordre exact)
+            headers = self.headers
+
+            # Validation des headers
+            logger.info(f"📋 Schéma ODS: {len(headers)} colonnes conformes à {self.schema_source}")
+
+            if workers > 1:
+                parts_dir = strip_format_extension(filename) if keep_parts else filename + '.parts'
+                logger.info(f"⚙️ Mode multi-processus: {workers} workers, shards dans {parts_dir}")
+                self.warm_up(engine)
+
+                part_paths, row_count, final_size, error_count = generate_shards(
+                    self.generate_row, headers, parts_dir, target_size_bytes, estimated_rows, workers,
+                    block_fn=self.generate_block if engine == 'columnar' else None, target_rows=rows,
+                    seed=seed, initializer=partial(self.configure_seed, pool_size=pool_size, references=references),
+                    metrics=self.metrics, metrics_fn=self.take_metrics)
+
+                filename = finalize_shards(part_paths, filename, parts_dir, output_format, self.schema_ods,
+                                           keep_parts, workers)
+                if keep_parts:
+                    logger.info(f"🧩 {len(part_paths)} shards conservés (wildcard part-*{OUTPUT_FORMATS[output_format]})")
+            else:
+                first_id, committed_rows, committed_size = 1, 0, 0
+                block_generator = np.random.default_rng() if engine == 'columnar' and seed is None else None
+                checkpoint = None
+                # Pas de point de reprise hors fichier régulier (tube nommé de l'upload : fsync impossible)
+                if output_format == 'csv' and is_regular_target(filename):
+                    config = dict(entity=self.name, engine=engine, seed=seed, target_size_bytes=target_size_bytes,
+                                  rows=rows, pool_size=pool_size, references=self.references, headers=headers)
+                    checkpoint = RunCheckpoint(filename, config, partial(self._rng_states, block_generator),
+                                               checkpoint_interval)
+                state = checkpoint.load() if checkpoint is not None and resume else None
+                if state is not None and os.path.exists(filename):
+                    committed_size = state['bytes_written']
+                    if os.path.getsize(filename) < committed_size:
+                        raise ValueError(f"{filename} est plus court que son point de reprise "
+                                         f"({committed_size:,} octets)")
+                    os.truncate(filename, committed_size)
+                    first_id, committed_rows = state['next_row_id'], state['rows_written']
+                    self._restore_rng_states(state['rng_state'], block_generator)
+                    logger.info(f"♻️ Reprise de {filename} au point de reprise du {state['saved_at']}: "
+                                f"{committed_rows:,} lignes, {committed_size:,} octets validés")
+                elif resume and os.path.exists(filename) and os.path.getsize(filename) > 0:
+                    last_id, committed_size = find_resume_point(filename)
+                    first_id, committed_rows = last_id + 1, last_id
+                    logger.info(f"♻️ Reprise de {filename} après l'id {last_id:,} ({committed_size:,} octets validés)")
+                elif checkpoint is not None:
+                    checkpoint.clear()
+
+                progress = ProgressReporter(target_size_bytes, rows, unit)
+                append = committed_size > 0
+                buffer_size = PIPELINE_BUFFER_SIZE if pipeline else -1
+                with open_output(filename, output_format, self.schema_ods, append=append,
+                                 buffer_size=buffer_size) as output, pipelined(output, pipeline) as csvfile:
+                    writer = BudgetedCsvWriter(csvfile, None if append else headers, target_size_bytes, rows,
+                                               rows_written=committed_rows, bytes_written=committed_size,
+                                               metrics=self.metrics)
+                    row_id = first_id
+                    error_count = 0
+
+                    # Point de reprise périodique après chaque lot écrit
+                    on_block = partial(checkpoint.update, csvfile, writer) if checkpoint is not None else None
+
+                    if engine == 'columnar':
+                        logger.info("⚡ Moteur colonnaire vectorisé (blocs NumPy)")
+                        write_columnar(csvfile, None, self.generate_block, first_id, progress=progress, seed=seed,
+                                       writer=writer, rng=block_generator, on_block=on_block)
+
+                    while not writer.done:
+                        # Lignes sérialisées au fil de la génération (mémoire bornée par le lot)
+                        count = writer.next_batch_size(10000)
+                        error_count += write_row_batch(writer, self.generate_row, row_id, count, len(headers))
+                        row_id += count
+                        progress.update(writer.rows_written, writer.bytes_written,
+                                        error_count + self.metrics.fallback_rows)
+                        if on_block is not None:
+                            on_block(row_id)
+
+                row_count = writer.rows_written
+                final_size = writer.bytes_written
+                self.pipeline_stats = csvfile.stats() if pipeline else None
+                if checkpoint is not None:
+                    if checkpoint.saved:
+                        logger.info(f"💾 {checkpoint.saved} points de reprise écrits, supprimés en fin de run")
+                    checkpoint.clear()
+
+            # Validation finale
+            metrics = self.metrics
+            error_count += metrics.fallback_rows
+            metrics.finish(row_count, final_size, True, **labels)
+            final_size_display = final_size / (1024 * 1024 * 1024) if unit == 'GB' else final_size / (1024 * 1024)
+            unit_display = 'GB' if unit == 'GB' else 'MB'
+
+            logger.info(f"✅ Fichier {filename} généré avec succès:")
+            logger.info(f"   📊 Taille: {final_size_display:.2f}{unit_display}")
+            if output_format != 'csv':
+                paths = [os.path.join(filename, name) for name in os.listdir(filename)] if keep_parts else [filename]
+                disk_size = sum(os.path.getsize(path) for path in paths)
+                logger.info(f"   🗜️ Taille sur disque ({output_format}): {disk_size / (1024 * 1024):.2f}MB "
+                            f"({disk_size / final_size:.1%} du CSV)")
+            logger.info(f"   📈 Lignes: {row_count:,}")
+            logger.info(f"   🔍 Erreurs: {error_count}")
+            if metrics.fallback_fields:
+                logger.info("   🔁 Lignes de repli par colonne: " +
+                            ', '.join(f"{column} {count:,}" for column, count in metrics.fallback_fields.most_common()))
+            if metrics.validation_failures:
+                logger.info("   🚫 Valeurs rejetées par la validation: " + ', '.join(
+                    f"{column} {count:,}" for column, count in metrics.validation_failures.most_common()))
+            logger.info("   ⏱️ Étapes: " + ', '.join(f"{stage} {seconds:.2f}s"
+                                                     for stage, seconds in metrics.stage_seconds.items()))
+            logger.info(f"   📋 Conforme au schéma ODS {self.name}")
+            if self.pipeline_stats:
+                stats = self.pipeline_stats
+                logger.info(f"   🔀 Pipeline: génération {stats['generation_seconds']:.2f}s, "
+                            f"écriture {stats['write_seconds']:.2f}s, total {stats['seconds']:.2f}s, "
+                            f"recouvrement {stats['overlap_efficiency']:.0%} "
+                            f"(limité par {'les E/S' if stats['bound'] == 'io' else 'le CPU'})")
+
+            return True
+
+        except Exception as e:
+            logger.error(f"❌ Erreur critique lors de la génération de {filename}: {e}")
+            self.metrics.finish(0, 0, False, **labels)
+            return False
+
+    def generate_partitioned_files(self, filename: str, target_size_mb: float, unit: str = 'MB',
+                                   partition_by: str = 'date_embauche', granularity: str = 'day',
+                                   **options) -> Optional[str]:
+        """
+        Génère un fichier (voir generate_csv_file) réparti en arborescence Hive
+        `<fichier>_<colonne>/dt=YYYY-MM-DD/part-00000.csv` selon une colonne DATE / TIMESTAMP.
+
+        La taille cible porte sur le CSV non partitionné (hors en-têtes répétés).
+
+        Returns:
+            Répertoire racine de l'arborescence, None en cas d'échec
+        """
+        if self.schema_ods.get(partition_by, {}).get('type') not in ('DATE', 'TIMESTAMP'):
+            logger.error(f"❌ Colonne de partition invalide: {partition_by} (colonne DATE ou TIMESTAMP attendue)")
+            return None
+        if granularity not in GRANULARITIES or options.get('output_format', 'csv') != 'csv' or \
+                options.get('keep_parts'):
+            logger.error("❌ Arborescence Hive : format csv sans --parts et granularité day, month ou year")
+            return None
+
+        output_dir = f"{strip_format_extension(filename)}_{partition_by}"
+        source = output_dir + '.unpartitioned.csv'
+        if not self.generate_csv_file(source, target_size_mb, unit, **options):
+            return None
+        try:
+            if os.path.exists(output_dir):
+                shutil.rmtree(output_dir)
+            counts = split_csv_to_hive(source, output_dir, partition_by, granularity)
+        except (OSError, ValueError) as e:
+            logger.error(f"❌ Erreur lors du partitionnement de {source}: {e}")
+            return None
+        finally:
+            if os.path.exists(source):
+                os.remove(source)
+        logger.info(f"🗂️ Arborescence Hive {output_dir}: {len(counts):,} partitions dt= ({granularity}), "
+                    f"{sum(counts.values()):,} lignes, {max(counts.values(), default=0):,} lignes au plus "
+                    f"par partition")
+        return output_dir
+
+    def generate_delta_file(self, data_dir: str, inserts: int, updates: int = 0, deletes: int = 0,
+                            seed: Optional[int] = None, base: Optional[str] = None,
+                            high_water_mark: Optional[int] = None) -> Optional[str]:
+        """
+        Génère le lot delta suivant d'une entité (voir delta_batches).
+
+        Args:
+            data_dir: Répertoire des fichiers générés et du fichier d'état
+            inserts, updates, deletes: Nombre de lignes de chaque opération
+            seed: Graine ; chaque lot dérive la sienne (ids et valeurs reproductibles)
+            base: Fichier complet de départ, initialise le high-water mark (premier lot)
+            high_water_mark: Plus grand id déjà chargé (remplace l'état et `base`)
+
+        Returns:
+            Chemin du fichier delta, None en cas d'échec
+        """
+        try:
+            if deletes and not self.soft_delete:
+                raise ValueError(f"Pas de colonne soft_delete dans la spécification de {self.name}")
+            path = state_path(data_dir, self.name)
+            state = load_state(path) or {'entity': self.name, 'high_water_mark': 0, 'batch': 0}
+            if high_water_mark is not None:
+                state['high_water_mark'] = high_water_mark
+            elif base is not None and state['batch'] == 0:
+                state['high_water_mark'] = last_row_id(base)
+            batch = state['batch'] + 1
+            filename = delta_filename(data_dir, self.name, batch)
+            logger.info(f"🔁 Lot delta {batch} de {self.name}: high-water mark {state['high_water_mark']:,}, "
+                        f"{inserts:,} insertions, {updates:,} mises à jour, {deletes:,} suppressions")
+
+            generation_seed = batch_seed(seed, batch)
+            updated, deleted, inserted = plan_batch(state['high_water_mark'], inserts, updates, deletes,
+                                                    generation_seed)
+            self.configure_seed(generation_seed)
+            self.metrics = RunMetrics(self.name)
+            delete_index = self.headers.index(self.soft_delete['column']) if deleted else None
+
+            os.makedirs(data_dir, exist_ok=True)
+            with open_output(filename, 'csv', self.schema_ods) as csvfile:
+                writer = BudgetedCsvWriter(csvfile, self.headers, metrics=self.metrics)
+                writer.write_rows(self.generate_row(row_id) for row_id in updated)
+                for row_id in deleted:
+                    row = self.generate_row(row_id)
+                    row[delete_index] = self.soft_delete['value']
+                    writer.write_rows([row])
+                writer.write_rows(self.generate_row(row_id) for row_id in inserted)
+
+            state.update({'batch': batch, 'high_water_mark': state['high_water_mark'] + inserts, 'seed': seed,
+                          'last_file': filename})
+            save_state(path, state)
+            self.metrics.finish(writer.rows_written, writer.bytes_written, True, file=filename, batch=batch,
+                                seed=seed)
+            logger.info(f"✅ Lot delta {filename}: {writer.rows_written:,} lignes, "
+                        f"{writer.bytes_written / (1024 * 1024):.2f}MB, "
+                        f"nouveau high-water mark {state['high_water_mark']:,}")
+            return filename
+
+        except Exception as e:
+            logger.error(f"❌ Erreur lors de la génération du lot delta de {self.name}: {e}")
+            self.metrics.finish(0, 0, False)
+            return None
+
+
+def is_regular_target(filename: str) -> bool:
+    """Vrai si la sortie est (ou sera créée comme) un fichier régulier"""
+    try:
+        return stat.S_ISREG(os.stat(filename).st_mode)
+    except FileNotFoundError:
+        return True
+
+
+def parse_size(text: str) -> Tuple[float, str, str]:
+    """
+    Taille cible de la ligne de commande ('5MB', '250MB', '20GB', '1.5TB', '5' = 5GB).
+
+    Returns:
+        (taille, 'MB' ou 'GB', suffixe du nom de fichier, ex: '250mb')
+    """
+    match = SIZE_PATTERN.match(text.strip())
+    if not match or float(match.group(1)) <= 0:
+        raise ValueError(f"Taille non supportée: {text} (ex: 5MB, 250MB, 20GB, 1.5TB)")
+    number, unit = match.group(1), (match.group(2) or 'GB').upper()
+    size = float(number) * (1024 if unit == 'TB' else 1)
+    if size.is_integer():
+        size = int(size)
+    return size, 'MB' if unit == 'MB' else 'GB', f"{number}{unit.lower()}"
+
+
+def export_metrics(metrics: RunMetrics, json_path: Optional[str], prometheus_path: Optional[str]) -> None:
+    """Exporte les métriques du run (rapport JSON, textfile Prometheus) ; un échec d'export n'est pas bloquant"""
+    try:
+        if json_path:
+            metrics.write_json(json_path)
+        if prometheus_path:
+            metrics.write_prometheus(prometheus_path)
+    except OSError as e:
+        logger.error(f"❌ Export des métriques impossible: {e}")
+
+
+def run_cli(entity: EntityGenerator, argv: Optional[List[str]] = None, prog: Optional[str] = None) -> None:
+    """Point d'entrée ligne de commande d'un générateur d'entité (taille ou nombre de lignes, lots delta)"""
+    argv = sys.argv[1:] if argv is None else argv
+    prog = prog or os.path.basename(sys.argv[0])
+    logger.info(f"🏗️ Générateur CSV {entity.name} - Framework GCP Data Lakehouse")
+    logger.info(f"📋 Conforme au schéma {entity.schema_source}")
+
+    if not argv:
+        print(f"Usage: python {prog} <1|5|5MB|--size TAILLE|--rows N> [--output FICHIER] [--workers N] [--parts]")
+        print("       [--engine row|columnar] [--format csv|csv.gz|csv.zst|parquet] [--seed N] [--resume]")
+        print("       [--pool-size N] [--pipeline] [--metrics-json FICHIER] [--metrics-prom FICHIER]")
+        print("       [--profile FICHIER]")
+        print(f"  1    = génère {entity.name}_1gb.csv (1GB)")
+        print(f"  5    = génère {entity.name}_5gb.csv (5GB)")
+        print(f"  5MB  = génère {entity.name}_5mb.csv (5MB)")
+        print(f"  --size TAILLE = taille quelconque (250MB, 20GB, 1.5TB), ex: {entity.name}_250mb.csv")
+        print(f"  --rows N      = exactement N lignes, ex: {entity.name}_1000000rows.csv")
+        print("  --output FICHIER = chemin du fichier généré (défaut: data/<entité>_<taille>)")
+        print(f"  delta = génère le lot delta suivant {entity.name}_delta_NNNNN.csv")
+        print("         [--inserts N] [--updates N] [--deletes N] [--base fichier] [--high-water-mark N]")
+        print("  --workers N = génération parallèle sur N processus")
+        print("  --parts     = conserve les shards part-00000.csv (wildcard 01_STG)")
+        print("  --engine    = row (défaut) ou columnar (blocs vectorisés NumPy)")
+        print("  --format    = csv (défaut), csv.gz, csv.zst ou parquet (écriture en flux)")
+        print("  --seed N    = génération reproductible, identique quel que soit --workers")
+        print("  --resume    = reprend un fichier CSV interrompu à son dernier point de reprise")
+        print(f"                (écrit toutes les {CHECKPOINT_INTERVAL_SECONDS:g}s, --checkpoint-every SECONDES)")
+        print("  --pool-size N = valeurs Faker tirées dans N valeurs distinctes en cache disque")
+        print("  --pipeline  = écriture et compression dans un thread dédié pendant la génération")
+        print("  --metrics-json FICHIER / --metrics-prom FICHIER = rapport de run JSON / textfile Prometheus")
+        print("  --profile FICHIER [--profiler cprofile|sampling] = profil cProfile ou piles échantillonnées")
+        print("  --partition-by COL [--granularity day|month|year] = arborescence Hive dt=YYYY-MM-DD/")
+        print("  --skip-contract-check = ne pas vérifier le contrat SCHEMA_ODS / DDL / LOAD DATA / SQLX")
+        print("\n🔍 Conformité Framework GCP Data Lakehouse:")
+        print(f"  • Schéma: {len(entity.schema_ods)} colonnes ODS")
+        print("  • Validation: Types BigQuery respectés")
+        print("  • Nettoyage: Délimiteurs CSV sécurisés")
+        print("  • Logging: Suivi des erreurs détaillé")
+        sys.exit(1)
+
+    parser = argparse.ArgumentParser(prog=prog, add_help=False)
+    parser.add_argument('taille', nargs='?')
+    parser.add_argument('--size')
+    parser.add_argument('--rows', type=int)
+    parser.add_argument('--output')
+    parser.add_argument('--checkpoint-every', type=float, default=CHECKPOINT_INTERVAL_SECONDS)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--parts', action='store_true')
+    parser.add_argument('--engine', choices=['row', 'columnar'], default='row')
+    parser.add_argument('--format', choices=list(OUTPUT_FORMATS), default='csv')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--resume', action='store_true')
+    parser.add_argument('--pool-size', type=int)
+    parser.add_argument('--pipeline', action='store_true')
+    parser.add_argument('--inserts', type=int, default=0)
+    parser.add_argument('--updates', type=int, default=0)
+    parser.add_argument('--deletes', type=int, default=0)
+    parser.add_argument('--base')
+    parser.add_argument('--high-water-mark', type=int)
+    parser.add_argument('--partition-by')
+    parser.add_argument('--granularity', choices=list(GRANULARITIES), default='day')
+    parser.add_argument('--metrics-json')
+    parser.add_argument('--metrics-prom')
+    parser.add_argument('--profile')
+    parser.add_argument('--profiler', choices=list(PROFILERS), default='cprofile')
+    parser.add_argument('--skip-contract-check', action='store_true')
+    args = parser.parse_args(argv)
+
+    # Un écart entre le SCHEMA_ODS et les DDL / LOAD DATA / SQLX ferait échouer le chargement
+    if not args.skip_contract_check and not preflight_contract(entity.name, entity.schema_ods):
+        sys.exit(1)
+
+    # Créer le dossier data s'il n'existe pas
+    data_dir = 'data'
+    if args.taille == 'delta' or not args.output:
+        os.makedirs(data_dir, exist_ok=True)
+        logger.info(f"📁 Répertoire de sortie: {os.path.abspath(data_dir)}")
+
+    if args.taille == 'delta':
+        with profiled(args.profile, args.profiler):
+            filename = entity.generate_delta_file(data_dir, args.inserts, args.updates, args.deletes,
+                                                  seed=args.seed, base=args.base,
+                                                  high_water_mark=args.high_water_mark)
+        export_metrics(entity.metrics, args.metrics_json, args.metrics_prom)
+        if filename:
+            logger.info(f"📋 Lot prêt pour le chargement incrémental (01_STG.{entity.name}_delta)")
+        sys.exit(0 if filename else 1)
+
+    if [args.taille, args.size, args.rows].count(None) != 2:
+        logger.error("❌ Indiquer une seule taille: 1, 5, 5MB, --size TAILLE ou --rows N")
+        sys.exit(1)
+    if args.rows is not None:
+        if args.rows <= 0:
+            logger.error(f"❌ Nombre de lignes invalide: {args.rows}")
+            sys.exit(1)
+        size, unit, suffix = 0, 'MB', f"{args.rows}rows"
+    else:
+        try:
+            size, unit, suffix = parse_size(args.taille or args.size)
+        except ValueError as e:
+            logger.error(f"❌ {e}")
+            logger.info("✅ Tailles supportées: 1, 5, 5MB ou --size 250MB / 20GB / 1.5TB")
+            sys.exit(1)
+
+    if args.output:
+        filename = args.output
+        os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+    else:
+        filename = format_filename(os.path.join(data_dir, f"{entity.name}_{suffix}"), args.format)
+    options = dict(workers=args.workers, keep_parts=args.parts, engine=args.engine, output_format=args.format,
+                   rows=args.rows, seed=args.seed, resume=args.resume, pool_size=args.pool_size,
+                   pipeline=args.pipeline, checkpoint_interval=args.checkpoint_every)
+    with profiled(args.profile, args.profiler):
+        if args.partition_by:
+            success = entity.generate_partitioned_files(filename, size, unit, args.partition_by, args.granularity,
+                                                        **options) is not None
+        else:
+            success = entity.generate_csv_file(filename, size, unit, **options)
+    export_metrics(entity.metrics, args.metrics_json, args.metrics_prom)
+
+    if success:
+        logger.info("🎉 Génération terminée avec succès!")
+        logger.info("📋 Fichier prêt pour ingestion BigQuery")
+        sys.exit(0)
+    else:
+        logger.error("💥 Échec de la génération")
+        sys.exit(1)
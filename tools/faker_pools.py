@@ -0,0 +1,77 @@
+"""
+Pools de valeurs Faker distinctes mis en cache sur disque (mode `--pool-size N`).
+
+Chaque fournisseur Faker d'une entité (ex: fake.company, fake.text(max_nb_chars=400))
+est appelé jusqu'à obtenir N valeurs distinctes, nettoyées selon le schéma ODS.
+Les moteurs ligne et colonnaire échantillonnent ensuite dans ce pool : N fixe
+la cardinalité de la colonne générée (jointures, compression BigQuery).
+
+Les pools sont enregistrés (pickle) dans POOL_CACHE_DIR, avec une clé qui
+dépend de la version de Faker, de la locale, du fournisseur et de ses
+arguments, du nettoyage (max_length), de N et de la graine : un lancement
+suivant recharge le pool au lieu de le régénérer.
+"""
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Répertoire du cache des pools (surchargeable par la variable d'environnement)
+POOL_CACHE_DIR = os.environ.get('LAKEHOUSE_POOL_CACHE',
+                                os.path.join(os.path.expanduser('~'), '.cache', 'lakehouse-generator', 'pools'))
+
+# Nombre maximal d'appels au fournisseur, en multiple de la taille demandée
+DISTINCT_ATTEMPTS_FACTOR = 3
+
+
+def pool_cache_path(locale: str, provider: str, args: Dict[str, Any], max_length: Optional[int],
+                    size: int, seed: Optional[int], cache_dir: str = POOL_CACHE_DIR) -> str:
+    """Chemin du fichier de cache d'un pool"""
+    from faker import VERSION as FAKER_VERSION
+    key = json.dumps([FAKER_VERSION, locale, provider, args, max_length, size, seed], sort_keys=True)
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{locale}_{provider}_{size}_{digest}.pkl")
+
+
+def build_distinct_pool(factory: Callable[[], Any], clean: Callable[[Any], Any], size: int) -> List[str]:
+    """
+    Appelle `factory` jusqu'à obtenir `size` valeurs nettoyées distinctes.
+
+    Un fournisseur de faible cardinalité (ex: prénoms) s'arrête après
+    DISTINCT_ATTEMPTS_FACTOR * size appels avec moins de valeurs.
+    """
+    values = {}
+    for _ in range(size * DISTINCT_ATTEMPTS_FACTOR):
+        values.setdefault(str(clean(factory())), None)
+        if len(values) >= size:
+            break
+    return list(values)
+
+
+def load_pool(path: str) -> Optional[List[str]]:
+    """Pool en cache, ou None s'il est absent ou illisible"""
+    try:
+        with open(path, 'rb') as pool_file:
+            return pickle.load(pool_file)
+    except FileNotFoundError:
+        return None
+    except (OSError, pickle.UnpicklingError, EOFError) as e:
+        logger.warning(f"⚠️ Cache de pool illisible ({path}): {e}")
+        return None
+
+
+def save_pool(path: str, values: List[str]) -> None:
+    """Enregistre un pool (écriture atomique : workers concurrents sans fichier partiel)"""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as pool_file:
+            pickle.dump(values, pool_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"⚠️ Impossible d'enregistrer le pool {path}: {e}")
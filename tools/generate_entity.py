@@ -0,0 +1,31 @@
+"""
+Générateur CSV générique : toute entité décrite par une spécification YAML
+(tools/entities/*.yaml) ou directement par sa DDL BigQuery.
+
+Usage: python generate_entity.py <entité|spec.yaml|table.sql> [<1|5|5MB|250MB|20GB> | --size <taille> | --rows N]
+                                  [--output <fichier>] [options]
+  ex:  python generate_entity.py contract 5MB --engine columnar
+       python generate_entity.py employees --size 250MB --output /data/employees_250mb.csv
+       python generate_entity.py contract --rows 100000 --seed 42
+       python generate_entity.py ../Bigquery/00_ddl/create_external_table_stg_employees.sql 5MB
+"""
+import logging
+import sys
+
+from entity_generator import load_entity, run_cli
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__.strip())
+        sys.exit(1)
+
+    try:
+        entity = load_entity(sys.argv[1])
+    except (OSError, ValueError, RuntimeError) as e:
+        logger.error(f"❌ Spécification invalide: {e}")
+        sys.exit(1)
+    run_cli(entity, sys.argv[2:], prog=f"generate_entity.py {sys.argv[1]}")
@@ -0,0 +1,84 @@
+"""
+Découpage des fichiers générés en arborescence partitionnée de type Hive.
+
+Un CSV généré est réparti, en un passage et en mémoire bornée, dans
+`<répertoire>/dt=YYYY-MM-DD/part-00000.csv` selon une colonne DATE ou
+TIMESTAMP (granularité jour, mois ou année : la clé reste une date, premier
+jour du mois ou de l'année). Chaque fichier porte son en-tête, comme les
+shards --parts : la table externe 01_STG `_hive` les lit avec
+skip_leading_rows = 1 et la colonne de partition `dt`.
+"""
+import os
+from typing import Dict, List
+
+# Granularités de partition -> longueur du préfixe de date conservé
+GRANULARITIES = {'day': 10, 'month': 7, 'year': 4}
+
+# Clé Hive des lignes sans date
+DEFAULT_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+
+# Nom de la colonne de partition Hive
+PARTITION_KEY = 'dt'
+
+# Lignes en attente (toutes partitions confondues) avant écriture sur disque
+FLUSH_ROWS = 100_000
+
+
+def partition_value(value: str, granularity: str = 'day') -> str:
+    """Clé de partition d'une date ou d'un horodatage ISO (2024-03-15, 2024-03-15T10:00:00)"""
+    if not value:
+        return DEFAULT_PARTITION
+    prefix = value[:GRANULARITIES[granularity]]
+    return prefix + '-01-01'[len(prefix) - 4:] if granularity != 'day' else prefix
+
+
+def partition_dir(output_dir: str, value: str) -> str:
+    return os.path.join(output_dir, f"{PARTITION_KEY}={value}")
+
+
+def split_csv_to_hive(source: str, output_dir: str, column: str, granularity: str = 'day',
+                      part_name: str = 'part-00000.csv') -> Dict[str, int]:
+    """
+    Répartit un CSV généré (délimiteur ';', en-tête) dans une arborescence Hive.
+
+    Les valeurs nettoyées ne contiennent ni ';' ni fin de ligne : chaque ligne
+    est un enregistrement et la colonne de partition se lit sans analyse CSV ;
+    les lignes sont recopiées à l'identique.
+
+    Returns:
+        Nombre de lignes par partition
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Granularité inconnue: {granularity} ({', '.join(GRANULARITIES)})")
+    counts: Dict[str, int] = {}
+    pending: Dict[str, List[bytes]] = {}
+    pending_rows = 0
+
+    def flush() -> None:
+        for value, lines in pending.items():
+            path = os.path.join(partition_dir(output_dir, value), part_name)
+            new_file = not os.path.exists(path)
+            if new_file:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'ab') as part:
+                if new_file:
+                    part.write(header)
+                part.writelines(lines)
+        pending.clear()
+
+    with open(source, 'rb') as csvfile:
+        header = csvfile.readline()
+        names = header.rstrip(b'\r\n').decode('utf-8').split(';')
+        if column not in names:
+            raise ValueError(f"Colonne de partition absente du fichier: {column}")
+        index = names.index(column)
+        for line in csvfile:
+            value = partition_value(line.split(b';', index + 1)[index].decode('ascii').strip('"'), granularity)
+            pending.setdefault(value, []).append(line)
+            counts[value] = counts.get(value, 0) + 1
+            pending_rows += 1
+            if pending_rows >= FLUSH_ROWS:
+                flush()
+                pending_rows = 0
+    flush()
+    return counts
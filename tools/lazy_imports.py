@@ -0,0 +1,36 @@
+"""
+Imports différés des dépendances lourdes (NumPy).
+
+`lazy_import('numpy')` enregistre le module sans l'exécuter
+(importlib.util.LazyLoader) : il n'est réellement chargé qu'au premier accès
+à l'un de ses attributs, ou par `ensure_loaded(module)`. Afficher l'aide d'un générateur ou générer un petit
+fichier avec le moteur ligne ne paie donc pas l'import de NumPy.
+
+Les modules qui l'utilisent déclarent `from __future__ import annotations`,
+pour que les annotations `np.ndarray` ne déclenchent pas le chargement.
+"""
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Module `name` chargé au premier accès à un attribut (déjà importé : retourné tel quel)"""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def ensure_loaded(module: ModuleType) -> ModuleType:
+    """Force le chargement d'un module différé par lazy_import (sans effet s'il est déjà chargé)"""
+    # Tout accès à un attribut d'un module LazyLoader exécute son chargement
+    getattr(module, '__dict__')
+    return module
@@ -0,0 +1,109 @@
+"""
+Génération liée de deux entités par clé étrangère (ex: employees ↔ contract).
+
+L'entité parente est générée en premier ; son nombre de lignes N suffit à
+lier l'enfant : la colonne `strategy: reference` de l'enfant tire ses clés
+dans l'espace d'ids [1, N] (graine + permutation affine, voir
+ReferenceStrategy), sans relire ni garder la table parente en mémoire.
+L'enfant compte `fan_out` lignes par ligne parente, toujours dans [1, N] :
+aucune clé orpheline, quelle que soit la taille ou le nombre de workers.
+
+Usage: python linked_generation.py <parent> <enfant> [<1|5|5MB|250MB|20GB> | --size TAILLE | --rows N]
+                                  [--output DOSSIER] [--fan-out F] [options]
+  ex:  python linked_generation.py employees contract 5MB --fan-out 3 --seed 42
+       python linked_generation.py employees contract --rows 100000 --output /data/linked
+"""
+import argparse
+import logging
+import os
+import sys
+
+from entity_generator import load_entity, parse_size
+from output_sinks import OUTPUT_FORMATS, format_filename
+from schema_contract import preflight_contract
+from value_strategies import ReferenceStrategy
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def reference_column(child, parent_name: str) -> ReferenceStrategy:
+    """Stratégie de la colonne de l'enfant qui référence l'entité parente"""
+    for strategy in child.strategies.values():
+        if isinstance(strategy, ReferenceStrategy) and strategy.entity == parent_name:
+            return strategy
+    raise ValueError(f"Aucune colonne 'strategy: reference' vers {parent_name} dans {child.name}")
+
+
+def generate_linked_files(parent, child, parent_filename: str, child_filename: str, target_size_mb: float,
+                          unit: str = 'MB', fan_out: float = None, rows: int = None, **options) -> bool:
+    """
+    Génère le fichier parent à la taille cible (ou exactement `rows` lignes)
+    puis l'enfant avec `fan_out` lignes par ligne parente (par défaut celui de
+    la colonne de référence).
+    """
+    reference = reference_column(child, parent.name)
+    fan_out = fan_out or reference.fan_out
+
+    if not parent.generate_csv_file(parent_filename, target_size_mb, unit, rows=rows, **options):
+        return False
+    parent_rows = parent.metrics.rows
+    child_rows = max(1, round(parent_rows * fan_out))
+    logger.info(f"🔗 {child.name}.{reference.name} → {parent.name}.id : {child_rows:,} lignes "
+                f"pour {parent_rows:,} {parent.name} (fan-out {fan_out:g})")
+
+    if not child.generate_csv_file(child_filename, 0, rows=child_rows,
+                                   references={parent.name: parent_rows}, **options):
+        return False
+    logger.info(f"✅ Génération liée terminée: {parent_filename} ({parent_rows:,} lignes), "
+                f"{child_filename} ({child.metrics.rows:,} lignes)")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog='linked_generation.py',
+                                     description="Génère une entité parente et une entité enfant liées par clé étrangère")
+    parser.add_argument('parent')
+    parser.add_argument('enfant')
+    parser.add_argument('taille', nargs='?', help="taille du fichier parent (1, 5, 5MB, 250MB, 20GB...)")
+    parser.add_argument('--size', help="taille du fichier parent (250MB, 20GB, 1.5TB...)")
+    parser.add_argument('--rows', type=int, help="nombre exact de lignes du fichier parent")
+    parser.add_argument('--output', default='data', help="dossier des deux fichiers générés (défaut: data)")
+    parser.add_argument('--fan-out', type=float, help="lignes enfant par ligne parente (défaut: celui de la spec)")
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--engine', choices=['row', 'columnar'], default='row')
+    parser.add_argument('--format', choices=list(OUTPUT_FORMATS), default='csv')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--pool-size', type=int)
+    parser.add_argument('--skip-contract-check', action='store_true')
+    args = parser.parse_args()
+
+    if [args.taille, args.size, args.rows].count(None) != 2:
+        logger.error("❌ Indiquer une seule taille: 1, 5, 5MB, --size TAILLE ou --rows N")
+        sys.exit(1)
+    try:
+        if args.rows is not None:
+            if args.rows <= 0:
+                raise ValueError(f"Nombre de lignes invalide: {args.rows}")
+            size, unit, suffix = 0, 'MB', f"{args.rows}rows"
+        else:
+            size, unit, suffix = parse_size(args.taille or args.size)
+        parent, child = load_entity(args.parent), load_entity(args.enfant)
+        reference_column(child, parent.name)
+    except (OSError, ValueError, RuntimeError) as e:
+        logger.error(f"❌ Paramètres invalides: {e}")
+        sys.exit(1)
+    if args.fan_out is not None and args.fan_out <= 0:
+        logger.error(f"❌ Fan-out invalide: {args.fan_out}")
+        sys.exit(1)
+    if not args.skip_contract_check and not all([preflight_contract(entity.name, entity.schema_ods)
+                                                 for entity in (parent, child)]):
+        sys.exit(1)
+
+    os.makedirs(args.output, exist_ok=True)
+    filenames = [format_filename(os.path.join(args.output, f"{entity.name}_{suffix}"), args.format)
+                 for entity in (parent, child)]
+    success = generate_linked_files(parent, child, *filenames, size, unit, fan_out=args.fan_out,
+                                    rows=args.rows, workers=args.workers, engine=args.engine,
+                                    output_format=args.format, seed=args.seed, pool_size=args.pool_size)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,354 @@
+"""
+Émulateur local des chargements ODS (Framework GCP Data Lakehouse) sur DuckDB.
+
+Rejoue hors GCP, sur les fichiers générés dans `data/`, les deux chemins
+d'ingestion du dépôt :
+- `load-data` : Bigquery/02_ods/load_csv_to_ods_<entité>.sql, soit TRUNCATE
+  puis LOAD DATA (liste de colonnes typées, field_delimiter, skip_leading_rows).
+  Comme dans BigQuery, ingestion_date prend la valeur DEFAULT de la DDL ODS
+  et source_file reste NULL.
+- `dataform` : Dataform/02_ods/load_stg_to_ods_<entité>.sqlx, soit la table
+  externe 01_STG (DDL Bigquery/00_ddl/create_external_table_stg_<entité>.sql)
+  puis le SELECT de la SQLX matérialisé dans 02_ODS, avec ses colonnes
+  ingestion_date / source_file. Avec `--incremental`, la variante
+  load_stg_to_ods_<entité>_incremental.sqlx applique un lot delta par MERGE.
+
+Les tables sont créées depuis les DDL du dépôt : une valeur qui ne respecte
+pas le type BigQuery fait échouer le chargement, comme LOAD DATA sans
+max_bad_records. Les fichiers sont lus en flux par DuckDB dans une base sur
+disque avec une limite mémoire : un fichier de plusieurs GB se charge en
+mémoire bornée. Le débit du chargement (lignes/s, MB/s) est affiché.
+
+Usage: python local_loader.py <load-data|dataform> <entité> [--source fichier ...] [--incremental]
+                              [--database data/lakehouse_local.duckdb] [--memory-limit 1GB]
+  ex:  python local_loader.py load-data employees --source data/employees_5mb.csv
+       python local_loader.py dataform employees --incremental --source data/employees_delta_00001.csv
+"""
+import argparse
+import glob
+import logging
+import os
+import re
+import resource
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ddl_schema import ODS_DDL, REPO_DIR, STG_DDL, parse_ddl, parse_ddl_file, parse_options
+
+logger = logging.getLogger(__name__)
+
+# Scripts d'ingestion d'une entité, relatifs à la racine du dépôt (DDL : voir ddl_schema)
+LOAD_DATA_SQL = os.path.join('Bigquery', '02_ods', 'load_csv_to_ods_{entity}.sql')
+DATAFORM_SQLX = os.path.join('Dataform', '02_ods', 'load_stg_to_ods_{entity}.sqlx')
+DATAFORM_INCREMENTAL_SQLX = os.path.join('Dataform', '02_ods', 'load_stg_to_ods_{entity}_incremental.sqlx')
+
+DEFAULT_DATABASE = os.path.join('data', 'lakehouse_local.duckdb')
+DEFAULT_MEMORY_LIMIT = '1GB'
+
+# Types BigQuery -> DuckDB (TIMESTAMP BigQuery : instant absolu, en UTC)
+DUCKDB_TYPES = {
+    'INT64': 'BIGINT',
+    'FLOAT64': 'DOUBLE',
+    'NUMERIC': 'DECIMAL(38, 9)',
+    'STRING': 'VARCHAR',
+    'BYTES': 'BLOB',
+    'BOOL': 'BOOLEAN',
+    'DATE': 'DATE',
+    'DATETIME': 'TIMESTAMP',
+    'TIMESTAMP': 'TIMESTAMPTZ',
+}
+
+# Fonctions BigQuery sans équivalent direct dans DuckDB
+_FUNCTIONS = [
+    (re.compile(r"\bCURRENT_TIMESTAMP\s*\(\s*\)", re.IGNORECASE), 'current_timestamp'),
+    (re.compile(r"\bCURRENT_DATE\s*\(\s*\)", re.IGNORECASE), 'current_date'),
+]
+
+# `projet.dataset.table` ou `dataset.table` -> "dataset"."table"
+_TABLE_REF = re.compile(r"`(?:[\w\-]+\.)?(\w+)\.(\w+)`")
+
+
+def _import_duckdb():
+    try:
+        import duckdb
+    except ImportError:
+        raise RuntimeError("L'émulateur local nécessite le paquet 'duckdb' (pip install duckdb)")
+    return duckdb
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def translate_sql(sql: str) -> str:
+    """Traduit une expression ou requête BigQuery en SQL DuckDB (références de tables, fonctions)"""
+    sql = _TABLE_REF.sub(lambda match: f"{_quote(match.group(1))}.{_quote(match.group(2))}", sql)
+    for pattern, replacement in _FUNCTIONS:
+        sql = pattern.sub(replacement, sql)
+    return sql
+
+
+def table_ref(name: str) -> str:
+    """Nom de table BigQuery (projet.dataset.table) -> référence DuckDB "dataset"."table" """
+    return translate_sql(f"`{name}`")
+
+
+def parse_load_data(sql: str) -> Dict[str, Any]:
+    """
+    Analyse un script TRUNCATE + LOAD DATA.
+
+    Returns:
+        {'table', 'truncate', 'columns' (schéma ODS de la liste typée), 'options'}
+    """
+    match = re.search(r"LOAD\s+DATA\s+(?:OVERWRITE\s+|INTO\s+)+`?([\w.\-]+)`?\s*\((.*?)\)\s*FROM\s+FILES",
+                      sql, re.IGNORECASE | re.DOTALL)
+    if match is None:
+        raise ValueError("Aucune instruction LOAD DATA ... FROM FILES trouvée")
+    _, columns = parse_ddl(f"CREATE TABLE t ({match.group(2)})", exclude=())
+    truncate = re.search(rf"TRUNCATE\s+TABLE\s+`?{re.escape(match.group(1))}`?", sql, re.IGNORECASE)
+    return {
+        'table': match.group(1),
+        'truncate': truncate is not None or re.search(r"LOAD\s+DATA\s+OVERWRITE", sql, re.IGNORECASE) is not None,
+        'columns': columns,
+        'options': parse_options(sql[match.end(2):]),
+    }
+
+
+def parse_sqlx(text: str) -> Tuple[Dict[str, str], str]:
+    """
+    Analyse une définition Dataform : bloc config { ... } et requête SELECT.
+
+    Les options imbriquées (bigquery: { partitionBy: ... }) sont aplaties ;
+    les listes (uniqueKey) sont retournées en liste Python.
+
+    Returns:
+        (config {'type', 'schema', 'name', 'uniqueKey'...}, requête)
+    """
+    text = re.sub(r"--[^\n]*", '', text)
+    match = re.search(r"config\s*\{", text)
+    if match is None:
+        raise ValueError("Bloc config { ... } absent de la définition Dataform")
+    depth = 1
+    for position in range(match.end(), len(text)):
+        depth += {'{': 1, '}': -1}.get(text[position], 0)
+        if depth == 0:
+            break
+    body = text[match.end():position]
+    config = {}
+    for key, scalar, items in re.findall(r"(\w+)\s*:\s*(?:[\"']([^\"']*)[\"']|\[([^\]]*)\])", body):
+        config.setdefault(key, re.findall(r"[\"']([^\"']*)[\"']", items) if items else scalar)
+    return config, text[position + 1:].strip().rstrip(';')
+
+
+def peak_rss_mb() -> float:
+    """Pic de mémoire résidente du processus courant, en MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class LocalLoader:
+    """
+    Base DuckDB locale qui rejoue les scripts d'ingestion d'une entité.
+
+    Les schémas 01_STG et 02_ODS sont créés à l'ouverture ; les fichiers
+    sources sont résolus par le nom de fichier de leur URI gs:// dans
+    `data_dir`, ou fournis explicitement (`sources`).
+    """
+
+    def __init__(self, database: str = DEFAULT_DATABASE, memory_limit: str = DEFAULT_MEMORY_LIMIT,
+                 threads: Optional[int] = None, data_dir: str = 'data', repo_dir: str = REPO_DIR):
+        duckdb = _import_duckdb()
+        self.error = duckdb.Error
+        self.data_dir = data_dir
+        self.repo_dir = repo_dir
+        if database != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(database)), exist_ok=True)
+        self.connection = duckdb.connect(database)
+        self.connection.execute("SET TimeZone = 'UTC'")
+        self.connection.execute(f"SET memory_limit = '{memory_limit}'")
+        # Pas d'ordre à conserver : DuckDB peut vider ses tampons plus tôt
+        self.connection.execute("SET preserve_insertion_order = false")
+        if threads:
+            self.connection.execute(f"SET threads = {int(threads)}")
+        for schema in ('01_STG', '02_ODS'):
+            self.connection.execute(f"CREATE SCHEMA IF NOT EXISTS {_quote(schema)}")
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def script_path(self, template: str, entity: str) -> str:
+        path = os.path.join(self.repo_dir, template.format(entity=entity))
+        if not os.path.exists(path):
+            raise ValueError(f"Script d'ingestion introuvable pour {entity}: {path}")
+        return path
+
+    def resolve_sources(self, uris: List[str], sources: Optional[List[str]] = None) -> List[str]:
+        """Fichiers locaux d'un chargement : `sources` (motifs glob acceptés) ou URIs gs:// -> data_dir"""
+        patterns = sources or [os.path.join(self.data_dir, uri.rsplit('/', 1)[-1]) for uri in uris]
+        files = []
+        for pattern in patterns:
+            matches = sorted(glob.glob(pattern))
+            if not matches:
+                raise ValueError(f"Fichier source introuvable: {pattern} (voir --source)")
+            files.extend(matches)
+        return files
+
+    def create_table(self, table: str, columns: Dict[str, Dict[str, Any]]) -> None:
+        """CREATE OR REPLACE TABLE d'après un schéma de DDL (types, NOT NULL, DEFAULT)"""
+        definitions = []
+        for name, column in columns.items():
+            definition = f"{_quote(name)} {DUCKDB_TYPES[column['type']]}"
+            if column.get('required'):
+                definition += ' NOT NULL'
+            if column.get('default'):
+                definition += f" DEFAULT {translate_sql(column['default'])}"
+            definitions.append(definition)
+        self.connection.execute(f"CREATE OR REPLACE TABLE {table_ref(table)} ({', '.join(definitions)})")
+
+    def source_relation(self, files: List[str], columns: Dict[str, Dict[str, Any]], options: Dict[str, Any]) -> str:
+        """Expression read_csv / read_parquet typée selon `columns` (lecture en flux des fichiers)"""
+        file_list = '[' + ', '.join("'" + path.replace("'", "''") + "'" for path in files) + ']'
+        if all(path.endswith('.parquet') for path in files):
+            casts = ', '.join(f"CAST({_quote(name)} AS {DUCKDB_TYPES[column['type']]}) AS {_quote(name)}"
+                              for name, column in columns.items())
+            return f"(SELECT {casts} FROM read_parquet({file_list}))"
+        types = ', '.join(f"'{name}': '{DUCKDB_TYPES[column['type']]}'" for name, column in columns.items())
+        delimiter = str(options.get('field_delimiter', ',')).replace("'", "''")
+        return (f"read_csv({file_list}, delim = '{delimiter}', quote = '\"', escape = '\"', header = false, "
+                f"skip = {int(options.get('skip_leading_rows', 0))}, columns = {{{types}}}, "
+                f"auto_detect = false)")
+
+    def report(self, label: str, table: str, files: List[str], start: float, rows: int) -> Dict[str, Any]:
+        """Statistiques et débit d'un chargement (`rows` : lignes sources traitées)"""
+        seconds = time.perf_counter() - start
+        table_rows = self.connection.execute(f"SELECT count(*) FROM {table_ref(table)}").fetchone()[0]
+        size_bytes = sum(os.path.getsize(path) for path in files)
+        stats = {
+            'mode': label,
+            'table': table,
+            'files': len(files),
+            'rows': rows,
+            'table_rows': table_rows,
+            'bytes': size_bytes,
+            'seconds': round(seconds, 3),
+            'rows_per_second': round(rows / seconds, 1) if seconds else 0.0,
+            'mb_per_second': round(size_bytes / (1024 * 1024) / seconds, 2) if seconds else 0.0,
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+        }
+        logger.info(f"✅ {label}: {rows:,} lignes chargées dans {table} ({len(files)} fichier(s), "
+                    f"{size_bytes / (1024 * 1024):.1f}MB) ; {table_rows:,} lignes dans la table")
+        logger.info(f"⚡ Débit: {stats['rows_per_second']:,.0f} lignes/s, {stats['mb_per_second']:.1f} MB/s "
+                    f"en {seconds:.2f}s")
+        logger.info(f"💾 Pic mémoire (RSS): {stats['peak_rss_mb']:.0f}MB")
+        return stats
+
+    def load_data(self, entity: str, sources: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Rejoue Bigquery/02_ods/load_csv_to_ods_<entité>.sql (TRUNCATE + LOAD DATA)"""
+        with open(self.script_path(LOAD_DATA_SQL, entity), 'r', encoding='utf-8') as sql_file:
+            load = parse_load_data(sql_file.read())
+        table, ods_columns = parse_ddl_file(self.script_path(ODS_DDL, entity), exclude=())
+        if table != load['table']:
+            logger.warning(f"⚠️ Table LOAD DATA {load['table']} différente de la DDL ODS {table}")
+        unknown = [name for name in load['columns'] if name not in ods_columns]
+        if unknown:
+            raise ValueError(f"Colonnes LOAD DATA absentes de la DDL ODS: {', '.join(unknown)}")
+        files = self.resolve_sources(load['options'].get('uris', []), sources)
+
+        start = time.perf_counter()
+        if not self.table_exists(table):
+            self.create_table(table, ods_columns)
+        if load['truncate']:
+            self.connection.execute(f"TRUNCATE TABLE {table_ref(table)}")
+        target = ', '.join(_quote(name) for name in load['columns'])
+        rows = self.connection.execute(
+            f"INSERT INTO {table_ref(table)} ({target}) "
+            f"SELECT * FROM {self.source_relation(files, load['columns'], load['options'])}").fetchone()[0]
+        return self.report('LOAD DATA', table, files, start, rows)
+
+    def table_exists(self, table: str) -> bool:
+        schema, name = table.split('.')[-2:]
+        return self.connection.execute(
+            "SELECT count(*) FROM information_schema.tables WHERE table_schema = ? AND table_name = ?",
+            [schema, name]).fetchone()[0] > 0
+
+    def dataform(self, entity: str, sources: Optional[List[str]] = None, incremental: bool = False) -> Dict[str, Any]:
+        """
+        Rejoue Dataform/02_ods/load_stg_to_ods_<entité>[_incremental].sqlx sur sa table externe 01_STG.
+
+        La table externe lue par le SELECT est décrite par
+        Bigquery/00_ddl/create_external_table_stg_<table>.sql. Une définition
+        `type: "incremental"` crée la table au premier passage puis applique un
+        MERGE sur `uniqueKey` (mises à jour et insertions), comme Dataform.
+        """
+        sqlx = DATAFORM_INCREMENTAL_SQLX if incremental else DATAFORM_SQLX
+        with open(self.script_path(sqlx, entity), 'r', encoding='utf-8') as sqlx_file:
+            config, query = parse_sqlx(sqlx_file.read())
+        source = re.search(r"\bFROM\s+`([\w.\-]+)`", query, re.IGNORECASE)
+        if source is None:
+            raise ValueError("Table source (FROM `01_STG.<table>`) absente de la définition Dataform")
+        stg_ddl = self.script_path(STG_DDL, source.group(1).split('.')[-1])
+        with open(stg_ddl, 'r', encoding='utf-8') as ddl_file:
+            stg_sql = ddl_file.read()
+        stg_table, stg_columns = parse_ddl_file(stg_ddl, exclude=())
+        options = parse_options(stg_sql)
+        files = self.resolve_sources(options.get('uris', []), sources)
+        table_type = config.get('type', 'table')
+        if table_type not in ('table', 'incremental'):
+            raise ValueError(f"Type Dataform non émulé: {table_type} (types supportés: table, incremental)")
+
+        start = time.perf_counter()
+        # Table externe : vue sur les fichiers, relus à chaque requête comme dans BigQuery
+        self.connection.execute(f"CREATE OR REPLACE VIEW {table_ref(stg_table)} AS "
+                                f"SELECT * FROM {self.source_relation(files, stg_columns, options)}")
+        table = f"{config.get('schema', '02_ODS')}.{config.get('name', entity)}"
+        if table_type == 'incremental' and self.table_exists(table):
+            keys = config.get('uniqueKey')
+            if not keys:
+                raise ValueError("Définition incrémentale sans uniqueKey : MERGE impossible")
+            condition = ' AND '.join(f"target.{_quote(key)} = source.{_quote(key)}" for key in keys)
+            rows = self.connection.execute(
+                f"MERGE INTO {table_ref(table)} AS target USING ({translate_sql(query)}) AS source "
+                f"ON ({condition}) WHEN MATCHED THEN UPDATE SET * WHEN NOT MATCHED THEN INSERT *").fetchone()[0]
+            label = 'Dataform incrémental (MERGE)'
+        else:
+            rows = self.connection.execute(
+                f"CREATE OR REPLACE TABLE {table_ref(table)} AS {translate_sql(query)}").fetchone()[0]
+            label = 'Dataform'
+        return self.report(label, table, files, start, rows)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Émulateur local des chargements ODS (DuckDB)")
+    parser.add_argument('mode', choices=['load-data', 'dataform'])
+    parser.add_argument('entity')
+    parser.add_argument('--source', nargs='+', help="Fichiers à charger (défaut: nom de l'URI gs:// dans data/)")
+    parser.add_argument('--database', default=DEFAULT_DATABASE, help="Base DuckDB (':memory:' pour une base en RAM)")
+    parser.add_argument('--memory-limit', default=DEFAULT_MEMORY_LIMIT)
+    parser.add_argument('--threads', type=int)
+    parser.add_argument('--incremental', action='store_true',
+                        help="dataform : définition load_stg_to_ods_<entité>_incremental.sqlx (MERGE)")
+    args = parser.parse_args(argv)
+
+    logger.info(f"🦆 Émulation {args.mode} de {args.entity} - base {args.database}")
+    try:
+        loader = LocalLoader(args.database, args.memory_limit, args.threads)
+    except RuntimeError as e:
+        logger.error(f"❌ {e}")
+        return 1
+    try:
+        if args.mode == 'load-data':
+            loader.load_data(args.entity, args.source)
+        else:
+            loader.dataform(args.entity, args.source, args.incremental)
+    except (OSError, ValueError, loader.error) as e:
+        logger.error(f"❌ Chargement {args.mode} en échec: {e}")
+        return 1
+    finally:
+        loader.close()
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main())
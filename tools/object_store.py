@@ -0,0 +1,307 @@
+"""
+Backends de stockage objet de l'uploader (tools/object_uploader.py).
+
+Tous les backends exposent le protocole d'upload résumable de GCS : une
+session est ouverte pour un objet, les morceaux sont envoyés dans l'ordre à
+l'offset confirmé, la taille totale est annoncée avec le dernier morceau, et
+l'offset persisté peut être relu pour reprendre après une erreur. `compose`
+assemble des objets (uploads composites parallèles, 32 sources au plus).
+
+- LocalBackend : bucket émulé dans un répertoire local (sans réseau)
+- HttpGcsBackend : API JSON de GCS sur HTTP ; avec un endpoint local, un
+  stand-in fake-gcs-server (http://localhost:4443), sinon GCS avec un jeton
+  google-auth (import paresseux)
+- FlakyBackend : injecte des erreurs transitoires pour éprouver les reprises
+"""
+import asyncio
+import json
+import os
+import random
+import shutil
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from typing import List, Optional, Tuple
+
+# Les morceaux d'un upload résumable GCS sont des multiples de 256 KiB (sauf le dernier)
+CHUNK_GRANULARITY = 256 * 1024
+
+# Nombre maximal de sources d'un compose GCS
+MAX_COMPOSE_SOURCES = 32
+
+# Codes HTTP à retenter (délai, quota, erreurs serveur)
+TRANSIENT_HTTP_CODES = (408, 429, 500, 502, 503, 504)
+
+
+class TransientUploadError(IOError):
+    """Erreur passagère (réseau, quota, 5xx) : l'opération peut être retentée"""
+
+
+def parse_uri(uri: str) -> Tuple[str, str]:
+    """gs://bucket/chemin/objet -> (bucket, chemin/objet)"""
+    parsed = urllib.parse.urlparse(uri)
+    if parsed.scheme != 'gs' or not parsed.netloc:
+        raise ValueError(f"URI d'objet invalide: {uri} (gs://bucket/objet attendu)")
+    return parsed.netloc, parsed.path.lstrip('/')
+
+
+class ObjectStoreBackend:
+    """Interface commune des backends (méthodes asynchrones)"""
+
+    async def start_upload(self, bucket: str, name: str) -> str:
+        """Ouvre une session d'upload résumable ; retourne son identifiant"""
+        raise NotImplementedError
+
+    async def put_chunk(self, session: str, offset: int, data: bytes, total: Optional[int] = None) -> int:
+        """Envoie un morceau à `offset` (`total` : taille finale, avec le dernier morceau) ; retourne l'offset persisté"""
+        raise NotImplementedError
+
+    async def query_offset(self, session: str) -> int:
+        """Offset persisté d'une session (reprise après erreur)"""
+        raise NotImplementedError
+
+    async def compose(self, bucket: str, sources: List[str], destination: str) -> None:
+        raise NotImplementedError
+
+    async def delete(self, bucket: str, name: str) -> None:
+        raise NotImplementedError
+
+    async def size(self, bucket: str, name: str) -> Optional[int]:
+        """Taille d'un objet, None s'il n'existe pas"""
+        raise NotImplementedError
+
+
+class LocalBackend(ObjectStoreBackend):
+    """
+    Bucket émulé sur le système de fichiers : gs://bucket/objet -> <root>/bucket/objet.
+
+    Les sessions sont des fichiers partiels dans <root>/.uploads, publiés
+    atomiquement à la réception du dernier morceau.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.sessions_dir = os.path.join(root, '.uploads')
+        os.makedirs(self.sessions_dir, exist_ok=True)
+
+    def object_path(self, bucket: str, name: str) -> str:
+        return os.path.join(self.root, bucket, *name.split('/'))
+
+    def _session_paths(self, session: str) -> Tuple[str, str]:
+        base = os.path.join(self.sessions_dir, session)
+        return base + '.part', base + '.json'
+
+    def _start(self, bucket: str, name: str) -> str:
+        session = uuid.uuid4().hex
+        part_path, meta_path = self._session_paths(session)
+        open(part_path, 'wb').close()
+        with open(meta_path, 'w', encoding='utf-8') as meta:
+            json.dump({'bucket': bucket, 'name': name}, meta)
+        return session
+
+    def _put(self, session: str, offset: int, data: bytes, total: Optional[int]) -> int:
+        part_path, meta_path = self._session_paths(session)
+        if not os.path.exists(meta_path):
+            raise ValueError(f"Session d'upload inconnue ou terminée: {session}")
+        persisted = os.path.getsize(part_path)
+        if offset > persisted:
+            raise ValueError(f"Morceau hors séquence: offset {offset} > {persisted} persistés")
+        with open(part_path, 'r+b') as part:
+            # Morceau déjà partiellement reçu (reprise) : seul le reste est écrit
+            part.seek(persisted)
+            part.write(data[persisted - offset:])
+        persisted = max(persisted, offset + len(data))
+        if total is not None and persisted == total:
+            with open(meta_path, 'r', encoding='utf-8') as meta:
+                target = self.object_path(**json.load(meta))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(part_path, target)
+            os.remove(meta_path)
+        return persisted
+
+    def _query(self, session: str) -> int:
+        part_path, meta_path = self._session_paths(session)
+        if not os.path.exists(meta_path):
+            raise ValueError(f"Session d'upload inconnue ou terminée: {session}")
+        return os.path.getsize(part_path)
+
+    def _compose(self, bucket: str, sources: List[str], destination: str) -> None:
+        target = self.object_path(bucket, destination)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp_path = target + f".compose-{uuid.uuid4().hex}"
+        with open(tmp_path, 'wb') as output:
+            for source in sources:
+                with open(self.object_path(bucket, source), 'rb') as component:
+                    shutil.copyfileobj(component, output, 16 * 1024 * 1024)
+        os.replace(tmp_path, target)
+
+    def _delete(self, bucket: str, name: str) -> None:
+        path = self.object_path(bucket, name)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def _size(self, bucket: str, name: str) -> Optional[int]:
+        path = self.object_path(bucket, name)
+        return os.path.getsize(path) if os.path.exists(path) else None
+
+    async def start_upload(self, bucket: str, name: str) -> str:
+        return await asyncio.to_thread(self._start, bucket, name)
+
+    async def put_chunk(self, session: str, offset: int, data: bytes, total: Optional[int] = None) -> int:
+        return await asyncio.to_thread(self._put, session, offset, data, total)
+
+    async def query_offset(self, session: str) -> int:
+        return await asyncio.to_thread(self._query, session)
+
+    async def compose(self, bucket: str, sources: List[str], destination: str) -> None:
+        await asyncio.to_thread(self._compose, bucket, sources, destination)
+
+    async def delete(self, bucket: str, name: str) -> None:
+        await asyncio.to_thread(self._delete, bucket, name)
+
+    async def size(self, bucket: str, name: str) -> Optional[int]:
+        return await asyncio.to_thread(self._size, bucket, name)
+
+
+class HttpGcsBackend(ObjectStoreBackend):
+    """
+    API JSON de GCS (uploads résumables, compose, delete) via urllib.
+
+    Avec `endpoint` local (fake-gcs-server), aucune authentification ; vers
+    https://storage.googleapis.com, un jeton est obtenu par google-auth.
+    """
+
+    def __init__(self, endpoint: str = 'https://storage.googleapis.com', timeout: float = 120.0):
+        self.endpoint = endpoint.rstrip('/')
+        self.timeout = timeout
+        self._credentials = None
+
+    def _headers(self) -> dict:
+        if not self.endpoint.startswith('https://storage.googleapis.com'):
+            return {}
+        if self._credentials is None:
+            try:
+                import google.auth
+                import google.auth.transport.requests
+            except ImportError:
+                raise RuntimeError("L'upload vers GCS nécessite le paquet 'google-auth' (pip install google-auth)")
+            self._credentials, _ = google.auth.default(scopes=['https://www.googleapis.com/auth/devstorage.read_write'])
+            self._request = google.auth.transport.requests.Request()
+        if not self._credentials.valid:
+            self._credentials.refresh(self._request)
+        return {'Authorization': f"Bearer {self._credentials.token}"}
+
+    def _request_raw(self, method: str, url: str, data: Optional[bytes] = None,
+                     headers: Optional[dict] = None) -> Tuple[int, dict, bytes]:
+        request = urllib.request.Request(url, data=data, method=method, headers={**self._headers(), **(headers or {})})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.status, dict(response.headers), response.read()
+        except urllib.error.HTTPError as e:
+            if e.code == 308:
+                # Resume Incomplete : réponse normale d'un morceau intermédiaire
+                return e.code, dict(e.headers), b''
+            if e.code in TRANSIENT_HTTP_CODES:
+                raise TransientUploadError(f"HTTP {e.code} sur {method} {url}")
+            raise RuntimeError(f"HTTP {e.code} sur {method} {url}: {e.read()[:200]!r}")
+        except (urllib.error.URLError, ConnectionError, TimeoutError) as e:
+            raise TransientUploadError(f"{method} {url}: {e}")
+
+    @staticmethod
+    def _persisted(headers: dict) -> int:
+        """Offset persisté d'une réponse 308 (en-tête Range: bytes=0-N)"""
+        value = {key.lower(): item for key, item in headers.items()}.get('range')
+        return int(value.rsplit('-', 1)[1]) + 1 if value else 0
+
+    def _object_url(self, bucket: str, name: str) -> str:
+        return f"{self.endpoint}/storage/v1/b/{bucket}/o/{urllib.parse.quote(name, safe='')}"
+
+    def _start(self, bucket: str, name: str) -> str:
+        query = urllib.parse.urlencode({'uploadType': 'resumable', 'name': name})
+        _, headers, _ = self._request_raw('POST', f"{self.endpoint}/upload/storage/v1/b/{bucket}/o?{query}",
+                                          b'', {'Content-Type': 'application/json'})
+        location = {key.lower(): item for key, item in headers.items()}.get('location')
+        if not location:
+            raise RuntimeError(f"Session résumable non ouverte pour gs://{bucket}/{name}")
+        return location
+
+    def _put(self, session: str, offset: int, data: bytes, total: Optional[int]) -> int:
+        end = offset + len(data) - 1
+        content_range = f"bytes {offset}-{end}/{'*' if total is None else total}" if data else \
+            f"bytes */{'*' if total is None else total}"
+        status, headers, _ = self._request_raw('PUT', session, data, {'Content-Range': content_range})
+        return offset + len(data) if status in (200, 201) else self._persisted(headers)
+
+    def _query(self, session: str) -> int:
+        status, headers, _ = self._request_raw('PUT', session, b'', {'Content-Range': 'bytes */*'})
+        return self._persisted(headers) if status == 308 else -1
+
+    def _compose(self, bucket: str, sources: List[str], destination: str) -> None:
+        body = json.dumps({'sourceObjects': [{'name': name} for name in sources]}).encode('utf-8')
+        self._request_raw('POST', self._object_url(bucket, destination) + '/compose', body,
+                          {'Content-Type': 'application/json'})
+
+    def _delete(self, bucket: str, name: str) -> None:
+        self._request_raw('DELETE', self._object_url(bucket, name))
+
+    def _size(self, bucket: str, name: str) -> Optional[int]:
+        try:
+            _, _, body = self._request_raw('GET', self._object_url(bucket, name))
+        except RuntimeError:
+            return None
+        return int(json.loads(body)['size'])
+
+    async def start_upload(self, bucket: str, name: str) -> str:
+        return await asyncio.to_thread(self._start, bucket, name)
+
+    async def put_chunk(self, session: str, offset: int, data: bytes, total: Optional[int] = None) -> int:
+        return await asyncio.to_thread(self._put, session, offset, data, total)
+
+    async def query_offset(self, session: str) -> int:
+        return await asyncio.to_thread(self._query, session)
+
+    async def compose(self, bucket: str, sources: List[str], destination: str) -> None:
+        await asyncio.to_thread(self._compose, bucket, sources, destination)
+
+    async def delete(self, bucket: str, name: str) -> None:
+        await asyncio.to_thread(self._delete, bucket, name)
+
+    async def size(self, bucket: str, name: str) -> Optional[int]:
+        return await asyncio.to_thread(self._size, bucket, name)
+
+
+class FlakyBackend(ObjectStoreBackend):
+    """
+    Enveloppe un backend et fait échouer une part des morceaux (TransientUploadError).
+
+    La moitié des échecs survient après l'écriture d'une partie du morceau,
+    comme une connexion coupée en cours de transfert.
+    """
+
+    def __init__(self, backend: ObjectStoreBackend, failure_rate: float, seed: Optional[int] = None):
+        self.backend = backend
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+
+    async def start_upload(self, bucket: str, name: str) -> str:
+        return await self.backend.start_upload(bucket, name)
+
+    async def put_chunk(self, session: str, offset: int, data: bytes, total: Optional[int] = None) -> int:
+        if self.rng.random() < self.failure_rate:
+            if data and self.rng.random() < 0.5:
+                await self.backend.put_chunk(session, offset, data[:self.rng.randrange(len(data))])
+            raise TransientUploadError(f"Échec injecté à l'offset {offset}")
+        return await self.backend.put_chunk(session, offset, data, total)
+
+    async def query_offset(self, session: str) -> int:
+        return await self.backend.query_offset(session)
+
+    async def compose(self, bucket: str, sources: List[str], destination: str) -> None:
+        await self.backend.compose(bucket, sources, destination)
+
+    async def delete(self, bucket: str, name: str) -> None:
+        await self.backend.delete(bucket, name)
+
+    async def size(self, bucket: str, name: str) -> Optional[int]:
+        return await self.backend.size(bucket, name)
@@ -0,0 +1,429 @@
+"""
+Upload asynchrone des fichiers générés vers le stockage objet (gs://lakehouse-bucket-20250903/).
+
+- uploads résumables par morceaux (multiples de 256 KiB), reprise à l'offset
+  persisté après une erreur transitoire, avec backoff exponentiel et gigue
+- tampon borné : au plus `in_flight` morceaux lus d'avance par upload, la
+  lecture (ou la génération) attend que l'envoi suive
+- uploads composites parallèles : un gros fichier est envoyé en N
+  composants simultanés puis assemblé par compose (32 sources au plus par
+  étape), les composants sont supprimés
+- plusieurs fichiers (shards part-*.csv, arborescence Hive) en parallèle
+- `generate` : la sortie du générateur passe par un tube nommé et part vers
+  le stockage pendant la génération (transfert et génération recouverts) ;
+  l'objet n'est publié que si la génération réussit
+- contrat de schéma (tools/schema_contract.py) vérifié avant tout envoi :
+  artefacts de l'entité pour `generate`, en-têtes et lignes échantillonnées
+  des fichiers d'entités connues pour `upload` (--skip-contract-check)
+
+Backends (tools/object_store.py) : `local` (bucket émulé dans un répertoire,
+sans réseau), `http` (API JSON GCS : fake-gcs-server local ou GCS).
+
+Usage:
+    python object_uploader.py upload <fichier|dossier> ... --destination gs://bucket/prefixe/
+                              [--components N] [--concurrency N]
+    python object_uploader.py generate <entité> <1|5|5MB|250MB|20GB> --destination gs://bucket/objet.csv
+                              [--engine row|columnar] [--seed N] [--format csv|csv.gz|csv.zst]
+    options communes : [--backend local|http] [--root data/object_store] [--endpoint URL]
+                       [--chunk-mb 8] [--in-flight 4] [--inject-failures 0.1] [--skip-contract-check]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, BinaryIO, Callable, Dict, List, Optional
+
+from object_store import (CHUNK_GRANULARITY, MAX_COMPOSE_SOURCES, FlakyBackend, HttpGcsBackend, LocalBackend,
+                          ObjectStoreBackend, TransientUploadError, parse_uri)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+DEFAULT_IN_FLIGHT = 4
+DEFAULT_LOCAL_ROOT = os.path.join('data', 'object_store')
+
+# Reprises d'une opération en erreur transitoire, backoff exponentiel plafonné (secondes)
+MAX_RETRIES = 6
+BACKOFF_BASE = 0.2
+BACKOFF_MAX = 30.0
+
+
+def new_stats() -> Dict[str, Any]:
+    return {'objects': 0, 'bytes': 0, 'chunks': 0, 'retries': 0}
+
+
+def backoff_delay(attempt: int) -> float:
+    """Délai avant la reprise n° `attempt` (1, 2...) : exponentiel avec gigue (50 à 100 %)"""
+    return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempt - 1)) * (0.5 + random.random() / 2)
+
+
+async def with_retries(operation: Callable, description: str, stats: Dict[str, Any]):
+    """Exécute `operation()` (coroutine) en retentant les erreurs transitoires"""
+    for attempt in range(1, MAX_RETRIES + 2):
+        try:
+            return await operation()
+        except TransientUploadError as e:
+            if attempt > MAX_RETRIES:
+                raise
+            stats['retries'] += 1
+            delay = backoff_delay(attempt)
+            logger.warning(f"⚠️ {description}: {e} - nouvelle tentative {attempt}/{MAX_RETRIES} dans {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+async def send_chunk(backend: ObjectStoreBackend, session: str, offset: int, data: bytes,
+                     total: Optional[int], stats: Dict[str, Any]) -> None:
+    """
+    Envoie un morceau jusqu'à sa persistance complète.
+
+    Après une erreur transitoire, l'offset persisté est relu et seul le reste
+    du morceau est renvoyé (transfert résumable).
+    """
+    end = offset + len(data)
+    persisted, attempt = offset, 0
+    while True:
+        try:
+            persisted = await backend.put_chunk(session, persisted, data[persisted - offset:], total)
+            if persisted >= end:
+                return
+            continue
+        except TransientUploadError as e:
+            attempt += 1
+            if attempt > MAX_RETRIES:
+                raise
+            stats['retries'] += 1
+            delay = backoff_delay(attempt)
+            logger.warning(f"⚠️ Morceau {offset:,}-{end:,}: {e} - reprise {attempt}/{MAX_RETRIES} dans {delay:.1f}s")
+            await asyncio.sleep(delay)
+        confirmed = await with_retries(lambda: backend.query_offset(session), "Lecture de l'offset", stats)
+        if confirmed < 0:
+            # Objet déjà finalisé : le dernier morceau avait été reçu
+            return
+        persisted = min(max(confirmed, offset), end)
+
+
+def read_exact(stream: BinaryIO, size: int) -> bytes:
+    """Lit `size` octets (moins à la fin du flux) : un tube renvoie des lectures partielles"""
+    parts, remaining = [], size
+    while remaining > 0:
+        data = stream.read(remaining)
+        if not data:
+            break
+        parts.append(data)
+        remaining -= len(data)
+    return b''.join(parts)
+
+
+async def produce_chunks(stream: BinaryIO, queue: asyncio.Queue, chunk_size: int,
+                         limit: Optional[int] = None) -> None:
+    """Lit le flux par morceaux dans la file bornée (attend quand la file est pleine), puis None"""
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = chunk_size if remaining is None else min(chunk_size, remaining)
+        data = await asyncio.to_thread(read_exact, stream, size)
+        if not data:
+            break
+        await queue.put(data)
+        if remaining is not None:
+            remaining -= len(data)
+    await queue.put(None)
+
+
+async def upload_stream(backend: ObjectStoreBackend, stream: BinaryIO, uri: str,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE, in_flight: int = DEFAULT_IN_FLIGHT,
+                        stats: Optional[Dict[str, Any]] = None, limit: Optional[int] = None,
+                        finalize_gate: Optional[asyncio.Future] = None) -> Dict[str, Any]:
+    """
+    Upload résumable d'un flux binaire (fichier, tube) vers `uri`.
+
+    Au plus `in_flight` morceaux sont lus d'avance : la mémoire reste bornée
+    quelle que soit la taille du flux. Le dernier morceau (qui annonce la
+    taille totale et publie l'objet) attend `finalize_gate` : s'il vaut False,
+    la session est abandonnée et l'objet n'est pas créé.
+    """
+    if chunk_size % CHUNK_GRANULARITY:
+        raise ValueError(f"La taille des morceaux doit être un multiple de {CHUNK_GRANULARITY // 1024} KiB")
+    stats = stats if stats is not None else new_stats()
+    bucket, name = parse_uri(uri)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, in_flight))
+    producer = asyncio.create_task(produce_chunks(stream, queue, chunk_size, limit))
+    try:
+        session = await with_retries(lambda: backend.start_upload(bucket, name), f"Ouverture de {uri}", stats)
+        offset = 0
+        # Lecture d'un morceau d'avance : le dernier est celui suivi de None
+        current = await queue.get()
+        while True:
+            following = await queue.get() if current is not None else None
+            data = current or b''
+            total = offset + len(data) if following is None else None
+            if total is not None and finalize_gate is not None and not await finalize_gate:
+                raise RuntimeError(f"Upload de {uri} abandonné : la source a échoué")
+            await send_chunk(backend, session, offset, data, total, stats)
+            offset += len(data)
+            stats['chunks'] += 1
+            if following is None:
+                break
+            current = following
+        await producer
+    finally:
+        if not producer.done():
+            producer.cancel()
+    stats['objects'] += 1
+    stats['bytes'] += offset
+    return stats
+
+
+class _RangeReader:
+    """Vue en lecture d'une plage d'octets d'un fichier (composant d'un upload composite)"""
+
+    def __init__(self, path: str, start: int):
+        self.file = open(path, 'rb')
+        self.file.seek(start)
+
+    def read(self, size: int) -> bytes:
+        return self.file.read(size)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+async def compose_objects(backend: ObjectStoreBackend, bucket: str, sources: List[str], destination: str,
+                          stats: Dict[str, Any]) -> None:
+    """Compose par étapes de MAX_COMPOSE_SOURCES sources, puis supprime les objets intermédiaires"""
+    level, intermediates = 0, []
+    while len(sources) > MAX_COMPOSE_SOURCES:
+        level += 1
+        groups = [sources[index:index + MAX_COMPOSE_SOURCES] for index in range(0, len(sources), MAX_COMPOSE_SOURCES)]
+        names = [f"{destination}.compose-{level}-{index:04d}" for index in range(len(groups))]
+        await asyncio.gather(*(with_retries(lambda group=group, name=name: backend.compose(bucket, group, name),
+                                            f"Compose {name}", stats) for group, name in zip(groups, names)))
+        intermediates += names
+        sources = names
+    await with_retries(lambda: backend.compose(bucket, sources, destination), f"Compose {destination}", stats)
+    for name in intermediates:
+        await with_retries(lambda name=name: backend.delete(bucket, name), f"Suppression {name}", stats)
+
+
+async def upload_file(backend: ObjectStoreBackend, path: str, uri: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      in_flight: int = DEFAULT_IN_FLIGHT, components: int = 1,
+                      stats: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Upload d'un fichier ; avec `components` > 1, upload composite parallèle.
+
+    Les composants sont des plages alignées sur la taille des morceaux,
+    envoyées simultanément (tampon `in_flight` partagé) puis composées dans
+    l'ordre en un seul objet.
+    """
+    stats = stats if stats is not None else new_stats()
+    size = os.path.getsize(path)
+    components = max(1, min(components, size // chunk_size))
+    if components == 1:
+        with open(path, 'rb') as stream:
+            return await upload_stream(backend, stream, uri, chunk_size, in_flight, stats)
+
+    bucket, name = parse_uri(uri)
+    component_size = -(-size // components // chunk_size) * chunk_size
+    starts = list(range(0, size, component_size))
+    names = [f"{name}.component-{index:04d}" for index in range(len(starts))]
+    component_stats = new_stats()
+
+    async def upload_component(start: int, component: str) -> None:
+        reader = _RangeReader(path, start)
+        try:
+            await upload_stream(backend, reader, f"gs://{bucket}/{component}", chunk_size,
+                                max(1, in_flight // len(starts)), component_stats, limit=min(component_size,
+                                                                                             size - start))
+        finally:
+            reader.close()
+
+    await asyncio.gather(*(upload_component(start, component) for start, component in zip(starts, names)))
+    await compose_objects(backend, bucket, names, name, stats)
+    for component in names:
+        await with_retries(lambda component=component: backend.delete(bucket, component),
+                           f"Suppression {component}", stats)
+    stats['objects'] += 1
+    stats['bytes'] += size
+    stats['chunks'] += component_stats['chunks']
+    stats['retries'] += component_stats['retries']
+    return stats
+
+
+def collect_files(paths: List[str]) -> List[tuple]:
+    """(chemin local, nom relatif) des fichiers à envoyer ; un dossier est parcouru récursivement"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            root = os.path.dirname(os.path.abspath(path).rstrip(os.sep))
+            for directory, _, names in sorted(os.walk(path)):
+                for filename in sorted(names):
+                    local = os.path.join(directory, filename)
+                    files.append((local, os.path.relpath(os.path.abspath(local), root).replace(os.sep, '/')))
+        else:
+            files.append((path, os.path.basename(path)))
+    return files
+
+
+async def upload_files(backend: ObjectStoreBackend, paths: List[str], destination: str,
+                       chunk_size: int = DEFAULT_CHUNK_SIZE, in_flight: int = DEFAULT_IN_FLIGHT,
+                       components: int = 1, concurrency: int = 4) -> Dict[str, Any]:
+    """
+    Envoie des fichiers et dossiers (shards, arborescence Hive) sous le préfixe `destination`.
+    Une destination sans '/' final et un seul fichier désignent l'objet lui-même.
+    """
+    files = collect_files(paths)
+    if len(files) == 1 and not destination.endswith('/'):
+        targets = [(files[0][0], destination)]
+    else:
+        targets = [(local, destination.rstrip('/') + '/' + relative) for local, relative in files]
+    stats = new_stats()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def upload_one(local: str, uri: str) -> None:
+        async with semaphore:
+            await upload_file(backend, local, uri, chunk_size, in_flight, components, stats)
+            logger.info(f"☁️ {local} -> {uri}")
+
+    await asyncio.gather(*(upload_one(local, uri) for local, uri in targets))
+    return stats
+
+
+async def generate_and_upload(entity, size: float, unit: str, uri: str, backend: ObjectStoreBackend,
+                              chunk_size: int = DEFAULT_CHUNK_SIZE, in_flight: int = DEFAULT_IN_FLIGHT,
+                              **options) -> Dict[str, Any]:
+    """
+    Génère un fichier directement vers le stockage objet, sans copie locale.
+
+    Le générateur écrit dans un tube nommé lu par l'upload : le transfert
+    avance pendant la génération, la file bornée de l'upload freine le
+    générateur si le réseau est plus lent. L'objet n'est publié qu'après le
+    succès de la génération.
+    """
+    stats = new_stats()
+    loop = asyncio.get_running_loop()
+    generated = loop.create_future()
+    with tempfile.TemporaryDirectory(prefix='lakehouse_upload_') as tmp_dir:
+        fifo = os.path.join(tmp_dir, os.path.basename(parse_uri(uri)[1]))
+        os.mkfifo(fifo)
+
+        opened = asyncio.Event()
+
+        def generate() -> bool:
+            started = time.perf_counter()
+            try:
+                return entity.generate_csv_file(fifo, size, unit, **options)
+            finally:
+                stats['generation_seconds'] = round(time.perf_counter() - started, 3)
+
+        async def run_generation() -> None:
+            try:
+                generated.set_result(await asyncio.to_thread(generate))
+            except Exception:
+                generated.set_result(False)
+                raise
+            finally:
+                # Débloque le lecteur si le générateur n'a jamais ouvert le tube
+                while not opened.is_set():
+                    try:
+                        os.close(os.open(fifo, os.O_WRONLY | os.O_NONBLOCK))
+                    except OSError:
+                        pass
+                    await asyncio.sleep(0.01)
+
+        async def run_upload() -> None:
+            stream = await asyncio.to_thread(open, fifo, 'rb')
+            opened.set()
+            try:
+                await upload_stream(backend, stream, uri, chunk_size, in_flight, stats, finalize_gate=generated)
+            finally:
+                stream.close()
+
+        started = time.perf_counter()
+        for result in await asyncio.gather(run_generation(), run_upload(), return_exceptions=True):
+            if isinstance(result, BaseException):
+                raise result
+        stats['seconds'] = round(time.perf_counter() - started, 3)
+    return stats
+
+
+def check_contract(paths: List[str]) -> None:
+    """Vérifie les fichiers d'entités connues parmi `paths` contre leur contrat de schéma (ValueError si rompu)"""
+    from schema_contract import DATA_EXTENSIONS, entity_for_file, entity_schemas, log_report, verify_contracts
+    schemas = entity_schemas()
+    names = [name for name, _ in schemas]
+    files = [local for local, _ in collect_files(paths)
+             if local.endswith(DATA_EXTENSIONS) and entity_for_file(local, names) is not None]
+    report = verify_contracts(schemas, files)
+    log_report(report)
+    if report['errors']:
+        raise ValueError(f"Contrat de schéma rompu ({report['errors']} écart(s)), upload annulé")
+
+
+def build_backend(args) -> ObjectStoreBackend:
+    backend = LocalBackend(args.root) if args.backend == 'local' else HttpGcsBackend(args.endpoint)
+    return FlakyBackend(backend, args.inject_failures) if args.inject_failures else backend
+
+
+def report(stats: Dict[str, Any], seconds: float) -> None:
+    mb = stats['bytes'] / (1024 * 1024)
+    logger.info(f"✅ {stats['objects']} objet(s), {mb:.1f}MB en {seconds:.2f}s ({mb / seconds:.1f} MB/s), "
+                f"{stats['chunks']} morceaux, {stats['retries']} reprise(s)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Upload asynchrone vers le stockage objet")
+    parser.add_argument('command', choices=['upload', 'generate'])
+    parser.add_argument('sources', nargs='+', help="upload : fichiers/dossiers ; generate : <entité> <taille> (1, 5, 5MB, 250MB, 20GB...)")
+    parser.add_argument('--destination', required=True, help="gs://bucket/objet ou gs://bucket/prefixe/")
+    parser.add_argument('--backend', choices=['local', 'http'], default='local')
+    parser.add_argument('--root', default=DEFAULT_LOCAL_ROOT, help="Répertoire du bucket émulé (backend local)")
+    parser.add_argument('--endpoint', default='http://localhost:4443', help="Endpoint de l'API JSON (backend http)")
+    parser.add_argument('--chunk-mb', type=int, default=DEFAULT_CHUNK_SIZE // (1024 * 1024))
+    parser.add_argument('--in-flight', type=int, default=DEFAULT_IN_FLIGHT)
+    parser.add_argument('--components', type=int, default=1, help="Composants d'un upload composite parallèle")
+    parser.add_argument('--concurrency', type=int, default=4, help="Fichiers envoyés simultanément")
+    parser.add_argument('--inject-failures', type=float, default=0.0, help="Taux d'échecs injectés (tests)")
+    parser.add_argument('--engine', choices=['row', 'columnar'], default='row')
+    parser.add_argument('--format', choices=['csv', 'csv.gz', 'csv.zst'], default='csv')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--skip-contract-check', action='store_true')
+    args = parser.parse_args(argv)
+    chunk_size = args.chunk_mb * 1024 * 1024
+
+    try:
+        backend = build_backend(args)
+        started = time.perf_counter()
+        if args.command == 'upload':
+            if not args.skip_contract_check:
+                check_contract(args.sources)
+            stats = asyncio.run(upload_files(backend, args.sources, args.destination, chunk_size, args.in_flight,
+                                             args.components, args.concurrency))
+        else:
+            from entity_generator import load_entity, parse_size
+            from schema_contract import preflight_contract
+            if len(args.sources) != 2:
+                raise ValueError("generate attend <entité> <1|5|5MB|250MB|20GB>")
+            entity_name, taille = args.sources
+            size, unit, _ = parse_size(taille)
+            entity = load_entity(entity_name)
+            if not args.skip_contract_check and not preflight_contract(entity.name, entity.schema_ods):
+                raise ValueError(f"Contrat de schéma rompu pour {entity.name}, génération annulée")
+            stats = asyncio.run(generate_and_upload(entity, size, unit, args.destination,
+                                                    backend, chunk_size, args.in_flight, engine=args.engine,
+                                                    output_format=args.format, seed=args.seed))
+            seconds = stats['seconds']
+            logger.info(f"🔀 Génération {stats['generation_seconds']:.2f}s, génération + upload {seconds:.2f}s : "
+                        f"{max(0.0, seconds - stats['generation_seconds']):.2f}s de transfert non recouvert")
+        report(stats, time.perf_counter() - started)
+    except (OSError, ValueError, RuntimeError) as e:
+        logger.error(f"❌ Upload en échec: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main())
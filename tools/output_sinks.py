@@ -0,0 +1,488 @@
+"""
+Écriture des fichiers générés avec budget exact en octets ou en lignes.
+
+Le writer compte les octets qu'il encode lui-même (aucun `os.path.getsize`
+pendant la génération) et s'arrête sur la première ligne complète qui atteint
+la taille cible, ou exactement au nombre de lignes demandé. Pour une même
+séquence de lignes, la taille du fichier est donc reproductible.
+
+Les formats compressés (csv.gz, csv.zst) et Parquet sont écrits en flux : le
+budget porte toujours sur les octets CSV non compressés, de sorte qu'une même
+taille cible produit les mêmes lignes quel que soit le format.
+
+En mode pipeline (BackgroundWriter), les blocs sérialisés sont écrits (et
+compressés) par un thread dédié pendant que le lot suivant est généré.
+
+Le moteur ligne sérialise chaque ligne dès sa génération (add_row) : elle est
+encodée en UTF-8 dans le tampon du lot, sans liste de lignes ni texte
+intermédiaire, et la mémoire d'un lot reste de l'ordre de sa taille en octets.
+"""
+import csv
+import gzip
+import io
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from run_metrics import RunMetrics
+
+# Terminaison de ligne de csv.writer
+LINE_TERMINATOR = '\r\n'
+ENCODED_TERMINATOR = LINE_TERMINATOR.encode('utf-8')
+
+# Formats de sortie supportés et extension associée
+OUTPUT_FORMATS = {
+    'csv': '.csv',
+    'csv.gz': '.csv.gz',
+    'csv.zst': '.csv.zst',
+    'parquet': '.parquet',
+}
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# Taille des lectures en fin de fichier lors d'une reprise
+RESUME_READ_SIZE = 64 * 1024
+
+# Nombre de lignes (approximatif) par row group Parquet : borne la mémoire utilisée
+PARQUET_ROW_GROUP_ROWS = 100000
+
+# Premier lot du moteur ligne sous budget octets, avant toute mesure de la taille des lignes
+FIRST_BATCH_ROWS = 1000
+
+# Mode pipeline : blocs en attente d'écriture (borne la mémoire à autant de lots)
+PIPELINE_DEPTH = 4
+
+# Mode pipeline : tampon du fichier de sortie
+PIPELINE_BUFFER_SIZE = 8 * 1024 * 1024
+
+
+def format_filename(base: str, output_format: str) -> str:
+    """Ajoute l'extension du format à un nom de fichier sans extension"""
+    return base + OUTPUT_FORMATS[output_format]
+
+
+def strip_format_extension(filename: str) -> str:
+    """Retire l'extension d'un format connu (ex: 'employees.csv.gz' -> 'employees')"""
+    for extension in sorted(OUTPUT_FORMATS.values(), key=len, reverse=True):
+        if filename.endswith(extension):
+            return filename[:-len(extension)]
+    return filename
+
+
+def find_resume_point(path: str) -> Tuple[int, int]:
+    """
+    Prépare la reprise d'un fichier CSV interrompu.
+
+    La dernière ligne incomplète éventuelle est tronquée ; l'id de la dernière
+    ligne complète (première colonne) et la taille validée sont retournés.
+
+    Returns:
+        (dernier id validé, 0 si aucune ligne de données ; taille en octets)
+    """
+    with open(path, 'r+b') as csvfile:
+        size = csvfile.seek(0, 2)
+        position = size
+        tail = b''
+        # Relecture de la fin du fichier jusqu'à trouver deux fins de ligne
+        while position > 0 and tail.count(b'\n') < 2:
+            step = min(RESUME_READ_SIZE, position)
+            position -= step
+            csvfile.seek(position)
+            tail = csvfile.read(step) + tail
+
+        end = tail.rfind(b'\n') + 1
+        if position + end != size:
+            csvfile.truncate(position + end)
+        lines = tail[:end].split(ENCODED_TERMINATOR)
+        last_line = lines[-2] if len(lines) >= 2 else b''
+        committed_size = position + end
+
+    if position == 0 and tail.count(b'\n') < 2:
+        # En-tête seul (ou fichier vide)
+        return 0, committed_size
+    return int(last_line.split(b';', 1)[0]), committed_size
+
+
+@contextmanager
+def open_output(path: str, output_format: str = 'csv',
+                schema_ods: Optional[Dict[str, Dict[str, Any]]] = None,
+                append: bool = False, buffer_size: int = -1) -> Iterator[BinaryIO]:
+    """
+    Ouvre un flux binaire d'écriture CSV pour le format demandé.
+
+    Les données écrites sont toujours du CSV ';' encodé en UTF-8 : elles sont
+    compressées à la volée (gzip, zstd) ou converties en row groups Parquet
+    typés selon `schema_ods`, sans fichier temporaire. `append` (reprise) n'est
+    possible qu'en CSV non compressé. `buffer_size` : tampon du fichier (défaut
+    du système si -1).
+    """
+    if append and output_format != 'csv':
+        raise ValueError(f"La reprise en ajout n'est pas supportée pour le format {output_format}")
+
+    if output_format == 'csv':
+        with open(path, 'ab' if append else 'wb', buffering=buffer_size) as output:
+            yield output
+    elif output_format == 'csv.gz':
+        with open(path, 'wb', buffering=buffer_size) as raw, \
+                gzip.GzipFile(path, 'wb', compresslevel=GZIP_LEVEL, fileobj=raw) as output:
+            yield output
+    elif output_format == 'csv.zst':
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("Le format csv.zst nécessite le paquet 'zstandard' (pip install zstandard)")
+        with open(path, 'wb', buffering=buffer_size) as raw:
+            with zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(raw, closefd=False) as output:
+                yield output
+    elif output_format == 'parquet':
+        if schema_ods is None:
+            raise ValueError("Le format parquet nécessite le schéma ODS")
+        output = ParquetCsvStream(path, schema_ods)
+        try:
+            yield output
+        finally:
+            output.close()
+    else:
+        raise ValueError(f"Format de sortie non supporté: {output_format}")
+
+
+class ParquetCsvStream:
+    """
+    Flux d'écriture qui reçoit du CSV ';' (en-tête compris) et l'écrit en Parquet.
+
+    Les lignes complètes sont accumulées jusqu'à PARQUET_ROW_GROUP_ROWS puis
+    converties en un row group typé selon SCHEMA_ODS (INT64, FLOAT64, DATE,
+    TIMESTAMP, STRING) : la mémoire reste bornée quelle que soit la taille.
+    """
+
+    def __init__(self, path: str, schema_ods: Dict[str, Dict[str, Any]],
+                 row_group_rows: int = PARQUET_ROW_GROUP_ROWS):
+        try:
+            import pyarrow as pa
+            import pyarrow.csv as pa_csv
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Le format parquet nécessite le paquet 'pyarrow' (pip install pyarrow)")
+
+        arrow_types = {
+            'INT64': pa.int64(),
+            'FLOAT64': pa.float64(),
+            'DATE': pa.date32(),
+            'TIMESTAMP': pa.timestamp('us'),
+            'STRING': pa.string(),
+        }
+        self._columns = list(schema_ods.keys())
+        self._parse_types = {name: arrow_types.get(schema.get('type'), pa.string())
+                             for name, schema in schema_ods.items()}
+        # Les TIMESTAMP BigQuery correspondent à des timestamps Parquet ajustés UTC
+        self._schema = pa.schema([
+            (name, pa.timestamp('us', tz='UTC') if schema.get('type') == 'TIMESTAMP' else self._parse_types[name])
+            for name, schema in schema_ods.items()
+        ])
+        self._csv = pa_csv
+        self._writer = pq.ParquetWriter(path, self._schema)
+        self._row_group_rows = row_group_rows
+        self._pending: List[bytes] = []
+        self._pending_lines = 0
+        self._header_pending = True
+
+    def write(self, data: bytes) -> int:
+        self._pending.append(data)
+        self._pending_lines += data.count(b'\n')
+        if self._pending_lines >= self._row_group_rows:
+            self._flush()
+        return len(data)
+
+    def _flush(self, final: bool = False) -> None:
+        buffer = b''.join(self._pending)
+        if self._header_pending and b'\n' in buffer:
+            buffer = buffer[buffer.index(b'\n') + 1:]
+            self._header_pending = False
+
+        cut = len(buffer) if final else buffer.rfind(b'\n') + 1
+        complete, rest = buffer[:cut], buffer[cut:]
+        self._pending = [rest] if rest else []
+        self._pending_lines = 0
+
+        if complete.strip():
+            table = self._csv.read_csv(
+                io.BytesIO(complete),
+                read_options=self._csv.ReadOptions(column_names=self._columns),
+                parse_options=self._csv.ParseOptions(delimiter=';'),
+                convert_options=self._csv.ConvertOptions(column_types=self._parse_types),
+            )
+            self._writer.write_table(table.cast(self._schema))
+
+    def close(self) -> None:
+        self._flush(final=True)
+        self._writer.close()
+
+
+class Utf8LineBuffer:
+    """
+    Cible de csv.writer qui encode chaque ligne en UTF-8 dès son écriture.
+
+    Un io.StringIO vidé puis réutilisé conserve un tampon UCS-4 (4 octets par
+    caractère) en plus des copies texte et octets du lot : les lignes sont ici
+    accumulées directement en octets, et `take()` rend le lot sans copie.
+    """
+
+    def __init__(self):
+        self._bytes = io.BytesIO()
+
+    def write(self, line: str) -> int:
+        return self._bytes.write(line.encode('utf-8'))
+
+    def take(self) -> bytes:
+        """Retourne les octets du lot et repart d'un tampon vide"""
+        data = self._bytes.getvalue()
+        self._bytes = io.BytesIO()
+        return data
+
+
+class BudgetedCsvWriter:
+    """
+    Writer CSV (délimiteur ';') avec budget en octets et/ou en lignes.
+
+    Args:
+        stream: Flux binaire de sortie (voir open_output)
+        headers: En-têtes écrits immédiatement (comptés dans le budget octets)
+        target_size_bytes: Taille cible ; l'écriture s'arrête sur la ligne qui l'atteint
+        target_rows: Nombre exact de lignes de données à écrire
+        rows_written, bytes_written: Compteurs initiaux lors d'une reprise en ajout
+        metrics: RunMetrics (run_metrics) recevant les temps des étapes serialize et write
+    """
+
+    def __init__(self, stream: BinaryIO, headers: Optional[List[str]],
+                 target_size_bytes: Optional[float] = None, target_rows: Optional[int] = None,
+                 rows_written: int = 0, bytes_written: int = 0, metrics: Optional[RunMetrics] = None):
+        self.stream = stream
+        self.metrics = metrics
+        self.target_size_bytes = target_size_bytes
+        self.target_rows = target_rows
+        self.bytes_written = bytes_written
+        self.rows_written = rows_written
+        self._lines = Utf8LineBuffer()
+        self._writerow = csv.writer(self._lines, delimiter=';', quoting=csv.QUOTE_MINIMAL).writerow
+        # Lignes sérialisées par add_row, pas encore écrites (voir write_pending)
+        self.pending_rows = 0
+        if headers is not None:
+            header = (';'.join(headers) + LINE_TERMINATOR).encode('utf-8')
+            stream.write(header)
+            self.bytes_written += len(header)
+
+    @property
+    def done(self) -> bool:
+        """True lorsque le budget (octets ou lignes) est atteint"""
+        if self.target_rows is not None and self.rows_written >= self.target_rows:
+            return True
+        return self.target_size_bytes is not None and self.bytes_written >= self.target_size_bytes
+
+    def remaining_rows(self, batch_size: int) -> int:
+        """Nombre de lignes à générer pour le prochain lot, borné par le budget lignes"""
+        if self.target_rows is None:
+            return batch_size
+        return max(0, min(batch_size, self.target_rows - self.rows_written))
+
+    def next_batch_size(self, batch_size: int) -> int:
+        """
+        Taille du prochain lot du moteur ligne.
+
+        Sous budget octets, le lot est borné par l'estimation des lignes restantes
+        (taille moyenne des lignes déjà écrites, +5%) : on évite de générer puis
+        jeter des lignes au-delà de la taille cible.
+        """
+        count = self.remaining_rows(batch_size)
+        if self.target_rows is not None or self.target_size_bytes is None:
+            return count
+        if self.rows_written == 0:
+            return min(count, FIRST_BATCH_ROWS)
+        avg_row_size = self.bytes_written / self.rows_written
+        needed = int((self.target_size_bytes - self.bytes_written) / avg_row_size) + 1
+        return max(1, min(count, needed + needed // 20))
+
+    def add_row(self, row: List[Any]) -> None:
+        """Sérialise une ligne dans le lot en cours (écrit par write_pending)"""
+        self._writerow(row)
+        self.pending_rows += 1
+
+    def write_pending(self) -> int:
+        """Écrit le lot en cours (lignes ajoutées par add_row) dans la limite du budget"""
+        row_count, self.pending_rows = self.pending_rows, 0
+        return self.write_encoded(self._lines.take(), row_count)
+
+    def write_rows(self, rows: Iterable[List[Any]]) -> int:
+        """Sérialise un lot de lignes et l'écrit dans la limite du budget"""
+        started = time.perf_counter()
+        for row in rows:
+            self.add_row(row)
+        if self.metrics is not None:
+            self.metrics.add('serialize', time.perf_counter() - started)
+        return self.write_pending()
+
+    def write_block(self, block: str, row_count: int) -> int:
+        """
+        Écrit un bloc de lignes CSV déjà sérialisées dans la limite du budget.
+
+        Returns:
+            Nombre de lignes effectivement écrites
+        """
+        if self.done or row_count == 0:
+            return 0
+        started = time.perf_counter()
+        encoded = block.encode('utf-8')
+        if self.metrics is not None:
+            self.metrics.add('serialize', time.perf_counter() - started)
+        return self.write_encoded(encoded, row_count)
+
+    def write_encoded(self, encoded: bytes, row_count: int) -> int:
+        """Écrit un bloc de lignes CSV encodées en UTF-8 dans la limite du budget (voir write_block)"""
+        if self.done or row_count == 0:
+            return 0
+
+        started = time.perf_counter()
+        over_rows = self.target_rows is not None and self.rows_written + row_count > self.target_rows
+        over_bytes = self.target_size_bytes is not None and self.bytes_written + len(encoded) > self.target_size_bytes
+
+        if over_rows or over_bytes:
+            # Dernier bloc : découpe à la ligne qui atteint le budget
+            max_rows = self.target_rows - self.rows_written if self.target_rows is not None else row_count
+            kept = 0
+            position = 0
+            while kept < max_rows:
+                position = encoded.index(ENCODED_TERMINATOR, position) + len(ENCODED_TERMINATOR)
+                kept += 1
+                if self.target_size_bytes is not None and self.bytes_written + position >= self.target_size_bytes:
+                    break
+            encoded = encoded[:position]
+            row_count = kept
+
+        written = time.perf_counter()
+        # Octets CSV encodés (le flux peut compresser : on ne compte pas sa valeur de retour)
+        self.stream.write(encoded)
+        if self.metrics is not None:
+            self.metrics.add('serialize', written - started)
+            self.metrics.add('write', time.perf_counter() - written)
+        self.bytes_written += len(encoded)
+        self.rows_written += row_count
+        return row_count
+
+
+class BackgroundWriter:
+    """
+    Flux d'écriture dont les écritures sont faites par un thread dédié.
+
+    `write` dépose le bloc dans une file bornée (PIPELINE_DEPTH blocs) et rend
+    la main : la génération du lot suivant recouvre l'écriture sur disque et
+    la compression (gzip et zstd libèrent le GIL). Quand la file est pleine,
+    le producteur attend : la mémoire reste bornée. Une erreur d'écriture est
+    relancée au `write` ou au `close` suivant.
+
+    Les temps d'attente mesurent le recouvrement : le producteur qui attend
+    une place indique un goulot E/S, le thread qui attend un bloc un goulot CPU.
+    """
+
+    def __init__(self, stream: BinaryIO, depth: int = PIPELINE_DEPTH):
+        self.stream = stream
+        self.error: Optional[BaseException] = None
+        self.blocked_seconds = 0.0
+        self.idle_seconds = 0.0
+        self.write_seconds = 0.0
+        self._queue: queue.Queue = queue.Queue(maxsize=depth)
+        self._started = time.perf_counter()
+        self._finished: Optional[float] = None
+        self._thread = threading.Thread(target=self._drain, name='background-writer', daemon=True)
+        self._thread.start()
+
+    def _drain(self) -> None:
+        while True:
+            waiting = time.perf_counter()
+            block = self._queue.get()
+            started = time.perf_counter()
+            self.idle_seconds += started - waiting
+            if block is None:
+                self._queue.task_done()
+                return
+            if self.error is None:
+                try:
+                    self.stream.write(block)
+                except BaseException as e:
+                    # Les blocs suivants sont consommés sans écriture : le producteur n'est jamais bloqué
+                    self.error = e
+            self.write_seconds += time.perf_counter() - started
+            self._queue.task_done()
+
+    def write(self, data: bytes) -> int:
+        if self.error is not None:
+            raise self.error
+        waiting = time.perf_counter()
+        self._queue.put(data)
+        self.blocked_seconds += time.perf_counter() - waiting
+        return len(data)
+
+    def flush(self) -> None:
+        """Attend l'écriture des blocs en file puis vide le tampon du flux (point de reprise)"""
+        waiting = time.perf_counter()
+        self._queue.join()
+        self.blocked_seconds += time.perf_counter() - waiting
+        if self.error is not None:
+            raise self.error
+        self.stream.flush()
+
+    def fileno(self) -> int:
+        return self.stream.fileno()
+
+    def close(self) -> None:
+        if self._finished is not None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._finished = time.perf_counter()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self) -> 'BackgroundWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+            return
+        try:
+            self.close()
+        except BaseException:
+            # L'exception d'origine prime sur l'erreur d'écriture
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Temps du pipeline (après close) : génération (hors attente de place),
+        écriture, durée totale et efficacité du recouvrement (1.0 : l'étape la
+        plus courte est entièrement masquée, 0.0 : étapes en série).
+        """
+        wall = (self._finished or time.perf_counter()) - self._started
+        generation = max(0.0, wall - self.blocked_seconds)
+        shortest = min(generation, self.write_seconds)
+        overlap = (generation + self.write_seconds - wall) / shortest if shortest > 0 else 1.0
+        return {
+            'seconds': round(wall, 3),
+            'generation_seconds': round(generation, 3),
+            'write_seconds': round(self.write_seconds, 3),
+            'producer_blocked_seconds': round(self.blocked_seconds, 3),
+            'writer_idle_seconds': round(self.idle_seconds, 3),
+            'overlap_efficiency': round(min(1.0, max(0.0, overlap)), 3),
+            'bound': 'io' if self.write_seconds > generation else 'cpu',
+        }
+
+
+@contextmanager
+def pipelined(stream: BinaryIO, enabled: bool = True) -> Iterator[BinaryIO]:
+    """Écritures de `stream` déportées dans un BackgroundWriter si `enabled`, flux inchangé sinon"""
+    if not enabled:
+        yield stream
+        return
+    with BackgroundWriter(stream) as writer:
+        yield writer
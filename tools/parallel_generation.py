@@ -0,0 +1,336 @@
+"""
+Génération CSV multi-processus par shards.
+
+La plage d'identifiants est découpée en plages contiguës, chaque worker écrit
+son propre shard `part-00000.csv` (avec en-tête, pour être lisible directement
+par le wildcard `uris` de la table externe 01_STG), puis les shards sont soit
+concaténés dans l'ordre dans le fichier cible, soit conservés tels quels.
+
+Les workers démarrent à chaud : par fork lorsque la plateforme le permet
+(modules importés, Faker et pools préparés par le parent hérités), sinon
+depuis un serveur forkserver qui a préchargé les modules de génération.
+"""
+import glob
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from columnar_engine import write_columnar
+from output_sinks import (LINE_TERMINATOR, OUTPUT_FORMATS, BudgetedCsvWriter, format_filename, open_output,
+                          strip_format_extension)
+from run_metrics import RunMetrics
+
+logger = logging.getLogger(__name__)
+
+# Taille des lots écrits par chaque worker (identique au mode mono-processus)
+SHARD_BATCH_SIZE = 10000
+
+# Tampon de copie lors de la concaténation des shards
+COPY_BUFFER_SIZE = 16 * 1024 * 1024
+
+# Modules préchargés par le serveur forkserver (NumPy et Faker avant leurs imports différés)
+WORKER_PRELOAD = ['numpy', 'faker', 'entity_generator']
+
+
+def worker_context() -> multiprocessing.context.BaseContext:
+    """
+    Contexte de démarrage des workers : fork (Linux), sinon forkserver avec
+    WORKER_PRELOAD (macOS, où fork n'est pas sûr), sinon spawn (Windows).
+    """
+    methods = multiprocessing.get_all_start_methods()
+    if 'fork' in methods and sys.platform != 'darwin':
+        return multiprocessing.get_context('fork')
+    if 'forkserver' in methods:
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(WORKER_PRELOAD)
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+def split_id_range(first_id: int, total_rows: int, workers: int) -> List[Tuple[int, int]]:
+    """
+    Découpe la plage [first_id, first_id + total_rows) en plages contiguës.
+
+    Returns:
+        Liste de tuples (premier id, dernier id exclu), une par worker non vide.
+    """
+    workers = max(1, min(workers, total_rows))
+    base, extra = divmod(total_rows, workers)
+    ranges = []
+    start = first_id
+    for index in range(workers):
+        count = base + (1 if index < extra else 0)
+        ranges.append((start, start + count))
+        start += count
+    return ranges
+
+
+def write_row_batch(writer: BudgetedCsvWriter, row_fn: Callable[[int], List[Any]], first_id: int,
+                    count: int, width: int) -> int:
+    """
+    Génère les lignes [first_id, first_id + count) avec le moteur ligne et les écrit en un lot.
+
+    Chaque ligne est sérialisée dès sa génération (BudgetedCsvWriter.add_row) :
+    aucune liste de lignes n'est conservée, la mémoire ne dépend que des octets
+    du lot. Les lignes invalides (moins de `width` colonnes) ou en erreur sont ignorées.
+
+    Returns:
+        Nombre de lignes ignorées
+    """
+    error_count = 0
+    serialize_seconds = 0.0
+    for row_id in range(first_id, first_id + count):
+        try:
+            row_data = row_fn(row_id)
+        except Exception as e:
+            error_count += 1
+            logger.error(f"❌ Erreur génération ligne {row_id}: {e}")
+            continue
+        if not row_data or len(row_data) != width:
+            error_count += 1
+            logger.warning(f"⚠️ Ligne {row_id} invalide, ignorée")
+            continue
+        started = time.perf_counter()
+        writer.add_row(row_data)
+        serialize_seconds += time.perf_counter() - started
+    if writer.metrics is not None:
+        writer.metrics.add('serialize', serialize_seconds)
+    writer.write_pending()
+    return error_count
+
+
+def part_filename(parts_dir: str, index: int) -> str:
+    """Nom d'un shard, compatible avec un wildcard `part-*.csv`"""
+    return os.path.join(parts_dir, f"part-{index:05d}.csv")
+
+
+def existing_parts(parts_dir: str) -> List[str]:
+    """Shards `part-*` (tous formats) présents dans un dossier"""
+    found = set()
+    for extension in OUTPUT_FORMATS.values():
+        found.update(glob.glob(os.path.join(glob.escape(parts_dir), 'part-*' + extension)))
+    return sorted(found)
+
+
+def clear_parts(parts_dir: str) -> int:
+    """
+    Supprime les shards `part-*` laissés par une exécution précédente.
+    Sans cela, un wildcard `part-*.csv` relirait d'anciens shards en plus des nouveaux.
+
+    Returns:
+        Nombre de fichiers supprimés
+    """
+    stale = existing_parts(parts_dir)
+    for path in stale:
+        os.remove(path)
+    if stale:
+        logger.info(f"🧹 {len(stale)} ancien(s) shard(s) supprimé(s) dans {parts_dir}")
+    return len(stale)
+
+
+def _write_shard(task: Tuple[Callable[[int], List[Any]], Optional[Callable[..., Sequence[Any]]],
+                              List[str], str, int, int, Optional[int], Optional[Callable[[], RunMetrics]]]
+                 ) -> Tuple[str, int, int, int, RunMetrics]:
+    """
+    Écrit un shard complet (en-tête + lignes [first_id, stop_id)).
+    Exécuté dans un processus du pool, avec le moteur colonnaire si `block_fn` est fourni.
+    `metrics_fn()` retourne (et réinitialise) les métriques de génération du worker.
+
+    Returns:
+        (chemin, lignes écrites, octets de données hors en-tête, erreurs, métriques du shard)
+    """
+    row_fn, block_fn, headers, path, first_id, stop_id, seed, metrics_fn = task
+    error_count = 0
+    metrics = RunMetrics()
+
+    if block_fn is not None:
+        with open(path, 'wb') as output:
+            rows_written, bytes_written = write_columnar(output, headers, block_fn, first_id,
+                                                         max_rows=stop_id - first_id, seed=seed, metrics=metrics)
+    else:
+        with open(path, 'wb') as output:
+            writer = BudgetedCsvWriter(output, headers, target_rows=stop_id - first_id, metrics=metrics)
+            for batch_start in range(first_id, stop_id, SHARD_BATCH_SIZE):
+                error_count += write_row_batch(writer, row_fn, batch_start,
+                                               min(SHARD_BATCH_SIZE, stop_id - batch_start), len(headers))
+        rows_written, bytes_written = writer.rows_written, writer.bytes_written
+
+    if metrics_fn is not None:
+        metrics.merge(metrics_fn())
+    logger.info(f"🧩 Shard {os.path.basename(path)} terminé: ids {first_id:,} → {stop_id - 1:,}")
+    return path, rows_written, bytes_written - header_length(headers), error_count, metrics
+
+
+def header_length(headers: List[str]) -> int:
+    """Taille en octets de la ligne d'en-tête"""
+    return len((';'.join(headers) + LINE_TERMINATOR).encode('utf-8'))
+
+
+def generate_shards(row_fn: Callable[[int], List[Any]], headers: List[str], parts_dir: str,
+                    target_size_bytes: Optional[float], estimated_rows: int, workers: int,
+                    block_fn: Optional[Callable[..., Sequence[Any]]] = None,
+                    target_rows: Optional[int] = None, seed: Optional[int] = None,
+                    initializer: Optional[Callable[..., None]] = None, metrics: Optional[RunMetrics] = None,
+                    metrics_fn: Optional[Callable[[], RunMetrics]] = None) -> Tuple[List[str], int, int, int]:
+    """
+    Génère des shards jusqu'au budget demandé, exprimé sur le fichier concaténé
+    (en-tête unique), comme en mode mono-processus.
+
+    Avec `target_rows`, la plage d'ids est répartie exactement entre les workers.
+    Sinon, un premier tour répartit `estimated_rows` lignes ; des tours
+    complémentaires sont lancés tant que la taille cible n'est pas atteinte, à
+    partir de la taille moyenne réellement observée, avec des ids contigus. Les
+    shards sont ensuite coupés sur la ligne qui atteint la taille cible.
+    Si `block_fn` est fourni, les shards utilisent le moteur colonnaire. Les
+    shards d'une exécution précédente présents dans `parts_dir` sont supprimés.
+
+    `initializer(seed)` est appelé dans chaque worker : avec une graine, la sortie
+    est identique octet pour octet à la génération mono-processus ; sans graine,
+    il réinitialise les RNG hérités du processus parent (sinon tous les workers
+    forkés produiraient les mêmes valeurs Faker).
+
+    Les métriques de chaque shard (temps d'écriture, et `metrics_fn()` exécuté
+    dans le worker) sont fusionnées dans `metrics`.
+
+    Returns:
+        (chemins des shards dans l'ordre, lignes, octets du fichier concaténé, erreurs)
+    """
+    os.makedirs(parts_dir, exist_ok=True)
+    clear_parts(parts_dir)
+    header_size = header_length(headers)
+
+    shards: List[Tuple[str, int, int]] = []
+    next_id = 1
+    total_rows = 0
+    error_count = 0
+    data_size = 0
+    rows_to_generate = target_rows if target_rows is not None else max(estimated_rows, workers)
+
+    initargs = (seed,) if initializer is not None else ()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=worker_context(), initializer=initializer,
+                             initargs=initargs) as pool:
+        while rows_to_generate > 0:
+            tasks = []
+            for start, stop in split_id_range(next_id, rows_to_generate, workers):
+                path = part_filename(parts_dir, len(shards) + len(tasks))
+                tasks.append((row_fn, block_fn, headers, path, start, stop, seed, metrics_fn))
+            next_id += rows_to_generate
+
+            for path, rows_written, shard_size, errors, shard_metrics in pool.map(_write_shard, tasks):
+                shards.append((path, rows_written, shard_size))
+                total_rows += rows_written
+                error_count += errors
+                data_size += shard_size
+                if metrics is not None:
+                    metrics.merge(shard_metrics)
+
+            missing = (target_size_bytes or 0) - header_size - data_size
+            if target_rows is not None or total_rows == 0 or missing <= 0:
+                break
+            rows_to_generate = max(int(missing / (data_size / total_rows)) + 1, workers)
+            logger.info(f"⏳ Complément de {rows_to_generate:,} lignes pour atteindre la taille cible")
+
+    if target_rows is None and target_size_bytes is not None:
+        shards = _trim_shards(shards, target_size_bytes - header_size)
+        total_rows = sum(rows for _, rows, _ in shards)
+        data_size = sum(size for _, _, size in shards)
+
+    return [path for path, _, _ in shards], total_rows, header_size + data_size, error_count
+
+
+def _trim_shards(shards: List[Tuple[str, int, int]], data_budget: float) -> List[Tuple[str, int, int]]:
+    """
+    Coupe les shards sur la première ligne qui atteint le budget de données et
+    supprime les shards devenus inutiles.
+    """
+    kept = []
+    cumulated = 0
+    for index, (path, rows, size) in enumerate(shards):
+        if cumulated + size < data_budget:
+            kept.append((path, rows, size))
+            cumulated += size
+            continue
+
+        with open(path, 'r+b') as shard:
+            shard.readline()
+            kept_rows = 0
+            kept_size = 0
+            while cumulated + kept_size < data_budget:
+                line = shard.readline()
+                if not line:
+                    break
+                kept_rows += 1
+                kept_size += len(line)
+            shard.truncate(shard.tell())
+        kept.append((path, kept_rows, kept_size))
+
+        for path_to_remove, _, _ in shards[index + 1:]:
+            os.remove(path_to_remove)
+        break
+    return kept
+
+
+def concatenate_shards(part_paths: List[str], filename: str, skip_headers: bool = True,
+                       output_format: str = 'csv', schema_ods: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+    """
+    Concatène les shards dans l'ordre en ne conservant que le premier en-tête.
+    Avec `skip_headers=False`, les fichiers sont concaténés octet pour octet.
+    """
+    with open_output(filename, output_format, schema_ods) as output:
+        for index, path in enumerate(part_paths):
+            with open(path, 'rb') as shard:
+                if skip_headers and index > 0:
+                    shard.readline()
+                shutil.copyfileobj(shard, output, COPY_BUFFER_SIZE)
+
+
+def _convert_shard(task: Tuple[str, str, Dict[str, Dict[str, Any]], bool]) -> str:
+    """Convertit un shard CSV au format demandé (exécuté dans un processus du pool)"""
+    path, output_format, schema_ods, skip_header = task
+    converted = format_filename(strip_format_extension(path), output_format)
+    with open(path, 'rb') as shard, open_output(converted, output_format, schema_ods) as output:
+        if skip_header:
+            shard.readline()
+        shutil.copyfileobj(shard, output, COPY_BUFFER_SIZE)
+    os.remove(path)
+    return converted
+
+
+def finalize_shards(part_paths: List[str], filename: str, parts_dir: str, output_format: str,
+                    schema_ods: Dict[str, Dict[str, Any]], keep_parts: bool, workers: int) -> str:
+    """
+    Produit la sortie finale à partir des shards CSV.
+
+    - keep_parts : shards conservés (convertis en parallèle au format demandé)
+    - csv : concaténation octet à octet avec un seul en-tête
+    - csv.gz / csv.zst : compression des shards en parallèle (sans en-tête après
+      le premier) puis concaténation des membres gzip / frames zstd
+    - parquet : les shards sont relus en flux dans un seul fichier Parquet
+
+    Returns:
+        Chemin du fichier produit, ou du dossier des shards si keep_parts
+    """
+    if keep_parts:
+        if output_format != 'csv':
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(_convert_shard, [(path, output_format, schema_ods, False) for path in part_paths]))
+        return parts_dir
+
+    if output_format in ('csv', 'parquet'):
+        concatenate_shards(part_paths, filename, output_format=output_format, schema_ods=schema_ods)
+    else:
+        tasks = [(path, output_format, schema_ods, index > 0) for index, path in enumerate(part_paths)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            compressed_paths = list(pool.map(_convert_shard, tasks))
+        with open(filename, 'wb') as output:
+            for path in compressed_paths:
+                with open(path, 'rb') as member:
+                    shutil.copyfileobj(member, output, COPY_BUFFER_SIZE)
+
+    shutil.rmtree(parts_dir)
+    return filename
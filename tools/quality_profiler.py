@@ -0,0 +1,484 @@
+"""
+Contrôle qualité des fichiers sources (étape "Contrôle Qualité Sources" de
+docs/architecture-lakehouse-alimente-fichier.md).
+
+Profil en un seul passage d'un CSV `;` (généré ou déposé dans le bucket RAW),
+vérifié colonne par colonne contre le SCHEMA_ODS de l'entité :
+- en-tête : colonnes attendues, dans l'ordre de la DDL (LOAD DATA et la table
+  externe 01_STG lisent les colonnes par position)
+- lignes mal formées (nombre de champs)
+- par colonne : valeurs nulles (NOT NULL), valeurs non convertibles dans le
+  type BigQuery, bornes min_val / max_val, min_date / max_date, max_length
+- par colonne : min / max, nombre approché de valeurs distinctes
+  (HyperLogLog) et quantiles approchés (t-digest), en mémoire constante
+
+Le fichier est découpé en plages d'octets profilées par plusieurs processus
+(chaque plage commence à la ligne suivant sa borne), les profils partiels
+sont fusionnés. Les fichiers csv.gz / csv.zst sont lus en flux par un seul
+processus. Les valeurs ne doivent pas contenir de fin de ligne (garanti par
+clean_field pour les fichiers générés).
+
+Usage: python quality_profiler.py <entité> <fichier> [--workers N] [--report rapport.json]
+                                  [--max-error-rate 0.0]
+Code retour 1 si le taux d'erreurs dépasse --max-error-rate (ingestion bloquée).
+"""
+import argparse
+import csv
+import gzip
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from sketches import HyperLogLog, TDigest, hash_bytes, hash_numbers
+
+logger = logging.getLogger(__name__)
+
+# Octets lus par bloc vectorisé (complété jusqu'à la fin de ligne)
+BLOCK_SIZE = 8 * 1024 * 1024
+
+# Taille des plages d'octets réparties entre les processus
+RANGE_SIZE = 64 * 1024 * 1024
+
+# Exemples de valeurs en erreur conservés par colonne, tronqués
+MAX_EXAMPLES = 5
+EXAMPLE_LENGTH = 80
+
+# Quantiles rapportés pour les colonnes numériques et temporelles
+QUANTILES = (0.01, 0.25, 0.5, 0.75, 0.99)
+
+NUMERIC_TYPES = {'INT64': np.int64, 'FLOAT64': np.float64, 'NUMERIC': np.float64}
+TEMPORAL_TYPES = {'DATE': 'datetime64[D]', 'TIMESTAMP': 'datetime64[us]', 'DATETIME': 'datetime64[us]'}
+
+
+def _valid_mask(values: np.ndarray, dtype: Any) -> np.ndarray:
+    """Valeurs convertibles dans `dtype`, testées une à une (bloc contenant des erreurs)"""
+    mask = np.ones(len(values), dtype=bool)
+    for index, value in enumerate(values):
+        try:
+            np.array([value]).astype(dtype)
+        except (ValueError, OverflowError):
+            mask[index] = False
+    return mask
+
+
+def _digits(chars: np.ndarray, start: int, count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Entier écrit aux positions [start, start + count) de chaque ligne de `chars`, et validité"""
+    digits = chars[:, start:start + count].astype(np.int64) - ord('0')
+    valid = ((digits >= 0) & (digits <= 9)).all(axis=1)
+    return (digits * 10 ** np.arange(count - 1, -1, -1)).sum(axis=1), valid
+
+
+def parse_temporal(values: np.ndarray, unit: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Analyse vectorisée des dates `YYYY-MM-DD` et des horodatages
+    `YYYY-MM-DD[ T]HH:MM:SS[.ffffff]`.
+
+    NumPy plante (segfault) sur un astype('datetime64') de chaînes invalides
+    dans un grand tableau : les valeurs sont validées champ par champ, y
+    compris le jour dans le mois. Les horodatages d'une autre forme (fuseau
+    horaire) sont analysés un à un par datetime.fromisoformat.
+
+    Returns:
+        (valeurs datetime64[unit] des entrées valides, masque de validité)
+    """
+    lengths = np.char.str_len(values)
+    width = max(values.dtype.itemsize, 26)
+    chars = values.astype(f"S{width}").view(np.uint8).reshape(len(values), width)
+    year, valid = _digits(chars, 0, 4)
+    month, month_ok = _digits(chars, 5, 2)
+    day, day_ok = _digits(chars, 8, 2)
+    valid &= month_ok & day_ok & (chars[:, 4] == ord('-')) & (chars[:, 7] == ord('-'))
+    valid &= (month >= 1) & (month <= 12) & (day >= 1)
+    months = np.where(valid, (year - 1970) * 12 + month - 1, 0).astype('datetime64[M]')
+    first = months.astype('datetime64[D]')
+    valid &= day <= ((months + 1).astype('datetime64[D]') - first).astype(np.int64)
+    dates = first + np.where(valid, day - 1, 0)
+    if unit == 'D':
+        return dates, valid & (lengths == 10)
+
+    hour, hour_ok = _digits(chars, 11, 2)
+    minute, minute_ok = _digits(chars, 14, 2)
+    second, second_ok = _digits(chars, 17, 2)
+    fraction_length = np.clip(lengths - 20, 0, 6)
+    fraction_digits = chars[:, 20:26].astype(np.int64) - ord('0')
+    in_fraction = np.arange(6) < fraction_length[:, None]
+    fraction_ok = (~in_fraction | ((fraction_digits >= 0) & (fraction_digits <= 9))).all(axis=1)
+    fraction = (np.where(in_fraction, fraction_digits, 0) * 10 ** np.arange(5, -1, -1)).sum(axis=1)
+    time_ok = (hour_ok & minute_ok & second_ok & (hour < 24) & (minute < 60) & (second < 60)
+               & np.isin(chars[:, 10], (ord(' '), ord('T'))) & (chars[:, 13] == ord(':')) & (chars[:, 16] == ord(':'))
+               & ((lengths == 19) | ((chars[:, 19] == ord('.')) & (lengths >= 21) & (lengths <= 26) & fraction_ok)))
+    valid &= (lengths == 10) | time_ok
+    microseconds = np.where(lengths > 10, ((hour * 60 + minute) * 60 + second) * 10 ** 6 + fraction, 0)
+    parsed = dates.astype('datetime64[us]') + microseconds
+    for index in np.flatnonzero(~valid):
+        try:
+            value = datetime.fromisoformat(values[index].decode('utf-8').replace(' UTC', '+00:00'))
+        except ValueError:
+            continue
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        parsed[index] = np.datetime64(value, 'us')
+        valid[index] = True
+    return parsed, valid
+
+
+class ColumnProfile:
+    """Profil d'une colonne : compteurs, bornes, résumés HyperLogLog et t-digest"""
+
+    def __init__(self, name: str, schema: Dict[str, Any]):
+        self.name = name
+        self.schema = schema
+        self.type = schema.get('type', 'STRING')
+        self.dtype = NUMERIC_TYPES.get(self.type) or TEMPORAL_TYPES.get(self.type)
+        self.unit = self.dtype[len('datetime64['):-1] if self.type in TEMPORAL_TYPES else None
+        self.nulls = 0
+        self.invalid = 0
+        self.out_of_range = 0
+        self.too_long = 0
+        self.min: Any = None
+        self.max: Any = None
+        self.max_bytes = 0
+        self.examples: List[str] = []
+        self.distinct = HyperLogLog()
+        self.digest = TDigest() if self.dtype is not None else None
+        self.lower, self.upper = self._bounds()
+
+    def _bounds(self) -> Tuple[Any, Any]:
+        if self.type in NUMERIC_TYPES:
+            return self.schema.get('min_val'), self.schema.get('max_val')
+        if self.type in TEMPORAL_TYPES:
+            return tuple(np.datetime64(self.schema[key]).astype(self.dtype) if self.schema.get(key) else None
+                         for key in ('min_date', 'max_date'))
+        return None, None
+
+    @property
+    def errors(self) -> int:
+        required_nulls = self.nulls if self.schema.get('required') else 0
+        return required_nulls + self.invalid + self.out_of_range + self.too_long
+
+    def _example(self, reason: str, values: np.ndarray) -> None:
+        for value in values[:MAX_EXAMPLES - len(self.examples)]:
+            self.examples.append(f"{reason}: {value[:EXAMPLE_LENGTH].decode('utf-8', 'replace')}")
+
+    def update(self, raw: List[bytes]) -> None:
+        """Ajoute un bloc de valeurs brutes ('' = NULL)"""
+        values = np.array(raw, dtype=bytes)
+        present = values != b''
+        self.nulls += len(values) - int(np.count_nonzero(present))
+        values = values[present]
+        if not len(values):
+            return
+        self.max_bytes = max(self.max_bytes, int(np.char.str_len(values).max()))
+        if self.dtype is None:
+            self._update_string(values, raw)
+        else:
+            self._update_typed(values)
+
+    def _update_string(self, values: np.ndarray, raw: List[bytes]) -> None:
+        max_length = self.schema.get('max_length')
+        if max_length:
+            # Longueur en caractères : seules les valeurs trop longues en octets sont décodées
+            candidates = values[np.char.str_len(values) > max_length]
+            too_long = [value for value in candidates if len(value.decode('utf-8', 'replace')) > max_length]
+            self.too_long += len(too_long)
+            self._example('trop longue', np.array(too_long, dtype=values.dtype))
+        low, high = min(filter(None, raw)), max(raw)
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+        self.distinct.update(hash_bytes(values))
+
+    def _update_typed(self, values: np.ndarray) -> None:
+        if self.type in TEMPORAL_TYPES:
+            parsed, valid = parse_temporal(values, self.unit)
+            parsed = parsed[valid]
+        else:
+            valid = np.ones(len(values), dtype=bool)
+            try:
+                parsed = values.astype(self.dtype)
+            except (ValueError, OverflowError):
+                valid = _valid_mask(values, self.dtype)
+                parsed = values[valid].astype(self.dtype)
+        if not valid.all():
+            self.invalid += len(values) - int(np.count_nonzero(valid))
+            self._example('type', values[~valid])
+        if not len(parsed):
+            return
+        outside = np.zeros(len(parsed), dtype=bool)
+        if self.lower is not None:
+            outside |= parsed < self.lower
+        if self.upper is not None:
+            outside |= parsed > self.upper
+        if outside.any():
+            self.out_of_range += int(np.count_nonzero(outside))
+            self._example('hors bornes', values[valid][outside])
+        low, high = parsed.min(), parsed.max()
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+        numbers = parsed.astype(np.int64) if self.type in TEMPORAL_TYPES else parsed
+        self.distinct.update(hash_numbers(numbers))
+        self.digest.update(numbers.astype(np.float64))
+
+    def merge(self, other: 'ColumnProfile') -> None:
+        self.nulls += other.nulls
+        self.invalid += other.invalid
+        self.out_of_range += other.out_of_range
+        self.too_long += other.too_long
+        for bound, pick in (('min', min), ('max', max)):
+            values = [value for value in (getattr(self, bound), getattr(other, bound)) if value is not None]
+            setattr(self, bound, pick(values) if values else None)
+        self.max_bytes = max(self.max_bytes, other.max_bytes)
+        self.examples = (self.examples + other.examples)[:MAX_EXAMPLES]
+        self.distinct.merge(other.distinct)
+        if self.digest is not None:
+            self.digest.merge(other.digest)
+
+    def _format(self, value: Any) -> Any:
+        if value is None:
+            return None
+        if isinstance(value, bytes):
+            return value.decode('utf-8', 'replace')
+        if isinstance(value, np.datetime64):
+            return str(value)
+        return value.item() if isinstance(value, np.generic) else value
+
+    def to_dict(self, rows: int) -> Dict[str, Any]:
+        report = {
+            'type': self.type,
+            'nulls': self.nulls,
+            'null_rate': round(self.nulls / rows, 6) if rows else 0.0,
+            'invalid': self.invalid,
+            'out_of_range': self.out_of_range,
+            'too_long': self.too_long,
+            'errors': self.errors,
+            'distinct_approx': self.distinct.estimate() if rows > self.nulls else 0,
+            'min': self._format(self.min),
+            'max': self._format(self.max),
+            'max_bytes': self.max_bytes,
+        }
+        if self.digest is not None and len(self.digest.means):
+            quantiles = {f"p{round(q * 100):02d}": self.digest.quantile(q) for q in QUANTILES}
+            if self.type in TEMPORAL_TYPES:
+                quantiles = {key: str(np.datetime64(int(round(value)), self.unit))
+                             for key, value in quantiles.items()}
+            report['quantiles'] = quantiles
+        if self.examples:
+            report['examples'] = self.examples
+        return report
+
+
+class FileProfile:
+    """Profil (partiel ou complet) d'un fichier : lignes, lignes mal formées, colonnes"""
+
+    def __init__(self, headers: List[str], schema_ods: Dict[str, Dict[str, Any]]):
+        self.headers = headers
+        self.rows = 0
+        self.malformed = 0
+        self.examples: List[str] = []
+        self.columns = {name: ColumnProfile(name, schema_ods.get(name, {'type': 'STRING'})) for name in headers}
+
+    def update(self, block: bytes) -> None:
+        """Profile un bloc de lignes complètes"""
+        terminator = b'\r\n' if b'\r' in block else b'\n'
+        if block.endswith(terminator):
+            block = block[:-len(terminator)]
+        if not block:
+            return
+        width = len(self.headers)
+        data = np.frombuffer(block, dtype=np.uint8)
+        newlines = np.flatnonzero(data == ord('\n'))
+        separators = np.searchsorted(np.flatnonzero(data == ord(';')), np.append(newlines, len(data)))
+        if b'"' not in block and np.all(np.diff(separators, prepend=0) == width - 1):
+            # Cas courant : tous les champs du bloc en une seule découpe, colonnes extraites par tranches
+            fields = block.replace(terminator, b';').split(b';')
+            self.rows += len(newlines) + 1
+            columns = [fields[index::width] for index in range(width)]
+        else:
+            columns = self._parse_lines([line.rstrip(b'\r') for line in block.split(b'\n')])
+        for column, values in zip(self.columns.values(), columns):
+            column.update(values)
+
+    def _parse_lines(self, lines: List[bytes]) -> List[List[bytes]]:
+        """Découpe ligne à ligne : champs entre guillemets (csv.writer QUOTE_MINIMAL) et lignes mal formées"""
+        width = len(self.headers)
+        good = []
+        for line in lines:
+            if b'"' in line:
+                row = [field.encode('utf-8') for field in next(csv.reader([line.decode('utf-8', 'replace')],
+                                                                          delimiter=';'))]
+            else:
+                row = line.split(b';')
+            if len(row) == width:
+                good.append(row)
+                continue
+            self.malformed += 1
+            if len(self.examples) < MAX_EXAMPLES:
+                self.examples.append(line[:EXAMPLE_LENGTH].decode('utf-8', 'replace'))
+        self.rows += len(good)
+        return [list(values) for values in zip(*good)] if good else [[] for _ in range(width)]
+
+    def merge(self, other: 'FileProfile') -> None:
+        self.rows += other.rows
+        self.malformed += other.malformed
+        self.examples = (self.examples + other.examples)[:MAX_EXAMPLES]
+        for name, column in self.columns.items():
+            column.merge(other.columns[name])
+
+
+def read_blocks(stream: BinaryIO, end: Optional[int] = None, block_size: int = BLOCK_SIZE):
+    """Blocs de lignes complètes lus depuis la position courante ; seules les lignes commençant avant `end`"""
+    position = stream.tell() if end is not None else 0
+    while end is None or position < end:
+        size = block_size if end is None else min(block_size, end - position)
+        block = stream.read(size)
+        if not block:
+            break
+        if not block.endswith(b'\n'):
+            block += stream.readline()
+        position += len(block)
+        yield block
+
+
+def _profile_range(task: Tuple[str, int, int, int, List[str], Dict[str, Dict[str, Any]]]) -> FileProfile:
+    """Profile les lignes commençant dans [start, end) ; exécuté dans un processus du pool"""
+    path, start, end, data_start, headers, schema_ods = task
+    profile = FileProfile(headers, schema_ods)
+    with open(path, 'rb') as csvfile:
+        if start > data_start:
+            # La ligne à cheval sur la borne appartient à la plage précédente
+            csvfile.seek(start - 1)
+            csvfile.readline()
+        else:
+            csvfile.seek(start)
+        for block in read_blocks(csvfile, end):
+            profile.update(block)
+    return profile
+
+
+def open_source(path: str) -> BinaryIO:
+    """Fichier CSV en lecture binaire, décompressé en flux (csv.gz, csv.zst)"""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    if path.endswith('.zst'):
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("Le format csv.zst nécessite le paquet 'zstandard' (pip install zstandard)")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    return open(path, 'rb')
+
+
+def profile_file(path: str, schema_ods: Dict[str, Dict[str, Any]], workers: Optional[int] = None,
+                 range_size: int = RANGE_SIZE) -> Dict[str, Any]:
+    """
+    Profile un fichier CSV et le vérifie contre le schéma ODS.
+
+    Returns:
+        Rapport : lignes, erreurs, en-tête, profil de chaque colonne
+    """
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    with open_source(path) as stream:
+        header_line = stream.readline()
+        headers = header_line.rstrip(b'\r\n').decode('utf-8').split(';')
+        compressed = path.endswith(('.gz', '.zst'))
+        if compressed:
+            profile = FileProfile(headers, schema_ods)
+            for block in read_blocks(stream):
+                profile.update(block)
+
+    if not compressed:
+        data_start, size = len(header_line), os.path.getsize(path)
+        tasks = [(path, start, min(start + range_size, size), data_start, headers, schema_ods)
+                 for start in range(data_start, size, range_size)]
+        profile = FileProfile(headers, schema_ods)
+        if workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+                for partial in pool.map(_profile_range, tasks):
+                    profile.merge(partial)
+        else:
+            for task in tasks:
+                profile.merge(_profile_range(task))
+
+    expected = list(schema_ods)
+    header_errors = []
+    if headers != expected:
+        missing = [name for name in expected if name not in headers]
+        extra = [name for name in headers if name not in schema_ods]
+        header_errors.append(f"En-tête différent de la DDL (manquantes: {missing}, en trop: {extra})"
+                             if missing or extra else "Colonnes dans un ordre différent de la DDL")
+    seconds = time.perf_counter() - started
+    errors = profile.malformed + sum(column.errors for column in profile.columns.values())
+    return {
+        'file': path,
+        'bytes': os.path.getsize(path),
+        'rows': profile.rows,
+        'malformed_rows': profile.malformed,
+        'malformed_examples': profile.examples,
+        'header_errors': header_errors,
+        'errors': errors,
+        'error_rate': round(errors / max(profile.rows, 1), 6),
+        'seconds': round(seconds, 3),
+        'columns': {name: column.to_dict(profile.rows) for name, column in profile.columns.items()},
+    }
+
+
+def log_report(report: Dict[str, Any]) -> None:
+    mb = report['bytes'] / (1024 * 1024)
+    logger.info(f"🔎 {report['file']}: {report['rows']:,} lignes, {mb:.1f}MB en {report['seconds']:.2f}s "
+                f"({mb / max(report['seconds'], 1e-9):.1f} MB/s)")
+    for message in report['header_errors']:
+        logger.error(f"❌ {message}")
+    if report['malformed_rows']:
+        logger.error(f"❌ {report['malformed_rows']:,} lignes mal formées (nombre de champs)")
+    for name, column in report['columns'].items():
+        median = column.get('quantiles', {}).get('p50')
+        low, high = (str(column[bound])[:30] for bound in ('min', 'max'))
+        line = (f"   {name:<24} {column['type']:<9} nulls {column['null_rate']:>7.2%}  "
+                f"distinctes≈{column['distinct_approx']:<10,} min {low}  max {high}")
+        if median is not None:
+            line += f"  médiane≈{median:.6g}" if isinstance(median, float) else f"  médiane≈{median}"
+        logger.info(line)
+        if column['errors']:
+            logger.warning(f"⚠️ {name}: {column['errors']:,} erreur(s) - {'; '.join(column.get('examples', []))}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Contrôle qualité d'un fichier CSV contre le schéma ODS")
+    parser.add_argument('entity', help="Entité (employees, contract), spécification .yaml ou DDL .sql")
+    parser.add_argument('file')
+    parser.add_argument('--workers', type=int, help="Processus (défaut: nombre de cœurs)")
+    parser.add_argument('--report', help="Rapport JSON")
+    parser.add_argument('--max-error-rate', type=float, default=0.0,
+                        help="Taux d'erreurs (erreurs / lignes) toléré avant de bloquer l'ingestion")
+    args = parser.parse_args(argv)
+
+    try:
+        from entity_generator import load_entity
+        report = profile_file(args.file, load_entity(args.entity).schema_ods, args.workers)
+    except (OSError, ValueError, RuntimeError) as e:
+        logger.error(f"❌ Profilage impossible: {e}")
+        return 1
+    log_report(report)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, indent=2, ensure_ascii=False)
+        logger.info(f"📄 Rapport écrit dans {args.report}")
+
+    if report['header_errors'] or report['error_rate'] > args.max_error_rate:
+        logger.error(f"❌ Contrôle qualité en échec: {report['errors']:,} erreur(s) "
+                     f"(taux {report['error_rate']:.4%} > {args.max_error_rate:.4%})")
+        return 1
+    logger.info("✅ Contrôle qualité réussi : fichier conforme au schéma ODS")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Points de reprise des générations longues (fichiers CSV de 10 GB et plus).
+
+Pendant une génération CSV mono-processus, un point de reprise est écrit
+périodiquement à côté du fichier (`<fichier>.checkpoint`) : prochain id à
+générer, lignes et octets validés (le fichier est vidé et synchronisé sur
+disque avant l'écriture du point) et état des RNG. Après une interruption,
+`--resume` tronque le fichier à l'octet validé et reprend à l'id suivant avec
+les RNG restaurés : le moteur ligne produit alors la même suite qu'un run
+sans interruption, avec ou sans graine (hors horodatages sans graine).
+
+Le point mémorise la configuration du run (entité, moteur, graine, budget...) :
+une reprise avec d'autres paramètres est refusée. Il est supprimé à la fin
+d'un run réussi.
+"""
+import json
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, BinaryIO, Callable, Dict, Optional
+
+from output_sinks import BudgetedCsvWriter
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_SUFFIX = '.checkpoint'
+
+# Intervalle minimal entre deux points de reprise (secondes)
+CHECKPOINT_INTERVAL_SECONDS = 30.0
+
+CHECKPOINT_VERSION = 1
+
+
+def checkpoint_path(filename: str) -> str:
+    """Fichier du point de reprise d'un fichier généré"""
+    return filename + CHECKPOINT_SUFFIX
+
+
+class RunCheckpoint:
+    """
+    Point de reprise d'un fichier en cours de génération.
+
+    `config` (JSON) identifie le run ; `rng_state()` retourne l'état des RNG
+    (JSON) à l'instant du point, restauré par le générateur à la reprise.
+    """
+
+    def __init__(self, filename: str, config: Dict[str, Any], rng_state: Callable[[], Any],
+                 interval: float = CHECKPOINT_INTERVAL_SECONDS):
+        self.path = checkpoint_path(filename)
+        self.config = config
+        self.rng_state = rng_state
+        self.interval = interval
+        self.saved = 0
+        self._last = time.monotonic()
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Point de reprise existant (None si absent) ; ValueError si le run diffère"""
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, encoding='utf-8') as checkpoint_file:
+            state = json.load(checkpoint_file)
+        if state.get('version') != CHECKPOINT_VERSION or state.get('config') != self.config:
+            raise ValueError(f"Point de reprise {self.path} incompatible avec les paramètres du run "
+                             f"(le supprimer pour repartir de zéro)")
+        return state
+
+    def update(self, stream: BinaryIO, writer: BudgetedCsvWriter, next_row_id: int) -> None:
+        """Écrit un point de reprise si l'intervalle est écoulé (après synchronisation du fichier)"""
+        now = time.monotonic()
+        if now - self._last < self.interval:
+            return
+        stream.flush()
+        os.fsync(stream.fileno())
+        state = {
+            'version': CHECKPOINT_VERSION,
+            'config': self.config,
+            'next_row_id': next_row_id,
+            'rows_written': writer.rows_written,
+            'bytes_written': writer.bytes_written,
+            'rng_state': self.rng_state(),
+            'saved_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as checkpoint_file:
+            json.dump(state, checkpoint_file)
+        os.replace(tmp_path, self.path)
+        self._last = now
+        self.saved += 1
+        logger.debug(f"💾 Point de reprise: id {next_row_id - 1:,}, {writer.bytes_written:,} octets")
+
+    def clear(self) -> None:
+        """Supprime le point de reprise (run terminé, ou nouveau run sans reprise)"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,238 @@
+"""
+Métriques structurées d'une génération (coût et qualité des données).
+
+RunMetrics compte les lignes générées, les lignes de repli (et la colonne
+dont la stratégie a échoué), les valeurs rejetées par la validation par
+colonne, les octets écrits, le temps par étape (generate, validate,
+serialize, write) et le pic mémoire. Le rapport s'exporte en JSON et au
+format textfile Prometheus (collecteur textfile de node_exporter) pour
+suivre les exécutions planifiées.
+
+Les workers renvoient leurs propres métriques, fusionnées par le parent.
+
+Profilage optionnel : cProfile (déterministe, fichier .prof lisible par
+pstats / snakeviz) ou StackSampler (échantillonnage périodique de la pile,
+piles repliées lisibles par flamegraph.pl / speedscope, surcoût faible).
+"""
+import json
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+STAGES = ('generate', 'validate', 'serialize', 'write')
+
+PROMETHEUS_PREFIX = 'lakehouse_generator'
+
+# Intervalle d'échantillonnage de StackSampler (secondes)
+SAMPLING_INTERVAL = 0.005
+
+PROFILERS = ('cprofile', 'sampling')
+
+# Fonctions journalisées à la fin d'un run profilé
+PROFILE_TOP = 15
+
+
+def peak_rss_bytes(children: bool = False) -> int:
+    """Pic de mémoire résidente du processus courant (ou du plus gros worker terminé)"""
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en octets sous macOS, en KB sous Linux
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class RunMetrics:
+    """Compteurs et temps d'une génération, fusionnables entre processus"""
+
+    def __init__(self, entity: Optional[str] = None):
+        self.entity = entity
+        self.rows_generated = 0
+        self.fallback_rows = 0
+        # Colonne dont la stratégie a levé l'exception à l'origine de la ligne de repli
+        self.fallback_fields: Counter = Counter()
+        self.validation_failures: Counter = Counter()
+        self.stage_seconds = dict.fromkeys(STAGES, 0.0)
+        self.labels: Dict[str, Any] = {}
+        self.rows = 0
+        self.bytes = 0
+        self.success: Optional[bool] = None
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        self.seconds: Optional[float] = None
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stage_seconds[stage] += seconds
+
+    def merge(self, other: 'RunMetrics') -> None:
+        """Ajoute les compteurs et temps d'un autre processus (lignes et octets finaux exclus)"""
+        self.rows_generated += other.rows_generated
+        self.fallback_rows += other.fallback_rows
+        self.fallback_fields.update(other.fallback_fields)
+        self.validation_failures.update(other.validation_failures)
+        for stage, seconds in other.stage_seconds.items():
+            self.stage_seconds[stage] += seconds
+
+    def finish(self, rows: int, size_bytes: int, success: bool, **labels: Any) -> None:
+        """Fige le résultat du run : lignes et octets du fichier final, durée, libellés (fichier, moteur...)"""
+        self.rows = rows
+        self.bytes = size_bytes
+        self.success = success
+        self.labels.update(labels)
+        self.seconds = time.perf_counter() - self._started
+
+    def to_dict(self) -> Dict[str, Any]:
+        seconds = self.seconds if self.seconds is not None else time.perf_counter() - self._started
+        return {
+            'entity': self.entity,
+            **self.labels,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'success': self.success,
+            'seconds': round(seconds, 3),
+            'rows': self.rows,
+            'bytes': self.bytes,
+            'rows_per_second': round(self.rows / seconds) if seconds else 0,
+            'mb_per_second': round(self.bytes / (1024 * 1024) / seconds, 2) if seconds else 0.0,
+            'rows_generated': self.rows_generated,
+            'fallback_rows': self.fallback_rows,
+            'fallback_fields': dict(self.fallback_fields.most_common()),
+            'validation_failures': dict(self.validation_failures.most_common()),
+            'stage_seconds': {stage: round(value, 3) for stage, value in self.stage_seconds.items()},
+            'peak_rss_bytes': peak_rss_bytes(),
+            'peak_rss_workers_bytes': peak_rss_bytes(children=True),
+        }
+
+    def write_json(self, path: str) -> None:
+        _write_atomic(path, json.dumps(self.to_dict(), indent=2, ensure_ascii=False) + '\n')
+        logger.info(f"📊 Rapport de run JSON: {path}")
+
+    def write_prometheus(self, path: str) -> None:
+        """Écrit les métriques au format textfile Prometheus (fichier remplacé atomiquement)"""
+        report = self.to_dict()
+        base = {'entity': self.entity or ''}
+        metrics = [
+            ('last_run_timestamp_seconds', "Début du dernier run (epoch)", [(base, self.started_at.timestamp())]),
+            ('last_run_success', "1 si le dernier run a réussi", [(base, int(bool(self.success)))]),
+            ('duration_seconds', "Durée du dernier run", [(base, report['seconds'])]),
+            ('rows', "Lignes écrites", [(base, self.rows)]),
+            ('bytes', "Octets CSV écrits (non compressés)", [(base, self.bytes)]),
+            ('rows_generated', "Lignes générées (y compris au-delà de la taille cible)",
+             [(base, self.rows_generated)]),
+            ('fallback_rows', "Lignes remplacées par la ligne de repli", [(base, self.fallback_rows)]),
+            ('fallback_field_rows', "Lignes de repli par colonne en échec",
+             [({**base, 'column': column}, count) for column, count in self.fallback_fields.items()]),
+            ('validation_failures', "Valeurs rejetées par la validation SCHEMA_ODS, par colonne",
+             [({**base, 'column': column}, count) for column, count in self.validation_failures.items()]),
+            ('stage_seconds', "Temps par étape (generate, validate, serialize, write)",
+             [({**base, 'stage': stage}, round(value, 6)) for stage, value in self.stage_seconds.items()]),
+            ('peak_rss_bytes', "Pic de mémoire résidente du processus principal",
+             [(base, report['peak_rss_bytes'])]),
+            ('peak_rss_workers_bytes', "Pic de mémoire résidente du plus gros worker",
+             [(base, report['peak_rss_workers_bytes'])]),
+        ]
+        lines = []
+        for name, help_text, samples in metrics:
+            lines.append(f"# HELP {PROMETHEUS_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{name} gauge")
+            for labels, value in samples:
+                rendered = ','.join(f'{key}="{_escape_label(str(label))}"' for key, label in labels.items())
+                lines.append(f"{PROMETHEUS_PREFIX}_{name}{{{rendered}}} {value}")
+        _write_atomic(path, '\n'.join(lines) + '\n')
+        logger.info(f"📊 Métriques Prometheus: {path}")
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _write_atomic(path: str, content: str) -> None:
+    """Écrit puis renomme : un collecteur ne lit jamais un fichier partiel"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as output:
+        output.write(content)
+    os.replace(temporary, path)
+
+
+class StackSampler:
+    """
+    Profileur par échantillonnage : un thread relève la pile du thread
+    appelant toutes les `interval` secondes. `save` écrit les piles repliées
+    (`fonction;fonction;... nombre`), format flamegraph.pl / speedscope.
+    """
+
+    def __init__(self, interval: float = SAMPLING_INTERVAL):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._target = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def __enter__(self) -> 'StackSampler':
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def save(self, path: str) -> None:
+        _write_atomic(path, ''.join(f"{stack} {count}\n" for stack, count in self.samples.most_common()))
+
+
+@contextmanager
+def profiled(path: Optional[str], profiler: str = 'cprofile') -> Iterator[None]:
+    """
+    Profile le bloc avec cProfile (statistiques pstats) ou StackSampler (piles
+    repliées) et écrit le résultat dans `path` ; sans `path`, ne fait rien.
+    """
+    if not path:
+        yield
+        return
+    if profiler not in PROFILERS:
+        raise ValueError(f"Profileur inconnu: {profiler} (attendu : {', '.join(PROFILERS)})")
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if profiler == 'sampling':
+        sampler = StackSampler()
+        try:
+            with sampler:
+                yield
+        finally:
+            sampler.save(path)
+        logger.info(f"🔬 Profil échantillonné ({sum(sampler.samples.values()):,} échantillons): {path}")
+        return
+
+    import cProfile
+    import io
+    import pstats
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        profile.dump_stats(path)
+    summary = io.StringIO()
+    pstats.Stats(profile, stream=summary).sort_stats('cumulative').print_stats(PROFILE_TOP)
+    logger.info(f"🔬 Profil cProfile: {path}\n{summary.getvalue()}")
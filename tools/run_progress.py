@@ -0,0 +1,54 @@
+"""
+Suivi de progression des générations basé sur le temps écoulé.
+
+Remplace le test `row_id % 50000` (rarement vrai avec des lots de 10k lignes)
+par un rapport émis au plus toutes les `interval` secondes.
+"""
+import logging
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Intervalle par défaut entre deux rapports de progression (secondes)
+PROGRESS_INTERVAL = 5.0
+
+
+class ProgressReporter:
+    """
+    Journalise la progression d'une génération au plus toutes les `interval` secondes.
+
+    Args:
+        target_size_bytes: Taille cible (progression en % de la taille)
+        target_rows: Nombre de lignes cible (prioritaire sur la taille s'il est fourni)
+        unit: 'MB' ou 'GB' pour l'affichage de la taille
+        interval: Intervalle minimal entre deux rapports, en secondes
+    """
+
+    def __init__(self, target_size_bytes: Optional[float] = None, target_rows: Optional[int] = None,
+                 unit: str = 'MB', interval: float = PROGRESS_INTERVAL):
+        self.target_size_bytes = target_size_bytes
+        self.target_rows = target_rows
+        self.unit = 'GB' if unit == 'GB' else 'MB'
+        self.interval = interval
+        self.start = time.monotonic()
+        self._last_report = self.start
+
+    def update(self, rows: int, size_bytes: int, error_count: int = 0) -> None:
+        """Émet un rapport si l'intervalle est écoulé depuis le précédent"""
+        now = time.monotonic()
+        if now - self._last_report < self.interval:
+            return
+        self._last_report = now
+
+        if self.target_rows:
+            progress = rows / self.target_rows * 100
+        elif self.target_size_bytes:
+            progress = size_bytes / self.target_size_bytes * 100
+        else:
+            progress = 0.0
+        size_display = size_bytes / (1024 ** 3 if self.unit == 'GB' else 1024 ** 2)
+        rate = rows / (now - self.start)
+
+        logger.info(f"⏳ Progression: {progress:.1f}% - {size_display:.2f}{self.unit} - {rows:,} lignes - "
+                    f"{error_count} erreurs - {rate:,.0f} lignes/s")
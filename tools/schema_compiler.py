@@ -0,0 +1,231 @@
+"""
+Validation des valeurs selon le schéma ODS.
+
+`validate_field` (implémentation de référence) relit `SCHEMA_ODS[field_name]`,
+teste le type et la présence des bornes pour chaque cellule. Le schéma est
+aussi compilé une seule fois en un tuple de fonctions de coercition/bornage
+par colonne, puis en un validateur de ligne complet. La sémantique reste
+strictement celle de `validate_field` : bornage min/max, arrondi des FLOAT64,
+nettoyage et troncature des STRING, `None` (puis '') en cas d'erreur de
+conversion.
+
+`clean_column` applique le nettoyage des STRING à une colonne entière en
+quelques opérations sur une seule chaîne (colonne jointe) ; les colonnes dont les valeurs sont
+déjà propres (`clean_columns`, ex: listes de référence) ne sont pas validées.
+"""
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+FieldValidator = Callable[[Any], Any]
+
+# Séparateur des valeurs d'une colonne jointe (ni remplacé ni retiré par strip)
+_SEPARATOR = '\0'
+
+# Valeurs examinées pour choisir entre remplacement sur la colonne jointe ou valeur par valeur
+DIRTY_SAMPLE = 64
+
+
+def clean_field(value: Any, max_length: int = None) -> str:
+    """
+    Nettoie un champ pour éviter les problèmes avec le délimiteur CSV.
+    Conforme aux standards du framework GCP Data Lakehouse.
+    """
+    if value is None:
+        return ''
+
+    if isinstance(value, str):
+        # Nettoyer les caractères problématiques
+        cleaned = value.replace(';', ',').replace('\n', ' ').replace('\r', ' ').strip()
+        # Appliquer la limite de longueur si spécifiée
+        if max_length and len(cleaned) > max_length:
+            cleaned = cleaned[:max_length]
+        return cleaned
+
+    return str(value)
+
+
+def clean_column(values: Sequence[Any], max_length: int = None) -> List[str]:
+    """
+    Nettoie une colonne entière : résultat identique à clean_field(str(valeur), max_length)
+    pour chaque valeur. La colonne est jointe en une chaîne : une colonne sans
+    délimiteur ni fin de ligne n'est pas remplacée, une colonne peu touchée l'est
+    en une fois sur la chaîne jointe puis redécoupée, du texte multiligne valeur
+    par valeur. Troncature seulement si une valeur dépasse max_length.
+    """
+    try:
+        joined = _SEPARATOR.join(values)
+    except TypeError:
+        values = list(map(str, values))
+        joined = _SEPARATOR.join(values)
+    if ';' in joined or '\n' in joined or '\r' in joined:
+        # Part des valeurs à nettoyer estimée sur les premières valeurs de la colonne
+        sample = values[:DIRTY_SAMPLE]
+        touched = sum(1 for value in sample if ';' in value or '\n' in value or '\r' in value)
+        parts = []
+        if touched * 4 < len(sample):
+            parts = joined.replace(';', ',').replace('\n', ' ').replace('\r', ' ').split(_SEPARATOR)
+        # Valeurs majoritairement touchées (texte multiligne), ou séparateur présent dans une valeur
+        if len(parts) != len(values):
+            parts = [value.replace(';', ',').replace('\n', ' ').replace('\r', ' ') for value in values]
+        values = parts
+    cleaned = list(map(str.strip, values))
+    if max_length and max(map(len, cleaned), default=0) > max_length:
+        cleaned = [value[:max_length] for value in cleaned]
+    return cleaned
+
+
+def validate_field(schema_ods: Dict[str, Dict[str, Any]], field_name: str, value: Any,
+                   float_decimals: int = 6) -> Any:
+    """
+    Valide un champ selon le schéma ODS défini.
+    Conforme aux types BigQuery de la DDL de l'entité.
+    """
+    if field_name not in schema_ods:
+        logger.warning(f"Champ non reconnu dans le schéma ODS: {field_name}")
+        return value
+
+    schema = schema_ods[field_name]
+    field_type = schema.get('type')
+
+    try:
+        # Validation selon le type BigQuery
+        if field_type == 'INT64':
+            int_val = int(value)
+            if 'min_val' in schema and int_val < schema['min_val']:
+                int_val = schema['min_val']
+            if 'max_val' in schema and int_val > schema['max_val']:
+                int_val = schema['max_val']
+            return int_val
+
+        elif field_type == 'FLOAT64':
+            float_val = float(value)
+            if 'min_val' in schema and float_val < schema['min_val']:
+                float_val = schema['min_val']
+            if 'max_val' in schema and float_val > schema['max_val']:
+                float_val = schema['max_val']
+            return round(float_val, float_decimals)
+
+        elif field_type == 'STRING':
+            max_length = schema.get('max_length')
+            return clean_field(str(value), max_length)
+
+        elif field_type in ['DATE', 'TIMESTAMP']:
+            return str(value)
+
+        else:
+            return clean_field(str(value))
+
+    except (ValueError, TypeError) as e:
+        logger.error(f"Erreur de validation pour {field_name}: {e}")
+        return None
+
+
+def _compile_int(field_name: str, schema: Dict[str, Any]) -> FieldValidator:
+    min_val = schema.get('min_val', float('-inf'))
+    max_val = schema.get('max_val', float('inf'))
+
+    def validate_int(value: Any) -> Any:
+        try:
+            int_val = int(value)
+        except (ValueError, TypeError) as e:
+            logger.error(f"Erreur de validation pour {field_name}: {e}")
+            return None
+        if int_val < min_val:
+            int_val = min_val
+        if int_val > max_val:
+            int_val = max_val
+        return int_val
+
+    return validate_int
+
+
+def _compile_float(field_name: str, schema: Dict[str, Any], float_decimals: int) -> FieldValidator:
+    min_val = schema.get('min_val', float('-inf'))
+    max_val = schema.get('max_val', float('inf'))
+
+    def validate_float(value: Any) -> Any:
+        try:
+            float_val = float(value)
+        except (ValueError, TypeError) as e:
+            logger.error(f"Erreur de validation pour {field_name}: {e}")
+            return None
+        if float_val < min_val:
+            float_val = min_val
+        if float_val > max_val:
+            float_val = max_val
+        return round(float_val, float_decimals)
+
+    return validate_float
+
+
+def _compile_string(max_length: Any) -> FieldValidator:
+    def validate_string(value: Any) -> str:
+        cleaned = str(value).replace(';', ',').replace('\n', ' ').replace('\r', ' ').strip()
+        if max_length and len(cleaned) > max_length:
+            cleaned = cleaned[:max_length]
+        return cleaned
+
+    return validate_string
+
+
+def compile_field(field_name: str, schema: Dict[str, Any], float_decimals: int) -> FieldValidator:
+    """Compile la définition d'une colonne en fonction de validation spécialisée"""
+    field_type = schema.get('type')
+
+    if field_type == 'INT64':
+        return _compile_int(field_name, schema)
+    if field_type == 'FLOAT64':
+        return _compile_float(field_name, schema, float_decimals)
+    if field_type == 'STRING':
+        return _compile_string(schema.get('max_length'))
+    if field_type in ('DATE', 'TIMESTAMP'):
+        return str
+    return _compile_string(None)
+
+
+def _already_clean(value: Any) -> Any:
+    return value
+
+
+def compile_schema(schema_ods: Dict[str, Dict[str, Any]], float_decimals: int,
+                   clean_columns: Iterable[str] = ()) -> Tuple[Tuple[str, FieldValidator], ...]:
+    """
+    Compile le schéma ODS en tuple (nom de colonne, validateur), dans l'ordre du schéma.
+
+    Args:
+        schema_ods: Schéma ODS (ex: SCHEMA_ODS)
+        float_decimals: Nombre de décimales des FLOAT64 (6 employees, 2 contract)
+        clean_columns: Colonnes STRING dont les valeurs sont déjà nettoyées (validation omise)
+    """
+    clean_columns = set(clean_columns)
+    return tuple((name, _already_clean if name in clean_columns and schema.get('type') == 'STRING'
+                  else compile_field(name, schema, float_decimals))
+                 for name, schema in schema_ods.items())
+
+
+def compile_row_validator(schema_ods: Dict[str, Dict[str, Any]], float_decimals: int,
+                          on_failure: Optional[Callable[[str], None]] = None, clean_columns: Iterable[str] = ()
+                          ) -> Callable[[Dict[str, Any], int], List[Any]]:
+    """
+    Compile le schéma ODS en validateur de ligne complet.
+
+    Le validateur prend le dictionnaire des valeurs brutes et l'id de ligne, et
+    retourne la ligne validée dans l'ordre du schéma ('' pour un champ en erreur).
+    `on_failure(colonne)` est appelé pour chaque champ en erreur (métriques).
+    """
+    validators = compile_schema(schema_ods, float_decimals, clean_columns)
+
+    def validate_row(raw_data: Dict[str, Any], row_id: int) -> List[Any]:
+        validated_row = [validate(raw_data[name]) for name, validate in validators]
+        if None in validated_row:
+            for index, (name, _) in enumerate(validators):
+                if validated_row[index] is None:
+                    logger.error(f"Validation échouée pour {name} à la ligne {row_id}")
+                    validated_row[index] = ''
+                    if on_failure is not None:
+                        on_failure(name)
+        return validated_row
+
+    return validate_row
@@ -0,0 +1,487 @@
+"""
+Vérification du contrat de schéma d'une entité, avant génération ou upload.
+
+Quatre familles d'artefacts doivent s'accorder sur l'ordre et le type des
+colonnes : le SCHEMA_ODS du générateur, les tables externes 01_STG
+(`create_external_table_stg_<entité>*.sql`, lues par position), les DDL
+02_ODS (`create_table_ods_<entité>*.sql`) avec le LOAD DATA
+(`load_csv_to_ods_<entité>.sql`) et les définitions Dataform
+(`load_stg_to_ods_<entité>*.sqlx`). Un écart fait échouer les chargements,
+ou pire les décale silencieusement, après des heures d'upload.
+
+Pour chaque entité, toutes les variantes livrées sont analysées :
+- DDL 01_STG / 02_ODS et LOAD DATA : mêmes colonnes dans le même ordre, mêmes
+  types, STRING(n) pas plus court que le max_length du générateur, options CSV
+  des fichiers générés (field_delimiter ';', une ligne d'en-tête)
+- DDL 02_ODS : colonnes d'ingestion (ingestion_date, source_file) présentes
+- SQLX : colonnes du SELECT dans l'ordre de la DDL 02_ODS, table source
+  déclarée par une DDL 01_STG, table cible conforme à la DDL 02_ODS
+
+Les fichiers générés (`data/` par défaut) sont rattachés à leur entité par
+leur nom : en-tête comparé au SCHEMA_ODS, puis lignes échantillonnées en
+quelques plages réparties dans le fichier et vérifiées contre les types
+déclarés (voir quality_profiler) ; les valeurs hors bornes min/max ne sont
+que signalées. Entités et fichiers sont vérifiés en un
+seul passage sur plusieurs processus.
+
+Usage: python schema_contract.py [entité ...] [--files fichier ...] [--data-dir data] [--workers N]
+                                 [--samples 8] [--sample-kb 256] [--report rapport.json]
+Code retour 1 au premier écart détecté (génération ou upload à ne pas lancer).
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from ddl_schema import INGESTION_COLUMNS, ODS_DDL, REPO_DIR, STG_DDL, parse_ddl, parse_ddl_file, parse_options
+from local_loader import DATAFORM_SQLX, LOAD_DATA_SQL, parse_load_data, parse_sqlx
+from output_sinks import strip_format_extension
+
+logger = logging.getLogger(__name__)
+
+# Familles d'artefacts d'une entité (le modèle et ses variantes <modèle>_*)
+ARTIFACTS = {
+    'ods_ddl': ODS_DDL,
+    'stg_ddl': STG_DDL,
+    'load_data': LOAD_DATA_SQL,
+    'dataform': DATAFORM_SQLX,
+}
+
+# Options CSV des fichiers générés (output_sinks) attendues par les tables externes et LOAD DATA
+CSV_DELIMITER = ';'
+CSV_HEADER_ROWS = 1
+
+# Fichiers générés vérifiés par défaut
+DATA_EXTENSIONS = ('.csv', '.csv.gz', '.csv.zst')
+
+# Échantillonnage des lignes : plages réparties dans le fichier (tête seule si compressé)
+SAMPLE_BLOCKS = 8
+SAMPLE_BYTES = 256 * 1024
+
+# Exemples d'écarts conservés par fichier
+MAX_EXAMPLES = 3
+
+
+def entity_artifacts(entity: str, repo_dir: str = REPO_DIR) -> Dict[str, List[str]]:
+    """Artefacts livrés d'une entité par famille (fichier de référence et variantes <entité>_*)"""
+    artifacts = {}
+    for kind, template in ARTIFACTS.items():
+        path = os.path.join(repo_dir, template.format(entity=entity))
+        stem, extension = os.path.splitext(path)
+        variants = glob.glob(glob.escape(stem) + '_*' + extension)
+        artifacts[kind] = ([path] if os.path.exists(path) else []) + sorted(variants)
+    return artifacts
+
+
+def compare_columns(label: str, schema_ods: Dict[str, Dict[str, Any]],
+                    columns: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Écarts entre les colonnes d'un artefact et le SCHEMA_ODS : noms, ordre, types, longueur STRING(n)"""
+    errors = []
+    expected, actual = list(schema_ods), list(columns)
+    missing = [name for name in expected if name not in columns]
+    extra = [name for name in actual if name not in schema_ods]
+    if missing or extra:
+        errors.append(f"{label}: colonnes manquantes {missing}, en trop {extra}")
+    elif actual != expected:
+        position = next(index for index, (name, reference) in enumerate(zip(actual, expected)) if name != reference)
+        errors.append(f"{label}: ordre différent du SCHEMA_ODS en position {position + 1} "
+                      f"({actual[position]} au lieu de {expected[position]})")
+    for name, schema in schema_ods.items():
+        column = columns.get(name)
+        if column is None:
+            continue
+        if column['type'] != schema['type']:
+            errors.append(f"{label}: {name} de type {column['type']} (SCHEMA_ODS: {schema['type']})")
+        limit = column.get('max_length')
+        if limit and schema.get('max_length', limit + 1) > limit:
+            errors.append(f"{label}: {name} STRING({limit}) plus court que le max_length "
+                          f"{schema.get('max_length', 'illimité')} du générateur")
+    return errors
+
+
+def compare_csv_options(label: str, options: Dict[str, Any]) -> List[str]:
+    """Écarts entre les options CSV d'une table externe ou d'un LOAD DATA et le format des fichiers générés"""
+    if str(options.get('format', 'CSV')).upper() != 'CSV':
+        return []
+    errors = []
+    delimiter = options.get('field_delimiter', ',')
+    if delimiter != CSV_DELIMITER:
+        errors.append(f"{label}: field_delimiter {delimiter!r} (fichiers générés: {CSV_DELIMITER!r})")
+    header_rows = options.get('skip_leading_rows', 0)
+    if header_rows != CSV_HEADER_ROWS:
+        errors.append(f"{label}: skip_leading_rows = {header_rows} (fichiers générés: {CSV_HEADER_ROWS} "
+                      f"ligne d'en-tête)")
+    return errors
+
+
+def select_columns(query: str) -> List[str]:
+    """Colonnes produites par le SELECT principal d'une requête : alias AS, sinon nom de la colonne"""
+    match = re.search(r"\bSELECT\b", query, re.IGNORECASE)
+    if match is None:
+        raise ValueError("Requête SELECT absente")
+    items, depth, start = [], 0, match.end()
+    for token in re.finditer(r"'(?:[^'\\]|\\.)*'|[(),]|\bFROM\b", query[match.end():], re.IGNORECASE):
+        text = token.group(0)
+        if text == '(':
+            depth += 1
+        elif text == ')':
+            depth -= 1
+        elif depth == 0 and text == ',':
+            items.append(query[start:match.end() + token.start()])
+            start = match.end() + token.end()
+        elif depth == 0 and text.upper() == 'FROM':
+            items.append(query[start:match.end() + token.start()])
+            break
+    names = []
+    for item in items:
+        name = re.search(r"`?(\w+)`?\s*$", item.strip())
+        if name is None:
+            raise ValueError(f"Colonne du SELECT sans nom: {item.strip()}")
+        names.append(name.group(1))
+    return names
+
+
+def _table_name(table: str) -> str:
+    """dataset.table d'une référence BigQuery (projet optionnel)"""
+    return '.'.join(table.split('.')[-2:])
+
+
+def verify_entity(entity: str, schema_ods: Dict[str, Dict[str, Any]], repo_dir: str = REPO_DIR) -> Dict[str, Any]:
+    """
+    Vérifie les artefacts livrés d'une entité contre son SCHEMA_ODS (voir le docstring du module).
+
+    Returns:
+        {'entity', 'artifacts' (chemins relatifs vérifiés), 'errors' (écarts, un message chacun)}
+    """
+    artifacts = entity_artifacts(entity, repo_dir)
+    label = {path: os.path.relpath(path, repo_dir) for paths in artifacts.values() for path in paths}
+    errors = []
+
+    # DDL 02_ODS de référence : table cible et colonnes (ingestion comprise) des SQLX
+    ods_path = os.path.join(repo_dir, ODS_DDL.format(entity=entity))
+    ods_table, ods_columns = None, None
+    for path in artifacts['ods_ddl']:
+        try:
+            table, columns = parse_ddl_file(path, exclude=())
+        except ValueError as e:
+            errors.append(f"{label[path]}: {e}")
+            continue
+        if path == ods_path:
+            ods_table, ods_columns = table, list(columns)
+        missing = [name for name in INGESTION_COLUMNS if name not in columns]
+        if missing:
+            errors.append(f"{label[path]}: colonnes d'ingestion manquantes {missing}")
+        data_columns = {name: column for name, column in columns.items() if name not in INGESTION_COLUMNS}
+        errors.extend(compare_columns(label[path], schema_ods, data_columns))
+
+    stg_tables = set()
+    for path in artifacts['stg_ddl']:
+        try:
+            with open(path, 'r', encoding='utf-8') as ddl_file:
+                sql = ddl_file.read()
+            table, columns = parse_ddl(sql, exclude=())
+        except ValueError as e:
+            errors.append(f"{label[path]}: {e}")
+            continue
+        stg_tables.add(_table_name(table))
+        errors.extend(compare_columns(label[path], schema_ods, columns))
+        errors.extend(compare_csv_options(label[path], parse_options(sql)))
+
+    for path in artifacts['load_data']:
+        try:
+            with open(path, 'r', encoding='utf-8') as sql_file:
+                load = parse_load_data(sql_file.read())
+        except ValueError as e:
+            errors.append(f"{label[path]}: {e}")
+            continue
+        if ods_table is not None and _table_name(load['table']) != _table_name(ods_table):
+            errors.append(f"{label[path]}: charge {load['table']} au lieu de {ods_table}")
+        errors.extend(compare_columns(label[path], schema_ods, load['columns']))
+        errors.extend(compare_csv_options(label[path], load['options']))
+
+    for path in artifacts['dataform']:
+        try:
+            with open(path, 'r', encoding='utf-8') as sqlx_file:
+                config, query = parse_sqlx(sqlx_file.read())
+            output = select_columns(query)
+        except ValueError as e:
+            errors.append(f"{label[path]}: {e}")
+            continue
+        source = re.search(r"\bFROM\s+`([\w.\-]+)`", query, re.IGNORECASE)
+        if source is None or _table_name(source.group(1)) not in stg_tables:
+            errors.append(f"{label[path]}: table source {source.group(1) if source else '?'} "
+                          f"non déclarée par une DDL 01_STG ({', '.join(sorted(stg_tables)) or 'aucune'})")
+        if ods_table is None:
+            continue
+        target = f"{config.get('schema', '02_ODS')}.{config.get('name', entity)}"
+        if target != _table_name(ods_table):
+            errors.append(f"{label[path]}: table cible {target} au lieu de {_table_name(ods_table)}")
+        if output != ods_columns:
+            errors.append(f"{label[path]}: colonnes du SELECT différentes de la DDL 02_ODS "
+                          f"(SELECT: {output}, DDL: {ods_columns})")
+
+    return {
+        'entity': entity,
+        'artifacts': [label[path] for paths in artifacts.values() for path in paths],
+        'errors': errors,
+    }
+
+
+def sample_blocks(stream, size: Optional[int], data_start: int, samples: int = SAMPLE_BLOCKS,
+                  sample_bytes: int = SAMPLE_BYTES):
+    """
+    Blocs de lignes complètes répartis uniformément dans le fichier (après
+    l'en-tête) ; fichier entier s'il est petit, tête seule si `size` est
+    None (flux compressé, sans accès direct).
+    """
+    if size is None:
+        block = b''
+        while len(block) < sample_bytes:
+            chunk = stream.read(sample_bytes - len(block))
+            if not chunk:
+                # Fin du flux : le bloc se termine sur une ligne complète
+                yield block
+                return
+            block += chunk
+        yield block[:block.rfind(b'\n') + 1]
+        return
+    if size - data_start <= samples * sample_bytes:
+        yield stream.read()
+        return
+    span = size - data_start
+    for index in range(samples):
+        position = data_start + index * span // samples
+        if position > data_start:
+            # La ligne à cheval sur la position est ignorée
+            stream.seek(position - 1)
+            stream.readline()
+        else:
+            stream.seek(position)
+        block = stream.read(sample_bytes)
+        if block and not block.endswith(b'\n'):
+            block += stream.readline()
+        yield block
+
+
+def verify_file(path: str, entity: str, schema_ods: Dict[str, Dict[str, Any]], samples: int = SAMPLE_BLOCKS,
+                sample_bytes: int = SAMPLE_BYTES) -> Dict[str, Any]:
+    """
+    Vérifie un fichier généré : en-tête identique au SCHEMA_ODS, puis lignes
+    échantillonnées (nombre de champs, types, NOT NULL, longueurs STRING(n)).
+
+    Returns:
+        {'file', 'entity', 'rows_sampled', 'errors', 'warnings' (valeurs hors bornes, non bloquantes)}
+    """
+    # NumPy n'est chargé que si des fichiers sont vérifiés
+    from quality_profiler import FileProfile, open_source
+
+    expected = list(schema_ods)
+    report = {'file': path, 'entity': entity, 'rows_sampled': 0, 'errors': [], 'warnings': []}
+    if path.endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("La vérification des fichiers parquet nécessite 'pyarrow' (pip install pyarrow)")
+        names = pq.read_schema(path).names
+        if names != expected:
+            report['errors'].append(f"{path}: colonnes {names} différentes du SCHEMA_ODS {expected}")
+        return report
+
+    with open_source(path) as stream:
+        header_line = stream.readline()
+        header = header_line.rstrip(b'\r\n').decode('utf-8', 'replace').split(CSV_DELIMITER)
+        if header != expected:
+            # Les types des lignes se lisent par position : inutile d'aller plus loin
+            report['errors'].append(f"{path}: en-tête {header} différent du SCHEMA_ODS {expected}")
+            return report
+        size = None if path.endswith(('.gz', '.zst')) else os.path.getsize(path)
+        profile = FileProfile(header, schema_ods)
+        for block in sample_blocks(stream, size, len(header_line), samples, sample_bytes):
+            profile.update(block)
+
+    report['rows_sampled'] = profile.rows
+    if profile.malformed:
+        report['errors'].append(f"{path}: {profile.malformed:,} lignes mal formées sur {profile.rows:,} "
+                                f"échantillonnées (ex: {profile.examples[:MAX_EXAMPLES]})")
+    for name, column in profile.columns.items():
+        # Les bornes min/max relèvent de la qualité des données (quality_profiler),
+        # pas du contrat : seul ce qui fait échouer un chargement est bloquant
+        breaking = column.errors - column.out_of_range
+        if breaking:
+            examples = [example for example in column.examples if not example.startswith('hors bornes')]
+            report['errors'].append(f"{path}: {name} ({column.type}) - {breaking:,} valeur(s) non conforme(s) "
+                                    f"sur {profile.rows:,} lignes échantillonnées "
+                                    f"({'; '.join(examples[:MAX_EXAMPLES])})")
+        if column.out_of_range:
+            report['warnings'].append(f"{path}: {name} - {column.out_of_range:,} valeur(s) hors des bornes du "
+                                      f"SCHEMA_ODS sur {profile.rows:,} lignes échantillonnées")
+    return report
+
+
+def entity_for_file(path: str, entities: List[str]) -> Optional[str]:
+    """Entité d'un fichier généré d'après son nom ou celui d'un dossier parent (<entité>_<taille>...)"""
+    parts = os.path.normpath(os.path.abspath(path)).split(os.sep)
+    for part in reversed(parts):
+        stem = strip_format_extension(part)
+        for entity in sorted(entities, key=len, reverse=True):
+            if stem == entity or stem.startswith(entity + '_'):
+                return entity
+    return None
+
+
+def data_files(data_dir: str) -> List[str]:
+    """Fichiers CSV générés sous `data_dir` (shards et arborescences Hive compris)"""
+    paths = glob.glob(os.path.join(glob.escape(data_dir), '**', '*'), recursive=True)
+    return sorted(path for path in paths if path.endswith(DATA_EXTENSIONS) and os.path.isfile(path))
+
+
+def _verify_task(task: Tuple) -> Dict[str, Any]:
+    """Vérification d'une entité ou d'un fichier ; exécutée dans un processus du pool"""
+    kind, *arguments = task
+    return verify_entity(*arguments) if kind == 'entity' else verify_file(*arguments)
+
+
+def verify_contracts(schemas: List[Tuple[str, Dict[str, Dict[str, Any]]]], files: Optional[List[str]] = None,
+                     workers: Optional[int] = None, samples: int = SAMPLE_BLOCKS,
+                     sample_bytes: int = SAMPLE_BYTES, repo_dir: str = REPO_DIR) -> Dict[str, Any]:
+    """
+    Vérifie en un passage (plusieurs processus) les artefacts de chaque
+    (entité, SCHEMA_ODS) de `schemas` et les fichiers générés `files`, vérifiés
+    contre le premier SCHEMA_ODS de leur entité.
+
+    Returns:
+        {'entities': [...], 'files': [...], 'errors': nombre d'écarts, 'seconds'}
+    """
+    started = time.perf_counter()
+    tasks = [('entity', entity, schema_ods, repo_dir) for entity, schema_ods in schemas]
+    by_entity = {}
+    for entity, schema_ods in schemas:
+        by_entity.setdefault(entity, schema_ods)
+    unmatched = []
+    for path in files or []:
+        entity = entity_for_file(path, list(by_entity))
+        if entity is None:
+            unmatched.append(path)
+        else:
+            tasks.append(('file', path, entity, by_entity[entity], samples, sample_bytes))
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            results = list(pool.map(_verify_task, tasks))
+    else:
+        results = [_verify_task(task) for task in tasks]
+
+    entity_reports = [result for result in results if 'artifacts' in result]
+    file_reports = [result for result in results if 'file' in result]
+    file_reports.extend({'file': path, 'entity': None, 'rows_sampled': 0, 'warnings': [],
+                         'errors': [f"{path}: aucune entité ({', '.join(by_entity)}) ne correspond à ce fichier"]}
+                        for path in unmatched)
+    return {
+        'entities': entity_reports,
+        'files': file_reports,
+        'errors': sum(len(result['errors']) for result in entity_reports + file_reports),
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+
+
+def preflight_contract(entity: str, schema_ods: Dict[str, Dict[str, Any]], repo_dir: str = REPO_DIR) -> bool:
+    """
+    Contrôle rapide (quelques ms) des artefacts d'une entité avant une génération
+    ou un upload : False, écarts journalisés, si le contrat est rompu. Une entité
+    sans artefact livré (spécification ou DDL externe) n'a rien à vérifier.
+    """
+    started = time.perf_counter()
+    report = verify_entity(entity, schema_ods, repo_dir)
+    for message in report['errors']:
+        logger.error(f"❌ Contrat de schéma rompu: {message}")
+    if report['errors']:
+        logger.error(f"💥 {len(report['errors'])} écart(s) entre le SCHEMA_ODS de {entity} et ses artefacts "
+                     f"(python tools/schema_contract.py {entity})")
+        return False
+    if report['artifacts']:
+        logger.info(f"🤝 Contrat de schéma {entity}: {len(report['artifacts'])} artefacts conformes au SCHEMA_ODS "
+                    f"({(time.perf_counter() - started) * 1000:.0f} ms)")
+    return True
+
+
+def entity_schemas(sources: Optional[List[str]] = None) -> List[Tuple[str, Dict[str, Dict[str, Any]]]]:
+    """
+    (entité, SCHEMA_ODS) des spécifications `sources` (défaut: toutes celles de
+    tools/entities). Les profils d'une entité (employees, employees_skewed)
+    partagent ses artefacts : chaque SCHEMA_ODS distinct est retenu.
+    """
+    from entity_generator import ENTITIES_DIR, load_entity
+    sources = sources or sorted(os.path.splitext(name)[0] for name in os.listdir(ENTITIES_DIR)
+                                if name.endswith(('.yaml', '.yml')))
+    schemas = []
+    for source in sources:
+        entity = load_entity(source)
+        if (entity.name, entity.schema_ods) not in schemas:
+            schemas.append((entity.name, entity.schema_ods))
+    return schemas
+
+
+def log_report(report: Dict[str, Any]) -> None:
+    for result in report['entities']:
+        status = '✅' if not result['errors'] else '❌'
+        logger.info(f"{status} {result['entity']}: {len(result['artifacts'])} artefacts vérifiés")
+        for message in result['errors']:
+            logger.error(f"   {message}")
+    for result in report['files']:
+        status = '✅' if not result['errors'] else '❌'
+        logger.info(f"{status} {result['file']} ({result['entity']}): {result['rows_sampled']:,} lignes échantillonnées")
+        for message in result['errors']:
+            logger.error(f"   {message}")
+        for message in result.get('warnings', []):
+            logger.warning(f"   ⚠️ {message}")
+    outcome = "contrat respecté" if not report['errors'] else f"{report['errors']} écart(s)"
+    logger.info(f"🤝 {len(report['entities'])} entité(s), {len(report['files'])} fichier(s) en "
+                f"{report['seconds']:.2f}s : {outcome}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Contrat de schéma : SCHEMA_ODS, DDL, LOAD DATA, SQLX et fichiers")
+    parser.add_argument('entities', nargs='*', help="Entités (défaut: toutes les spécifications de tools/entities)")
+    parser.add_argument('--files', nargs='+', help="Fichiers générés à vérifier (défaut: ceux de --data-dir)")
+    parser.add_argument('--data-dir', default='data')
+    parser.add_argument('--workers', type=int, help="Processus (défaut: nombre de cœurs)")
+    parser.add_argument('--samples', type=int, default=SAMPLE_BLOCKS, help="Plages échantillonnées par fichier")
+    parser.add_argument('--sample-kb', type=int, default=SAMPLE_BYTES // 1024, help="Taille d'une plage (KB)")
+    parser.add_argument('--report', help="Rapport JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        schemas = entity_schemas(args.entities)
+    except (OSError, ValueError, RuntimeError) as e:
+        logger.error(f"❌ Spécification invalide: {e}")
+        return 1
+
+    if args.files is not None:
+        files = args.files
+    elif os.path.isdir(args.data_dir):
+        names = [name for name, _ in schemas]
+        files = [path for path in data_files(args.data_dir) if entity_for_file(path, names) is not None]
+    else:
+        files = []
+    try:
+        report = verify_contracts(schemas, files, args.workers, args.samples, args.sample_kb * 1024)
+    except (OSError, RuntimeError) as e:
+        logger.error(f"❌ Vérification impossible: {e}")
+        return 1
+    log_report(report)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, indent=2, ensure_ascii=False)
+    return 1 if report['errors'] else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main())
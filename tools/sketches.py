@@ -0,0 +1,129 @@
+"""
+Résumés approximatifs en mémoire constante pour le profilage des fichiers.
+
+- HyperLogLog : nombre de valeurs distinctes (2^precision registres d'un
+  octet, erreur relative ~1.04 / sqrt(2^precision), 0.8 % par défaut)
+- TDigest : quantiles approchés (centroïdes bornés par `compression`,
+  précision relative meilleure aux extrémités)
+
+Les deux résumés sont alimentés par blocs NumPy et fusionnables : chaque
+processus profile sa plage d'octets, les résumés partiels sont ensuite
+fusionnés sans relire les données.
+"""
+import numpy as np
+
+DEFAULT_HLL_PRECISION = 14
+# Reste du hachage (64 - precision bits) exact en float64 à partir de 11
+MIN_HLL_PRECISION = 11
+DEFAULT_COMPRESSION = 200
+
+_U64 = np.uint64
+
+
+def mix64(values: np.ndarray) -> np.ndarray:
+    """Finaliseur SplitMix64 vectorisé (uint64 -> uint64, arithmétique modulo 2^64)"""
+    values = values + _U64(0x9E3779B97F4A7C15)
+    values = (values ^ (values >> _U64(30))) * _U64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> _U64(27))) * _U64(0x94D049BB133111EB)
+    return values ^ (values >> _U64(31))
+
+
+def hash_bytes(values: np.ndarray) -> np.ndarray:
+    """Hachage 64 bits d'un tableau de chaînes d'octets (dtype S), mot de 8 octets par mot"""
+    width = max(8, -(-values.dtype.itemsize // 8) * 8)
+    words = values.astype(f"S{width}").view(_U64).reshape(len(values), width // 8)
+    hashes = np.full(len(values), width, dtype=_U64)
+    for column in range(words.shape[1]):
+        hashes = mix64(hashes ^ words[:, column])
+    return hashes
+
+
+def hash_numbers(values: np.ndarray) -> np.ndarray:
+    """Hachage 64 bits de valeurs numériques (représentation float64)"""
+    return mix64(values.astype(np.float64).view(_U64))
+
+
+class HyperLogLog:
+    """Estimateur du nombre de valeurs distinctes à partir de hachages 64 bits"""
+
+    def __init__(self, precision: int = DEFAULT_HLL_PRECISION):
+        if not MIN_HLL_PRECISION <= precision <= 18:
+            raise ValueError(f"Précision HyperLogLog hors de [{MIN_HLL_PRECISION}, 18]: {precision}")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, hashes: np.ndarray) -> None:
+        if not len(hashes):
+            return
+        index = (hashes >> _U64(64 - self.precision)).astype(np.intp)
+        remainder = hashes & _U64((1 << (64 - self.precision)) - 1)
+        # Reste exact en float64 : l'exposant de frexp est son nombre de bits significatifs
+        bit_length = np.frexp(remainder.astype(np.float64))[1]
+        rank = (64 - self.precision - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: 'HyperLogLog') -> None:
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        size = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        raw = alpha * size * size / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * size and zeros:
+            # Petites cardinalités : comptage linéaire
+            return int(round(size * np.log(size / zeros)))
+        return int(round(raw))
+
+
+class TDigest:
+    """
+    t-digest fusionnant (fonction d'échelle k1) : les valeurs triées sont
+    regroupées en centroïdes dont la largeur en quantile se resserre vers
+    0 et 1, au plus `compression` centroïdes après chaque compression.
+    """
+
+    def __init__(self, compression: int = DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def update(self, values: np.ndarray) -> None:
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._compress(np.concatenate([self.means, values]), np.concatenate([self.weights, np.ones(len(values))]))
+
+    def merge(self, other: 'TDigest') -> None:
+        if not len(other.means):
+            return
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray) -> None:
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        cumulative = np.cumsum(weights)
+        quantiles = (cumulative - weights / 2) / cumulative[-1]
+        # k1(q) = compression * (asin(2q - 1) / pi + 1/2) : un centroïde par unité de k
+        bins = np.floor(self.compression * (np.arcsin(2 * quantiles - 1) / np.pi + 0.5)).astype(np.int64)
+        starts = np.flatnonzero(np.concatenate(([True], bins[1:] != bins[:-1])))
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def quantile(self, q: float) -> float:
+        if not len(self.means):
+            return float('nan')
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate(([0.0], centers, [centers[-1] + self.weights[-1] / 2]))
+        values = np.concatenate(([self.min], self.means, [self.max]))
+        return float(np.interp(q * self.count, positions, values))
@@ -0,0 +1,586 @@
+"""
+Stratégies de génération des valeurs d'une colonne.
+
+Chaque stratégie produit une valeur (moteur ligne : `random.Random` et Faker
+du générateur) ou une colonne complète d'un bloc (moteur colonnaire : tirages
+NumPy). Elles sont déclarées dans la spécification d'entité (`strategy:`) ou
+déduites du type et du nom de la colonne (infer_strategy).
+
+Le générateur passé aux stratégies (entity_generator.EntityGenerator) expose
+`rng`, `fake`, `seed`, `pools`, `pool_size`, `value_pool` et `references`.
+"""
+from __future__ import annotations
+
+import itertools
+import math
+import string
+import uuid
+from datetime import date, datetime, timedelta
+from functools import cached_property
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from columnar_engine import (choice_column, csv_escape, date_column, integer_column, pool_column,
+                             timestamp_column, uniform_column, uuid_column, weighted_choice_column)
+from lazy_imports import lazy_import
+from schema_compiler import clean_column
+from seeding import reference_date, seeded_timestamp
+
+np = lazy_import('numpy')
+
+# Bornes par défaut lorsque ni la spécification ni la DDL n'en donnent
+DEFAULT_INT_RANGE = (0, 1000)
+DEFAULT_FLOAT_RANGE = (0.0, 1000.0)
+DEFAULT_DATE_RANGE = ('2020-01-01', '2024-12-31')
+
+# Indices de nom de colonne (sous-chaîne) -> fournisseur Faker, pour les STRING
+FAKER_NAME_HINTS = [
+    ('email', 'email'),
+    ('prenom', 'first_name'),
+    ('first_name', 'first_name'),
+    ('telephone', 'phone_number'),
+    ('phone', 'phone_number'),
+    ('code_postal', 'postcode'),
+    ('postcode', 'postcode'),
+    ('ville', 'city'),
+    ('city', 'city'),
+    ('adresse', 'street_address'),
+    ('address', 'street_address'),
+    ('entreprise', 'company'),
+    ('company', 'company'),
+    ('societe', 'company'),
+    ('pays', 'country'),
+    ('country', 'country'),
+    ('nom', 'last_name'),
+    ('name', 'name'),
+]
+TEXT_NAME_HINTS = ('commentaire', 'comment', 'description', 'remarque')
+
+# Méthode Faker -> fournisseurs à charger (module de la méthode et ceux qu'elle appelle) ;
+# une méthode absente de la table charge tous les fournisseurs de la locale
+FAKER_PROVIDERS = {
+    'name': ('person',),
+    'first_name': ('person',),
+    'last_name': ('person',),
+    'email': ('internet', 'person'),
+    'company': ('company', 'person'),
+    'phone_number': ('phone_number',),
+    'postcode': ('address',),
+    'city': ('address', 'person'),
+    'street_address': ('address', 'person'),
+    'country': ('address',),
+    'text': ('lorem',),
+    'date_between': ('date_time',),
+}
+UUID_NAME_HINTS = ('reference', 'uuid', 'guid')
+
+
+def _as_date(value: Any) -> date:
+    return value if isinstance(value, date) else date.fromisoformat(str(value))
+
+
+class ValueStrategy:
+    """
+    Stratégie de base.
+
+    `depends_on` liste les colonnes à tirer avant celle-ci ; `csv_ready` indique
+    que la colonne produite par `column` est déjà nettoyée et échappée pour le CSV ;
+    `clean_values` que `value` ne produit que des chaînes déjà nettoyées (le
+    moteur ligne omet alors leur validation) ; `faker_methods` liste les méthodes
+    Faker appelées par `value`.
+    """
+    depends_on: Tuple[str, ...] = ()
+    csv_ready = True
+    clean_values = False
+    faker_methods: Tuple[str, ...] = ()
+
+    def __init__(self, name: str, schema: Dict[str, Any], clean: Callable[[Any], Any]):
+        self.name = name
+        self.schema = schema
+        self.clean = clean
+
+    def value(self, gen, values: Dict[str, Any], row_id: int) -> Any:
+        raise NotImplementedError
+
+    def column(self, gen, columns: Dict[str, Any], first_id: int, count: int, rng: np.random.Generator) -> Any:
+        raise NotImplementedError
+
+
+class IdStrategy(ValueStrategy):
+    """Identifiant de ligne (clé technique séquentielle)"""
+
+    def value(self, gen, values, row_id):
+        return row_id
+
+    def column(self, gen, columns, first_id, count, rng):
+        return np.arange(first_id, first_id + count)
+
+
+class FakerStrategy(ValueStrategy):
+    """
+    Fournisseur Faker (ex: last_name, email, text) : pool pré-généré en colonnaire,
+    et pour les deux moteurs en mode pools distincts (gen.pool_size)
+    """
+
+    def __init__(self, name, schema, clean, provider: str, args: Optional[Dict[str, Any]] = None):
+        super().__init__(name, schema, clean)
+        self.provider = provider
+        self.args = args or {}
+        self.faker_methods = (provider,)
+
+    def factory(self, gen) -> Callable[[], Any]:
+        provider = getattr(gen.fake, self.provider)
+        return (lambda: provider(**self.args)) if self.args else provider
+
+    def value(self, gen, values, row_id):
+        if gen.pool_size:
+            return gen.rng.choice(gen.value_pool(self))
+        return getattr(gen.fake, self.provider)(**self.args)
+
+    def column(self, gen, columns, first_id, count, rng):
+        return pool_column(gen.pools[self.name], count, rng)
+
+
+class ChoiceStrategy(ValueStrategy):
+    """
+    Valeur d'une liste de référence : uniforme, pondérée (`weights`) ou selon
+    une loi de Zipf sur l'ordre de la liste (`zipf` : exposant s, poids 1/rang^s,
+    la première valeur étant la plus fréquente). Une liste de nombres produit une
+    colonne numérique (utilisable par les stratégies dérivées).
+    """
+
+    def __init__(self, name, schema, clean, values: Sequence[Any], weights: Optional[Sequence[float]] = None,
+                 zipf: Optional[float] = None):
+        super().__init__(name, schema, clean)
+        self.values = list(values)
+        self.csv_values = [csv_escape(str(clean(value))) for value in self.values]
+        # Liste de référence sans délimiteur, fin de ligne ni valeur trop longue (ex: villes, statuts)
+        self.clean_values = all(isinstance(value, str) for value in self.values) and \
+            clean_column(self.values, schema.get('max_length')) == self.values
+        if weights is not None and zipf is not None:
+            raise ValueError("weights et zipf sont exclusifs")
+        if zipf is not None:
+            if zipf <= 0:
+                raise ValueError(f"Exposant zipf strictement positif attendu: {zipf}")
+            weights = [rank ** -zipf for rank in range(1, len(self.values) + 1)]
+        self.cum_weights = None
+        if weights is not None:
+            if len(weights) != len(self.values) or min(weights) < 0 or sum(weights) <= 0:
+                raise ValueError(f"Poids invalides: {len(self.values)} poids positifs ou nuls attendus")
+            # Sans NumPy : la spécification se charge sans l'importer (moteur ligne)
+            cumulative = list(itertools.accumulate(map(float, weights)))
+            self.cum_weights = [weight / cumulative[-1] for weight in cumulative]
+            self.cum_weights[-1] = 1.0
+
+    @cached_property
+    def column_cum_weights(self) -> np.ndarray:
+        """Poids cumulés du moteur colonnaire"""
+        return np.asarray(self.cum_weights)
+
+    @cached_property
+    def column_values(self) -> np.ndarray:
+        """Valeurs du moteur colonnaire (tableau numérique pour une liste de nombres)"""
+        if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in self.values):
+            return np.asarray(self.values)
+        return np.asarray(self.csv_values, dtype=object)
+
+    def value(self, gen, values, row_id):
+        if self.cum_weights is None:
+            return gen.rng.choice(self.values)
+        return gen.rng.choices(self.values, cum_weights=self.cum_weights)[0]
+
+    def column(self, gen, columns, first_id, count, rng):
+        if self.cum_weights is not None:
+            return weighted_choice_column(self.column_values, self.column_cum_weights, count, rng)
+        if self.column_values.dtype != object:
+            return self.column_values[rng.integers(0, len(self.values), count)]
+        return choice_column(self.csv_values, count, rng)
+
+
+class RandintStrategy(ValueStrategy):
+    """Entier uniforme dans [low, high] (bornes du schéma par défaut)"""
+
+    def __init__(self, name, schema, clean, low: Optional[int] = None, high: Optional[int] = None):
+        super().__init__(name, schema, clean)
+        self.low = int(schema.get('min_val', DEFAULT_INT_RANGE[0]) if low is None else low)
+        self.high = int(schema.get('max_val', DEFAULT_INT_RANGE[1]) if high is None else high)
+
+    def value(self, gen, values, row_id):
+        return gen.rng.randint(self.low, self.high)
+
+    def column(self, gen, columns, first_id, count, rng):
+        return integer_column(self.low, self.high, count, rng)
+
+
+class UniformStrategy(ValueStrategy):
+    """Flottant uniforme dans [low, high] arrondi à `decimals` (bornes du schéma par défaut)"""
+
+    def __init__(self, name, schema, clean, low: Optional[float] = None, high: Optional[float] = None,
+                 decimals: int = 2):
+        super().__init__(name, schema, clean)
+        self.low = schema.get('min_val', DEFAULT_FLOAT_RANGE[0]) if low is None else low
+        self.high = schema.get('max_val', DEFAULT_FLOAT_RANGE[1]) if high is None else high
+        self.decimals = decimals
+
+    def value(self, gen, values, row_id):
+        return round(gen.rng.uniform(self.low, self.high), self.decimals)
+
+    def column(self, gen, columns, first_id, count, rng):
+        return uniform_column(self.low, self.high, count, rng, self.decimals)
+
+
+class LogNormalStrategy(ValueStrategy):
+    """
+    Montant log-normal (asymétrique, longue traîne à droite) de médiane
+    `median` et d'écart-type `sigma` du logarithme, borné à [low, high] (bornes
+    du schéma par défaut) et arrondi à `decimals`.
+
+    Corrélation : avec `by`, la médiane et le sigma dépendent de la valeur de
+    cette colonne (`levels` : {valeur: {median, sigma}}, ex. salaire par niveau),
+    `median` / `sigma` s'appliquant aux valeurs absentes de `levels`.
+    """
+
+    def __init__(self, name, schema, clean, median: float, sigma: float = 0.5, low: Optional[float] = None,
+                 high: Optional[float] = None, decimals: int = 2, by: Optional[str] = None,
+                 levels: Optional[Dict[Any, Dict[str, float]]] = None):
+        super().__init__(name, schema, clean)
+        self.low = schema.get('min_val') if low is None else low
+        self.high = schema.get('max_val') if high is None else high
+        self.decimals = decimals
+        self.default = (math.log(median), float(sigma))
+        if (by is None) != (levels is None):
+            raise ValueError("by et levels vont ensemble")
+        self.by = by
+        self.levels = {}
+        for level, params in (levels or {}).items():
+            unknown = set(params) - {'median', 'sigma'}
+            if unknown:
+                raise ValueError(f"Paramètres de niveau inconnus pour {level}: {', '.join(sorted(unknown))}")
+            self.levels[level] = (math.log(params.get('median', median)), float(params.get('sigma', sigma)))
+        self.depends_on = (by,) if by else ()
+
+    def _bound(self, value: float) -> float:
+        if self.low is not None and value < self.low:
+            value = self.low
+        if self.high is not None and value > self.high:
+            value = self.high
+        return value
+
+    def value(self, gen, values, row_id):
+        mu, sigma = self.levels.get(values[self.by], self.default) if self.by else self.default
+        return round(self._bound(gen.rng.lognormvariate(mu, sigma)), self.decimals)
+
+    def column(self, gen, columns, first_id, count, rng):
+        mu = np.full(count, self.default[0])
+        sigma = np.full(count, self.default[1])
+        if self.by:
+            source = columns[self.by]
+            if not isinstance(source, np.ndarray):
+                source = np.asarray(source, dtype=object)
+            for level, (level_mu, level_sigma) in self.levels.items():
+                # Colonnes catégorielles texte : valeurs déjà échappées pour le CSV
+                key = level if source.dtype != object else csv_escape(str(level))
+                mask = source == key
+                mu[mask] = level_mu
+                sigma[mask] = level_sigma
+        values = np.exp(mu + sigma * rng.standard_normal(count))
+        if self.low is not None or self.high is not None:
+            values = np.clip(values, self.low, self.high)
+        return np.round(values, self.decimals)
+
+
+class DateBetweenStrategy(ValueStrategy):
+    """Date uniforme dans [start, end] fixes (min_date/max_date du schéma par défaut)"""
+
+    def __init__(self, name, schema, clean, start: Any = None, end: Any = None):
+        super().__init__(name, schema, clean)
+        self.start = _as_date(schema.get('min_date', DEFAULT_DATE_RANGE[0]) if start is None else start)
+        end = _as_date(schema.get('max_date', DEFAULT_DATE_RANGE[1]) if end is None else end)
+        self.n_days = (end - self.start).days
+
+    def value(self, gen, values, row_id):
+        return self.start + timedelta(days=gen.rng.randint(0, self.n_days))
+
+    def column(self, gen, columns, first_id, count, rng):
+        return date_column(self.start, self.n_days, count, rng)
+
+
+class RecentDateStrategy(ValueStrategy):
+    """Date uniforme sur les `days` derniers jours (date de référence fixe avec graine)"""
+    faker_methods = ('date_between',)
+
+    def __init__(self, name, schema, clean, days: int = 365):
+        super().__init__(name, schema, clean)
+        self.days = days
+
+    def value(self, gen, values, row_id):
+        today = reference_date(gen.seed)
+        return gen.fake.date_between(start_date=today - timedelta(days=self.days), end_date=today)
+
+    def column(self, gen, columns, first_id, count, rng):
+        today = reference_date(gen.seed)
+        return date_column(today - timedelta(days=self.days), self.days, count, rng)
+
+
+class DateOffsetStrategy(ValueStrategy):
+    """
+    Date dérivée d'une autre colonne date : décalage aléatoire de
+    [min_days, max_days] jours, ou de `months_from` mois de 30 jours.
+    """
+
+    def __init__(self, name, schema, clean, source: str, min_days: int = 0, max_days: int = 0,
+                 months_from: Optional[str] = None):
+        super().__init__(name, schema, clean)
+        self.source = source
+        self.min_days = min_days
+        self.max_days = max_days
+        self.months_from = months_from
+        self.depends_on = (source,) + ((months_from,) if months_from else ())
+
+    def value(self, gen, values, row_id):
+        if self.months_from:
+            return values[self.source] + timedelta(days=values[self.months_from] * 30)
+        return values[self.source] + timedelta(days=gen.rng.randint(self.min_days, self.max_days))
+
+    def column(self, gen, columns, first_id, count, rng):
+        if self.months_from:
+            return columns[self.source] + columns[self.months_from] * 30
+        return columns[self.source] + rng.integers(self.min_days, self.max_days + 1, count)
+
+
+class RatioStrategy(ValueStrategy):
+    """Quotient de deux colonnes numériques arrondi à `decimals`"""
+
+    def __init__(self, name, schema, clean, numerator: str, denominator: str, decimals: int = 2):
+        super().__init__(name, schema, clean)
+        self.numerator = numerator
+        self.denominator = denominator
+        self.decimals = decimals
+        self.depends_on = (numerator, denominator)
+
+    def value(self, gen, values, row_id):
+        return round(values[self.numerator] / values[self.denominator], self.decimals)
+
+    def column(self, gen, columns, first_id, count, rng):
+        return np.round(columns[self.numerator] / columns[self.denominator], self.decimals)
+
+
+class ProductStrategy(ValueStrategy):
+    """Produit de colonnes numériques arrondi à `decimals` (ex: montant_total = mensualité x durée)"""
+
+    def __init__(self, name, schema, clean, factors: Sequence[str], decimals: int = 2):
+        super().__init__(name, schema, clean)
+        self.factors = tuple(factors)
+        self.decimals = decimals
+        self.depends_on = self.factors
+
+    def value(self, gen, values, row_id):
+        result = 1
+        for factor in self.factors:
+            result *= values[factor]
+        return round(result, self.decimals)
+
+    def column(self, gen, columns, first_id, count, rng):
+        return np.round(np.prod([columns[factor] for factor in self.factors], axis=0), self.decimals)
+
+
+class ReferenceStrategy(ValueStrategy):
+    """
+    Clé étrangère vers l'id (1..N) d'une autre entité, dérivée arithmétiquement
+    de l'id de ligne ou d'un tirage : aucune table parente en mémoire.
+
+    - sans taille de parent (génération seule) : affectation séquentielle,
+      `fan_out` lignes consécutives par parent (ceil(row_id / fan_out))
+    - avec `gen.references[entity]` = N (génération liée, voir linked_generation) :
+      parent tiré dans [1, N], concentré sur une partie des parents si `skew` > 0
+      (u^(1 + skew)), puis dispersé par une permutation affine de [0, N)
+    """
+
+    def __init__(self, name, schema, clean, entity: str, fan_out: float = 3.0, skew: float = 0.0):
+        super().__init__(name, schema, clean)
+        if fan_out <= 0 or skew < 0:
+            raise ValueError(f"fan_out > 0 et skew >= 0 attendus pour {name}")
+        self.entity = entity
+        self.fan_out = fan_out
+        self.exponent = 1.0 + skew
+        self._permutation = (0, 1, 0)
+
+    def permutation(self, parent_rows: int) -> Tuple[int, int]:
+        """Coefficients (a, b) de x -> (a * x + b) mod N, a premier avec N et a * N < 2^63"""
+        if self._permutation[0] != parent_rows:
+            multiplier = max(1, min(int(parent_rows * 0.6180339887), (2 ** 63 - 1) // parent_rows - 1))
+            while math.gcd(multiplier, parent_rows) != 1:
+                multiplier -= 1
+            self._permutation = (parent_rows, multiplier, parent_rows // 3)
+        return self._permutation[1:]
+
+    def value(self, gen, values, row_id):
+        parent_rows = gen.references.get(self.entity)
+        if not parent_rows:
+            return math.ceil(row_id / self.fan_out)
+        multiplier, offset = self.permutation(parent_rows)
+        drawn = min(int(parent_rows * gen.rng.random() ** self.exponent), parent_rows - 1)
+        return (multiplier * drawn + offset) % parent_rows + 1
+
+    def column(self, gen, columns, first_id, count, rng):
+        parent_rows = gen.references.get(self.entity)
+        if not parent_rows:
+            return np.ceil(np.arange(first_id, first_id + count) / self.fan_out).astype(np.int64)
+        multiplier, offset = self.permutation(parent_rows)
+        drawn = np.minimum((parent_rows * rng.random(count) ** self.exponent).astype(np.int64), parent_rows - 1)
+        return (multiplier * drawn + offset) % parent_rows + 1
+
+
+class TemplateStrategy(ValueStrategy):
+    """Chaîne formatée (str.format) à partir des autres colonnes, ex: 'CTR-{date_signature.year}-{contract_id:06d}'"""
+    csv_ready = False
+
+    def __init__(self, name, schema, clean, format: str):
+        super().__init__(name, schema, clean)
+        self.format = format
+        fields = [field for _, field, _, _ in string.Formatter().parse(format) if field]
+        self.depends_on = tuple(dict.fromkeys(field.split('.')[0].split('[')[0] for field in fields))
+
+    def value(self, gen, values, row_id):
+        return self.format.format_map(values)
+
+    def column(self, gen, columns, first_id, count, rng):
+        names = self.depends_on
+        lists = [columns[name].tolist() if isinstance(columns[name], np.ndarray) else columns[name]
+                 for name in names]
+        return [self.format.format_map(dict(zip(names, row))) for row in zip(*lists)]
+
+
+class Uuid4Strategy(ValueStrategy):
+    """UUID version 4"""
+
+    def __init__(self, name, schema, clean):
+        super().__init__(name, schema, clean)
+        self.clean_values = schema.get('max_length', 36) >= 36
+
+    def value(self, gen, values, row_id):
+        return str(uuid.UUID(int=gen.rng.getrandbits(128), version=4))
+
+    def column(self, gen, columns, first_id, count, rng):
+        return uuid_column(count, rng)
+
+
+class TimestampStrategy(ValueStrategy):
+    """Horodatage de génération (reproductible dans la journée de référence avec graine)"""
+
+    def value(self, gen, values, row_id):
+        return datetime.now().isoformat() if gen.seed is None else seeded_timestamp(gen.rng.random())
+
+    def column(self, gen, columns, first_id, count, rng):
+        return timestamp_column(count, rng, gen.seed is not None)
+
+
+STRATEGIES = {
+    'id': IdStrategy,
+    'faker': FakerStrategy,
+    'choice': ChoiceStrategy,
+    'randint': RandintStrategy,
+    'uniform': UniformStrategy,
+    'lognormal': LogNormalStrategy,
+    'date_between': DateBetweenStrategy,
+    'recent_date': RecentDateStrategy,
+    'date_offset': DateOffsetStrategy,
+    'ratio': RatioStrategy,
+    'product': ProductStrategy,
+    'reference': ReferenceStrategy,
+    'template': TemplateStrategy,
+    'uuid4': Uuid4Strategy,
+    'timestamp': TimestampStrategy,
+}
+
+
+def faker_providers(strategies: Iterable[ValueStrategy]) -> Optional[List[str]]:
+    """
+    Modules des fournisseurs Faker utilisés par les stratégies (construction
+    rapide de Faker) ; None si une méthode est hors de FAKER_PROVIDERS (tous).
+    """
+    providers = set()
+    for strategy in strategies:
+        for method in strategy.faker_methods:
+            if method not in FAKER_PROVIDERS:
+                return None
+            providers.update(FAKER_PROVIDERS[method])
+    return [f"faker.providers.{provider}" for provider in sorted(providers)] or None
+
+
+def infer_strategy(name: str, schema: Dict[str, Any], position: int) -> Dict[str, Any]:
+    """
+    Déduit la stratégie d'une colonne de son type et de son nom.
+
+    Args:
+        name: Nom de la colonne
+        schema: Définition ODS de la colonne (type, bornes)
+        position: Rang de la colonne (la première colonne INT64 'id'/'*_id' est l'identifiant)
+    """
+    field_type = schema.get('type')
+    lowered = name.lower()
+
+    if field_type == 'INT64':
+        if position == 0 and (lowered == 'id' or lowered.endswith('_id') or schema.get('required')):
+            return {'strategy': 'id'}
+        return {'strategy': 'randint'}
+    if field_type in ('FLOAT64', 'NUMERIC', 'BIGNUMERIC'):
+        if 'latitude' in lowered and 'min_val' not in schema:
+            return {'strategy': 'uniform', 'low': 42.0, 'high': 51.0, 'decimals': 6}
+        if 'longitude' in lowered and 'min_val' not in schema:
+            return {'strategy': 'uniform', 'low': -5.0, 'high': 8.0, 'decimals': 6}
+        return {'strategy': 'uniform'}
+    if field_type == 'DATE':
+        return {'strategy': 'date_between'}
+    if field_type in ('TIMESTAMP', 'DATETIME'):
+        return {'strategy': 'timestamp'}
+    if field_type == 'BOOL':
+        return {'strategy': 'choice', 'values': ['true', 'false']}
+
+    if any(hint in lowered for hint in UUID_NAME_HINTS):
+        return {'strategy': 'uuid4'}
+    if any(hint in lowered for hint in TEXT_NAME_HINTS):
+        max_chars = max(5, min(schema.get('max_length') or 200, 200))
+        return {'strategy': 'faker', 'provider': 'text', 'args': {'max_nb_chars': max_chars}}
+    for hint, provider in FAKER_NAME_HINTS:
+        if hint in lowered:
+            return {'strategy': 'faker', 'provider': provider}
+    return {'strategy': 'faker', 'provider': 'word'}
+
+
+def build_strategy(name: str, schema: Dict[str, Any], clean: Callable[[Any], Any],
+                   spec: Dict[str, Any]) -> ValueStrategy:
+    """Instancie la stratégie décrite par `spec` ({'strategy': ..., paramètres...})"""
+    params = dict(spec)
+    strategy_name = params.pop('strategy')
+    if strategy_name not in STRATEGIES:
+        raise ValueError(f"Stratégie inconnue pour {name}: {strategy_name} (disponibles: {', '.join(STRATEGIES)})")
+    if 'from' in params:
+        params['source'] = params.pop('from')
+    try:
+        return STRATEGIES[strategy_name](name, schema, clean, **params)
+    except TypeError as e:
+        raise ValueError(f"Paramètres invalides pour la stratégie {strategy_name} de {name}: {e}")
+
+
+def generation_order(strategies: Dict[str, ValueStrategy], draw_first: List[str]) -> List[str]:
+    """
+    Ordre de tirage des colonnes : `draw_first` puis l'ordre du schéma, chaque
+    colonne étant précédée des colonnes dont elle dépend.
+    """
+    order, visiting = [], set()
+
+    def visit(name: str) -> None:
+        if name in order:
+            return
+        if name not in strategies:
+            raise ValueError(f"Colonne inconnue dans les dépendances: {name}")
+        if name in visiting:
+            raise ValueError(f"Dépendance circulaire sur la colonne {name}")
+        visiting.add(name)
+        for dependency in strategies[name].depends_on:
+            visit(dependency)
+        order.append(name)
+
+    for name in list(draw_first) + list(strategies):
+        visit(name)
+    return order